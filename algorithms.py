@@ -0,0 +1,9 @@
+"""
+Module đăng ký các thuật toán giải TSP theo tên ngắn
+Dùng chung cho comparison, benchmark và solver_process
+"""
+from simulated_annealing import SimulatedAnnealing
+from woa_algorithm import WOA
+
+# Tên ngắn -> lớp thuật toán (cùng giao diện: khởi tạo với TSProblem, solve())
+ALGORITHMS = {'SA': SimulatedAnnealing, 'WOA': WOA}
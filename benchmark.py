@@ -0,0 +1,445 @@
+"""
+Bộ benchmark hiệu năng cho TSProblem, SimulatedAnnealing và WOA
+
+Gồm micro-benchmark cho các hàm nóng và macro-benchmark giải trọn vẹn trên
+nhiều kích thước / kiểu dữ liệu. Kết quả xuất ra JSON và có thể so sánh với
+một baseline đã lưu để phát hiện hồi quy hiệu năng.
+
+Ví dụ:
+    python benchmark.py --suite micro --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.1
+    python benchmark.py --suite scaling --max-cities 5000 --output scaling.json
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource  # Chỉ có trên Unix
+except ImportError:
+    resource = None
+
+import numpy as np
+from tsp_problem import TSProblem
+from simulated_annealing import SimulatedAnnealing
+from woa_algorithm import WOA
+from construction import construct_route
+from algorithms import ALGORITHMS
+
+GENERATORS = ('uniform', 'clustered', 'grid')
+
+# Tham số giải dùng cho macro-benchmark (đủ ngắn để chạy thường xuyên)
+MACRO_PARAMS = {
+    'SA': {'initial_temp': 10000, 'cooling_rate': 0.999, 'max_iterations': 10000},
+    'WOA': {'num_whales': 30, 'max_iterations': 200},
+}
+MACRO_SIZES = (20, 50, 100)
+QUICK_FACTOR = 10  # --quick chia số vòng lặp của macro-benchmark cho hệ số này
+
+# Tham số cố định cho đường cong mở rộng: số vòng lặp không đổi theo n nên
+# thời gian mỗi vòng lặp phản ánh trực tiếp chi phí theo kích thước bài toán
+# (cooling_rate đủ chậm để SA chạy hết max_iterations)
+SCALING_PARAMS = {
+    'SA': {'initial_temp': 10000, 'cooling_rate': 0.9995, 'max_iterations': 10000},
+    'WOA': {'num_whales': 30, 'max_iterations': 50},
+}
+SCALING_POINTS = 6
+
+
+def generate_instance(kind, num_cities, seed=0):
+    """
+    Sinh tọa độ thành phố theo kiểu dữ liệu
+    
+    Args:
+        kind: 'uniform' (đều trên hình vuông), 'clustered' (các cụm Gauss)
+              hoặc 'grid' (lưới đều)
+        num_cities: Số thành phố
+        seed: Hạt giống ngẫu nhiên
+        
+    Returns:
+        Mảng tọa độ shape (num_cities, 2) trong [0, COORD_RANGE]
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Kiểu dữ liệu phải thuộc {GENERATORS}, nhận được: {kind}")
+    rng = np.random.default_rng(seed)
+    size = TSProblem.COORD_RANGE
+    
+    if kind == 'uniform':
+        return rng.uniform(0, size, size=(num_cities, 2))
+    if kind == 'clustered':
+        num_clusters = max(1, int(np.sqrt(num_cities) / 2))
+        centers = rng.uniform(0.1 * size, 0.9 * size, size=(num_clusters, 2))
+        labels = rng.integers(num_clusters, size=num_cities)
+        coords = centers[labels] + rng.normal(0, 0.05 * size, size=(num_cities, 2))
+        return np.clip(coords, 0, size)
+    
+    side = int(np.ceil(np.sqrt(num_cities)))
+    step = size / max(side - 1, 1)
+    xs, ys = np.meshgrid(np.arange(side) * step, np.arange(side) * step)
+    return np.column_stack((xs.ravel(), ys.ravel()))[:num_cities]
+
+
+def time_callable(func, number=1, warmup=1, repeats=5):
+    """
+    Đo thời gian func() bằng time.perf_counter
+    
+    Args:
+        func: Hàm không tham số cần đo
+        number: Số lần gọi func trong mỗi lần đo (thời gian được chia đều)
+        warmup: Số lần đo bỏ đi trước khi ghi nhận
+        repeats: Số lần đo được ghi nhận
+        
+    Returns:
+        Dict thống kê thời gian mỗi lần gọi (giây): min, median, mean, stdev
+    """
+    samples = []
+    for run in range(warmup + repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = (time.perf_counter() - start) / number
+        if run >= warmup:
+            samples.append(elapsed)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'repeats': repeats,
+        'number': number,
+    }
+
+
+def _micro_cases():
+    """Danh sách (tên, hàm dựng) của các micro-benchmark; hàm dựng trả về (func, number)"""
+    def route_distance(n):
+        tsp = TSProblem(city_coords=generate_instance('uniform', n))
+        route = tsp.generate_random_route()
+        return lambda: tsp.calculate_route_distance(route), 1000
+    
+    def build_matrix(n):
+        tsp = TSProblem(city_coords=generate_instance('uniform', n))
+        return tsp._build_distance_matrix, 10
+    
+    def get_neighbor(n, neighborhood):
+        tsp = TSProblem(city_coords=generate_instance('uniform', n))
+        sa = SimulatedAnnealing(tsp, neighborhood=neighborhood, seed=0)
+        route = tsp.generate_random_route()
+        return lambda: sa._get_neighbor(route), 1000
+    
+    def swap_sequence(n):
+        tsp = TSProblem(city_coords=generate_instance('uniform', n))
+        woa = WOA(tsp)
+        route1, route2 = tsp.generate_random_route(), tsp.generate_random_route()
+        return lambda: woa._get_swap_sequence(route1, route2), 100
+    
+    def construct(n, method):
+        tsp = TSProblem(city_coords=generate_instance('uniform', n), storage='on_demand')
+        return lambda: construct_route(tsp, method), 1
+    
+    cases = []
+    for n in (100, 500):
+        cases.append((f'calculate_route_distance[n={n}]', lambda n=n: route_distance(n)))
+        cases.append((f'_build_distance_matrix[n={n}]', lambda n=n: build_matrix(n)))
+        cases.append((f'_get_swap_sequence[n={n}]', lambda n=n: swap_sequence(n)))
+    for neighborhood in ('swap', '2opt'):
+        cases.append((f'_get_neighbor[{neighborhood},n=100]',
+                      lambda nb=neighborhood: get_neighbor(100, nb)))
+    for method, n in (('hilbert', 10000), ('greedy', 10000), ('nearest_neighbor', 2000),
+                      ('farthest_insertion', 2000)):
+        cases.append((f'construct_route[{method},n={n}]',
+                      lambda m=method, n=n: construct(n, m)))
+    return cases
+
+
+def run_micro(warmup=1, repeats=5):
+    """
+    Chạy các micro-benchmark
+    
+    Returns:
+        Dict tên -> thống kê thời gian mỗi lần gọi
+    """
+    results = {}
+    np.random.seed(0)
+    for name, setup in _micro_cases():
+        func, number = setup()
+        results[name] = time_callable(func, number=number, warmup=warmup, repeats=repeats)
+        print(f"  {name:<40} {results[name]['median'] * 1e6:>12.2f} µs")
+    return results
+
+
+def run_macro(sizes=MACRO_SIZES, generators=GENERATORS, warmup=0, repeats=3, quick=False):
+    """
+    Chạy macro-benchmark: giải trọn vẹn với mỗi thuật toán, kích thước và kiểu dữ liệu
+    
+    Mỗi lần đo tạo thuật toán mới với cùng hạt giống, nên khoảng cách tìm
+    được giống nhau giữa các lần và chỉ thời gian thay đổi.
+    
+    Returns:
+        Dict tên -> thống kê thời gian một lần solve, kèm 'distance'
+    """
+    results = {}
+    for algo, params in MACRO_PARAMS.items():
+        params = dict(params)
+        if quick:
+            params['max_iterations'] = max(1, params['max_iterations'] // QUICK_FACTOR)
+        for kind in generators:
+            for n in sizes:
+                tsp = TSProblem(city_coords=generate_instance(kind, n))
+                distances = []
+                
+                def solve():
+                    _, best_distance, _ = ALGORITHMS[algo](tsp, seed=0, **params).solve()
+                    distances.append(float(best_distance))
+                
+                name = f'solve[{algo},{kind},n={n}]'
+                results[name] = time_callable(solve, warmup=warmup, repeats=repeats)
+                results[name]['distance'] = distances[-1]
+                print(f"  {name:<40} {results[name]['median']:>10.3f} s"
+                      f"   distance={distances[-1]:.2f}")
+    return results
+
+
+def scaling_sizes(min_cities=20, max_cities=TSProblem.MAX_CITIES, points=SCALING_POINTS):
+    """Các kích thước cách đều theo thang log từ min_cities tới max_cities"""
+    sizes = np.geomspace(min_cities, max_cities, num=points)
+    return sorted(set(int(round(n)) for n in sizes))
+
+
+def _storage_for(num_cities):
+    """Cách lưu khoảng cách nhỏ gọn nhất còn hỗ trợ kích thước num_cities"""
+    if num_cities <= TSProblem.MAX_CITIES:
+        return 'dense'
+    if num_cities <= TSProblem.MAX_CITIES_CONDENSED:
+        return 'condensed'
+    return 'on_demand'
+
+
+def _peak_rss_mb():
+    """RSS lớn nhất của tiến trình hiện tại (MB), None nếu không đo được"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _build_and_solve(algo, num_cities, params, seed):
+    """Dựng bài toán rồi giải một lần, trả về (thời gian dựng, thời gian giải, solver, khoảng cách)"""
+    coords = generate_instance('uniform', num_cities, seed)
+    
+    start = time.perf_counter()
+    tsp = TSProblem(city_coords=coords, storage=_storage_for(num_cities))
+    build_time = time.perf_counter() - start
+    
+    solver = ALGORITHMS[algo](tsp, seed=seed, **params)
+    start = time.perf_counter()
+    _, best_distance, _ = solver.solve()
+    solve_time = time.perf_counter() - start
+    return build_time, solve_time, solver, float(best_distance)
+
+
+def _scaling_case(algo, num_cities, params, trace_memory=True, seed=0):
+    """
+    Đo một điểm trên đường cong mở rộng
+    
+    Thời gian được đo ở lần chạy không bật tracemalloc (tracemalloc làm chậm
+    đáng kể); đỉnh bộ nhớ tracemalloc được đo ở một lần chạy lại riêng.
+    
+    Returns:
+        Dict các số đo: thời gian dựng/giải, thời gian mỗi vòng lặp, số lần
+        đánh giá mỗi giây, đỉnh bộ nhớ tracemalloc và RSS
+    """
+    build_time, solve_time, solver, distance = _build_and_solve(algo, num_cities, params, seed)
+    peak_rss = _peak_rss_mb()
+    
+    peak_traced = None
+    if trace_memory:
+        tracemalloc.start()
+        _build_and_solve(algo, num_cities, params, seed)
+        peak_traced = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    
+    iterations = max(solver.actual_iterations, 1)
+    # SA đánh giá một láng giềng mỗi vòng lặp; WOA đánh giá cả quần thể
+    evaluations = iterations * getattr(solver, 'num_whales', 1)
+    return {
+        'num_cities': num_cities,
+        'storage': solver.tsp.storage,
+        'build_time': build_time,
+        'solve_time': solve_time,
+        'iterations': iterations,
+        'time_per_iteration': solve_time / iterations,
+        'evaluations_per_second': evaluations / solve_time if solve_time > 0 else None,
+        'peak_tracemalloc_mb': peak_traced,
+        'peak_rss_mb': peak_rss,
+        'distance': distance,
+    }
+
+
+def fit_exponent(sizes, values):
+    """
+    Ước lượng số mũ k trong values ~ c * n^k bằng hồi quy tuyến tính trên log-log
+    
+    Returns:
+        k, hoặc None nếu không đủ điểm dương để ước lượng
+    """
+    points = [(n, v) for n, v in zip(sizes, values) if v is not None and v > 0]
+    if len(points) < 2:
+        return None
+    log_n, log_v = np.log([n for n, _ in points]), np.log([v for _, v in points])
+    return float(np.polyfit(log_n, log_v, 1)[0])
+
+
+def run_scaling(sizes, algorithms=tuple(SCALING_PARAMS), isolate=True, trace_memory=True):
+    """
+    Chạy đường cong mở rộng: thời gian và bộ nhớ theo số thành phố
+    
+    Args:
+        sizes: Các giá trị n cần đo
+        algorithms: Các thuật toán cần đo (khóa của SCALING_PARAMS)
+        isolate: Nếu True, mỗi điểm chạy trong một tiến trình mới để đỉnh RSS
+                 không bị ảnh hưởng bởi các điểm trước
+        trace_memory: Nếu True, chạy lại mỗi điểm với tracemalloc để đo đỉnh bộ nhớ
+        
+    Returns:
+        Dict thuật toán -> {'points': [...], 'exponents': {...}}
+    """
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for algo in algorithms:
+        print(f"  {algo}:")
+        print(f"    {'n':>7} {'storage':>10} {'build (s)':>10} {'solve (s)':>10} "
+              f"{'µs/iter':>10} {'eval/s':>12} {'peak MB':>9} {'RSS MB':>9}")
+        points = []
+        for n in sizes:
+            args = (algo, n, SCALING_PARAMS[algo], trace_memory)
+            if isolate:
+                with context.Pool(1, maxtasksperchild=1) as pool:
+                    point = pool.apply(_scaling_case, args)
+            else:
+                point = _scaling_case(*args)
+            points.append(point)
+            rss, traced = point['peak_rss_mb'], point['peak_tracemalloc_mb']
+            print(f"    {n:>7} {point['storage']:>10} {point['build_time']:>10.4f} "
+                  f"{point['solve_time']:>10.3f} {point['time_per_iteration'] * 1e6:>10.1f} "
+                  f"{point['evaluations_per_second']:>12.0f} "
+                  f"{(f'{traced:.2f}' if traced is not None else '-'):>9} "
+                  f"{(f'{rss:.1f}' if rss is not None else '-'):>9}")
+        
+        measured = [p['num_cities'] for p in points]
+        exponents = {
+            metric: fit_exponent(measured, [p[metric] for p in points])
+            for metric in ('build_time', 'time_per_iteration', 'peak_tracemalloc_mb')
+        }
+        print("    Số mũ ước lượng (~ n^k): " + ", ".join(
+            f"{metric}={k:.2f}" if k is not None else f"{metric}=-"
+            for metric, k in exponents.items()))
+        results[algo] = {'points': points, 'exponents': exponents}
+    return results
+
+
+def compare_results(current, baseline, threshold=0.10):
+    """
+    So sánh thời gian (median) với baseline
+    
+    Args:
+        current: Dict kết quả hiện tại (tên -> thống kê)
+        baseline: Dict kết quả baseline
+        threshold: Tỉ lệ chậm hơn tối đa chấp nhận được (0.10 = 10%)
+        
+    Returns:
+        List các tuple (tên, median baseline, median hiện tại, tỉ lệ) bị chậm
+        hơn baseline quá threshold
+    """
+    regressions = []
+    print(f"\n{'Benchmark':<40} {'Baseline':>12} {'Hiện tại':>12} {'Tỉ lệ':>8}")
+    for name in sorted(set(current) & set(baseline)):
+        old, new = baseline[name]['median'], current[name]['median']
+        ratio = new / old if old > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append((name, old, new, ratio))
+            flag = '  ✗ chậm hơn'
+        elif ratio < 1 - threshold:
+            flag = '  ✓ nhanh hơn'
+        print(f"{name:<40} {old:>12.6f} {new:>12.6f} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def collect_metadata():
+    """Thông tin môi trường chạy benchmark"""
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hiệu năng TSP (SA, WOA)")
+    parser.add_argument('--suite', choices=('micro', 'macro', 'scaling', 'all'), default='all',
+                        help="Nhóm benchmark cần chạy ('all' không gồm 'scaling')")
+    parser.add_argument('--output', help="Ghi kết quả ra tệp JSON")
+    parser.add_argument('--baseline', help="Tệp JSON baseline để so sánh")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Tỉ lệ chậm hơn baseline được xem là hồi quy (mặc định 0.10)")
+    parser.add_argument('--warmup', type=int, default=1, help="Số lần chạy khởi động")
+    parser.add_argument('--repeats', type=int, default=5, help="Số lần đo")
+    parser.add_argument('--quick', action='store_true',
+                        help="Giảm số vòng lặp của macro-benchmark")
+    parser.add_argument('--min-cities', type=int, default=20,
+                        help="Kích thước nhỏ nhất của đường cong mở rộng")
+    parser.add_argument('--max-cities', type=int, default=TSProblem.MAX_CITIES,
+                        help="Kích thước lớn nhất của đường cong mở rộng (vượt MAX_CITIES "
+                             "sẽ dùng storage 'condensed' / 'on_demand')")
+    parser.add_argument('--points', type=int, default=SCALING_POINTS,
+                        help="Số kích thước đo trên đường cong mở rộng")
+    parser.add_argument('--algorithms', nargs='+', choices=tuple(SCALING_PARAMS),
+                        default=list(SCALING_PARAMS), help="Thuật toán của đường cong mở rộng")
+    parser.add_argument('--no-isolate', action='store_true',
+                        help="Đo mọi điểm trong cùng tiến trình (RSS khi đó là đỉnh tích lũy)")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="Không chạy lại để đo đỉnh bộ nhớ bằng tracemalloc")
+    args = parser.parse_args(argv)
+    
+    report = {'metadata': collect_metadata(), 'results': {}}
+    if args.suite in ('micro', 'all'):
+        print("Micro-benchmark (median mỗi lần gọi):")
+        report['results'].update(run_micro(warmup=args.warmup, repeats=args.repeats))
+    if args.suite in ('macro', 'all'):
+        print("Macro-benchmark (median mỗi lần solve):")
+        report['results'].update(run_macro(warmup=min(args.warmup, 1),
+                                           repeats=max(1, args.repeats // 2),
+                                           quick=args.quick))
+    if args.suite == 'scaling':
+        sizes = scaling_sizes(args.min_cities, args.max_cities, args.points)
+        print(f"Đường cong mở rộng (n = {sizes}):")
+        report['scaling'] = run_scaling(sizes, args.algorithms, isolate=not args.no_isolate,
+                                        trace_memory=not args.no_tracemalloc)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nĐã ghi kết quả vào {args.output}")
+    
+    if args.baseline and report['results']:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(report['results'], baseline['results'], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark chậm hơn baseline quá {args.threshold:.0%}")
+            return 1
+        print("\nKhông có hồi quy hiệu năng")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
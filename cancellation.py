@@ -0,0 +1,85 @@
+"""
+Module hủy hợp tác (cooperative cancellation) và giới hạn thời gian/số lần đánh giá cho solve()
+"""
+import threading
+import time
+
+
+class CancellationToken:
+    """
+    Cờ hủy dùng chung giữa luồng điều khiển (ví dụ GUI) và luồng chạy thuật toán
+    
+    Thuật toán chỉ đọc cờ ở các điểm kiểm tra định kỳ trong vòng lặp chính,
+    nên cancel() không ngắt ngang phép tính mà để solve() trả về kết quả tốt
+    nhất hiện có ở điểm kiểm tra kế tiếp.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """Yêu cầu dừng (an toàn khi gọi từ luồng khác, gọi nhiều lần không sao)"""
+        self._event.set()
+    
+    @property
+    def cancelled(self):
+        """True nếu đã có yêu cầu dừng"""
+        return self._event.is_set()
+
+
+class StopCondition:
+    """
+    Gộp các điều kiện dừng sớm của một lần solve()
+    
+    Attributes:
+        reason: None khi chưa dừng; 'cancelled', 'time_limit' hoặc
+                'max_evaluations' khi should_stop() trả về True
+    """
+    
+    def __init__(self, cancel_token=None, time_limit=None, deadline=None, max_evaluations=None):
+        """
+        Khởi tạo điều kiện dừng (thời gian được tính từ lúc khởi tạo)
+        
+        Args:
+            cancel_token: CancellationToken hoặc None
+            time_limit: Số giây tối đa (đồng hồ thực) hoặc None
+            deadline: Mốc thời gian tuyệt đối theo time.time() hoặc None
+            max_evaluations: Số lần đánh giá tuyến tối đa hoặc None
+            
+        Raises:
+            ValueError: Nếu giới hạn không hợp lệ
+        """
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError(f"time_limit phải > 0, nhận được: {time_limit}")
+        if max_evaluations is not None and max_evaluations < 1:
+            raise ValueError(f"max_evaluations phải >= 1, nhận được: {max_evaluations}")
+        
+        self.cancel_token = cancel_token
+        self.max_evaluations = max_evaluations
+        # Quy mọi giới hạn thời gian về một mốc trên đồng hồ perf_counter
+        self._deadline = None
+        now = time.perf_counter()
+        if time_limit is not None:
+            self._deadline = now + time_limit
+        if deadline is not None:
+            limit = now + (deadline - time.time())
+            self._deadline = limit if self._deadline is None else min(self._deadline, limit)
+        self.reason = None
+    
+    def should_stop(self, evaluations=0):
+        """
+        Kiểm tra có phải dừng không (gọi định kỳ trong vòng lặp chính)
+        
+        Args:
+            evaluations: Số lần đánh giá tuyến đã thực hiện
+            
+        Returns:
+            True nếu phải dừng; lý do được ghi vào reason
+        """
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            self.reason = 'cancelled'
+        elif self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.reason = 'time_limit'
+        elif self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            self.reason = 'max_evaluations'
+        return self.reason is not None
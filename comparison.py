@@ -1,27 +1,75 @@
 """
 Script so sánh hiệu năng SA và WOA
 """
+import os
 import time
+from multiprocessing import Pool
+
 import numpy as np
 from tsp_problem import TSProblem
-from simulated_annealing import SimulatedAnnealing
-from woa_algorithm import WOA
-def run_comparison(num_cities, num_runs=5):
+from algorithms import ALGORITHMS
+
+
+def _run_job(job):
     """
-    So sánh SA và WOA trên bài toán TSP
+    Chạy một job (tsp, algo, params, seed) và trả về (algo, seed, distance, time)
     
-    Args:
-        num_cities: Số thành phố
-        num_runs: Số lần chạy
+    Thuật toán dùng luồng ngẫu nhiên riêng khởi tạo từ seed nên kết quả của
+    một job không phụ thuộc việc nó chạy ở tiến trình nào; thời gian thì có
+    (các job chạy đồng thời tranh nhau CPU, bộ nhớ đệm và băng thông bộ nhớ).
     """
-    results = {
-        'SA': {'distances': [], 'times': []},
-        'WOA': {'distances': [], 'times': []}
-    }
+    tsp, algo, params, seed = job
+    solver = ALGORITHMS[algo](tsp, seed=seed, **params)
     
-    seeds = [42, 123, 456, 789, 1000]
+    start_time = time.perf_counter()
+    _, best_distance, _ = solver.solve()
+    elapsed = time.perf_counter() - start_time
+    return algo, seed, float(best_distance), elapsed
+
+
+def run_jobs(problems, jobs, num_workers=None):
+    """
+    Chạy song song các job (instance, algorithm, params, seed) trên một Pool
+    
+    Mỗi bài toán được đưa vào bộ nhớ dùng chung một lần (TSProblem.share_memory);
+    job chỉ pickle handle và worker gắn view chỉ đọc thay vì dựng lại hay nhận
+    bản sao ma trận khoảng cách. Bài toán người gọi đã chia sẻ sẵn được dùng
+    nguyên trạng; chỉ những bài toán do hàm này chia sẻ mới bị unlink khi xong.
+    
+    Args:
+        problems: Dict key -> TSProblem
+        jobs: List các tuple (key, algo, params, seed) với algo thuộc ALGORITHMS
+        num_workers: Số tiến trình (None = số CPU; 1 = chạy tuần tự tại chỗ)
+        
+    Returns:
+        List kết quả (dict key, algo, seed, distance, time, concurrency) theo thứ
+        tự jobs; concurrency là số job chạy đồng thời khi đo time (1 = tuần tự)
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    tasks = [(problems[key], algo, params, seed) for key, algo, params, seed in jobs]
+    concurrency = max(1, min(num_workers, len(tasks)))
+    if concurrency > 1:
+        shared_here = []
+        try:
+            for tsp in problems.values():
+                if not tsp.is_shared:
+                    tsp.share_memory()
+                    shared_here.append(tsp)
+            with Pool(concurrency) as pool:
+                outcomes = pool.map(_run_job, tasks, chunksize=1)
+        finally:
+            for tsp in shared_here:
+                tsp.unlink()
+    else:
+        outcomes = [_run_job(task) for task in tasks]
     
-    # Tham số dựa trên kích thước bài toán
+    return [{'key': key, 'algo': algo, 'seed': seed, 'distance': distance, 'time': elapsed,
+             'concurrency': concurrency}
+            for (key, _, _, _), (algo, seed, distance, elapsed) in zip(jobs, outcomes)]
+
+
+def get_default_params(num_cities):
+    """Tham số SA và WOA dựa trên kích thước bài toán"""
     if num_cities == 20:
         sa_params = {'initial_temp': 10000, 'cooling_rate': 0.995, 'max_iterations': 10000}
         woa_params = {'num_whales': 30, 'max_iterations': 1000}
@@ -31,53 +79,57 @@ def run_comparison(num_cities, num_runs=5):
     else:  # 100
         sa_params = {'initial_temp': 20000, 'cooling_rate': 0.998, 'max_iterations': 30000}
         woa_params = {'num_whales': 50, 'max_iterations': 2000}
+    return sa_params, woa_params
+
+
+def run_comparison(num_cities, num_runs=5, num_workers=None, sa_time_budget=None):
+    """
+    So sánh SA và WOA trên bài toán TSP
+    
+    Args:
+        num_cities: Số thành phố
+        num_runs: Số lần chạy
+        num_workers: Số tiến trình chạy song song các job (None = số CPU;
+                     1 = chạy tuần tự, thời gian đo được không bị tranh chấp)
+        sa_time_budget: Nếu khác None, SA chạy đúng số giây này với nhiệt độ tự
+                        hiệu chỉnh ('auto') thay cho bảng tham số theo kích thước
+    """
+    results = {
+        'SA': {'distances': [], 'times': []},
+        'WOA': {'distances': [], 'times': []}
+    }
+    
+    seeds = [42, 123, 456, 789, 1000]
+    
+    sa_params, woa_params = get_default_params(num_cities)
+    if sa_time_budget is not None:
+        sa_params = {'initial_temp': 'auto', 'min_temp': 'auto', 'time_budget': sa_time_budget}
     
     print(f"\n{'='*60}")
     print(f"So sánh trên bài toán {num_cities} thành phố")
     print(f"{'='*60}\n")
     
-    for run_id in range(num_runs):
-        seed = seeds[run_id]
-        print(f"Run {run_id + 1}/{num_runs} (seed={seed}):")
-        
-        # ===== TEST SIMULATED ANNEALING =====
-        np.random.seed(seed)
-        tsp = TSProblem(num_cities=num_cities)
-        
-        sa = SimulatedAnnealing(
-            tsp, 
-            initial_temp=sa_params['initial_temp'],
-            cooling_rate=sa_params['cooling_rate'],
-            max_iterations=sa_params['max_iterations']
-        )
-        
-        start_time = time.time()
-        sa_best_route, sa_best_distance, _ = sa.solve()
-        sa_time = time.time() - start_time
-        
-        results['SA']['distances'].append(sa_best_distance)
-        results['SA']['times'].append(sa_time)
-        
-        print(f"  SA  - Distance: {sa_best_distance:.2f}, Time: {sa_time:.2f}s")
-        
-        # ===== TEST WOA =====
+    # Mỗi seed một bài toán, dựng một lần và dùng chung cho SA và WOA
+    problems = {}
+    jobs = []
+    for seed in seeds[:num_runs]:
         np.random.seed(seed)
-        tsp = TSProblem(num_cities=num_cities)
-        
-        woa = WOA(
-            tsp,
-            num_whales=woa_params['num_whales'],
-            max_iterations=woa_params['max_iterations']
-        )
-        
-        start_time = time.time()
-        woa_best_route, woa_best_distance, _ = woa.solve()
-        woa_time = time.time() - start_time
-        
-        results['WOA']['distances'].append(woa_best_distance)
-        results['WOA']['times'].append(woa_time)
-        
-        print(f"  WOA - Distance: {woa_best_distance:.2f}, Time: {woa_time:.2f}s")
+        problems[seed] = TSProblem(num_cities=num_cities)
+        jobs.append((seed, 'SA', sa_params, seed))
+        jobs.append((seed, 'WOA', woa_params, seed))
+    
+    outcomes = run_jobs(problems, jobs, num_workers)
+    concurrency = outcomes[0]['concurrency']
+    
+    for run_id, seed in enumerate(seeds[:num_runs]):
+        print(f"Run {run_id + 1}/{num_runs} (seed={seed}):")
+        for outcome in outcomes:
+            if outcome['key'] != seed:
+                continue
+            algo = outcome['algo']
+            results[algo]['distances'].append(outcome['distance'])
+            results[algo]['times'].append(outcome['time'])
+            print(f"  {algo:<3} - Distance: {outcome['distance']:.2f}, Time: {outcome['time']:.2f}s")
         print()
     
     # Tính toán thống kê
@@ -100,6 +152,11 @@ def run_comparison(num_cities, num_runs=5):
         print(f"    - Độ lệch chuẩn: {np.std(times):.2f}s")
         print()
     
+    if concurrency > 1:
+        print(f"Lưu ý: thời gian được đo khi {concurrency} job chạy đồng thời nên có thể cao hơn "
+              f"khi chạy riêng; dùng num_workers=1 để đo thời gian không tranh chấp")
+        print()
+    
     # So sánh
     sa_avg_dist = np.mean(results['SA']['distances'])
     woa_avg_dist = np.mean(results['WOA']['distances'])
@@ -0,0 +1,332 @@
+"""
+Module các heuristic dựng tuyến đường nhanh cho TSP
+Dùng làm lời giải khởi đầu (warm start) cho SA và WOA thay cho tuyến ngẫu nhiên
+"""
+import numpy as np
+from typing import List, Optional
+
+
+# Số láng giềng gần nhất dùng để sinh các cạnh ứng viên cho greedy edge
+GREEDY_NEIGHBORS = 10
+# Số láng giềng gần nhất được thử trước khi nearest neighbor phải quét cả hàng khoảng cách
+NEAREST_NEIGHBOR_CANDIDATES = 8
+# Bậc của đường cong Hilbert (lưới 2^order x 2^order)
+HILBERT_ORDER = 16
+
+
+def nearest_neighbor_route(tsp, start: int = 0) -> List[int]:
+    """
+    Dựng tuyến bằng nearest neighbor: luôn đi tới thành phố gần nhất chưa thăm
+    
+    Thành phố kế tiếp được tìm trong danh sách láng giềng gần (chỉ mục không
+    gian); chỉ khi mọi láng giềng đều đã thăm mới quét cả hàng khoảng cách.
+    
+    Args:
+        tsp: Đối tượng TSProblem
+        start: Thành phố xuất phát
+        
+    Returns:
+        Danh sách chỉ số thành phố theo thứ tự đi
+    """
+    n = tsp.num_cities
+    candidates = tsp.get_candidate_lists(NEAREST_NEIGHBOR_CANDIDATES).tolist()
+    visited = bytearray(n)
+    # View numpy dùng chung bộ nhớ với visited, cho bước quét cả hàng
+    visited_mask = np.frombuffer(visited, dtype=np.bool_)
+    
+    route = [start]
+    visited[start] = 1
+    current = start
+    for _ in range(n - 1):
+        for city in candidates[current]:
+            if not visited[city]:
+                break
+        else:
+            row = tsp.get_distance_row(current)
+            city = int(np.argmin(np.where(visited_mask, np.inf, row)))
+        route.append(city)
+        visited[city] = 1
+        current = city
+    return route
+
+
+def greedy_edge_route(tsp, k: int = GREEDY_NEIGHBORS) -> List[int]:
+    """
+    Dựng tuyến bằng greedy edge: thêm dần các cạnh ngắn nhất không tạo bậc 3 hay chu trình
+    
+    Các cạnh ứng viên là cạnh tới k láng giềng gần nhất, được sắp xếp một lần
+    bằng numpy; union-find loại các cạnh tạo chu trình con. Các đoạn đường
+    còn rời nhau sau đó được nối bằng nearest neighbor giữa các đầu mút.
+    
+    Args:
+        tsp: Đối tượng TSProblem
+        k: Số láng giềng gần nhất của mỗi thành phố được xét làm cạnh ứng viên
+        
+    Returns:
+        Danh sách chỉ số thành phố theo thứ tự đi
+    """
+    n = tsp.num_cities
+    neighbors = tsp.get_candidate_lists(k)
+    cities = np.repeat(np.arange(n), neighbors.shape[1])
+    lo = np.minimum(cities, neighbors.ravel())
+    hi = np.maximum(cities, neighbors.ravel())
+    keys = np.unique(lo * n + hi)
+    lo, hi = keys // n, keys % n
+    order = np.argsort(tsp._pair_distances(lo, hi), kind='stable')
+    
+    parent = list(range(n))
+    degree = [0] * n
+    adjacency = [[] for _ in range(n)]
+    
+    def find(city):
+        while parent[city] != city:
+            parent[city] = parent[parent[city]]
+            city = parent[city]
+        return city
+    
+    edges = 0
+    for a, b in zip(lo[order].tolist(), hi[order].tolist()):
+        if degree[a] == 2 or degree[b] == 2:
+            continue
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        parent[root_a] = root_b
+        degree[a] += 1
+        degree[b] += 1
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+        edges += 1
+        if edges == n - 1:
+            break
+    
+    # Nối các đoạn: từ đầu mút cuối của đoạn hiện tại tới đầu mút gần nhất của đoạn khác
+    endpoints = np.array([city for city in range(n) if degree[city] < 2])
+    remaining = np.ones(len(endpoints), dtype=bool)
+    slot = {city: index for index, city in enumerate(endpoints.tolist())}
+    route = []
+    current = int(endpoints[0])
+    while True:
+        remaining[slot[current]] = False
+        previous = -1
+        while True:
+            route.append(current)
+            following = [city for city in adjacency[current] if city != previous]
+            if not following:
+                break
+            previous, current = current, following[0]
+        remaining[slot[current]] = False
+        if not remaining.any():
+            break
+        row = tsp.get_distance_row(current)[endpoints]
+        current = int(endpoints[np.argmin(np.where(remaining, row, np.inf))])
+    return route
+
+
+def hilbert_route(tsp, order: int = HILBERT_ORDER) -> List[int]:
+    """
+    Dựng tuyến theo thứ tự các thành phố trên đường cong Hilbert (space-filling curve)
+    
+    Tọa độ được chia lưới 2^order x 2^order và chỉ số Hilbert của mọi thành
+    phố được tính cùng lúc bằng numpy, nên chi phí chủ yếu là một lần argsort.
+    
+    Args:
+        tsp: Đối tượng TSProblem
+        order: Bậc của đường cong
+        
+    Returns:
+        Danh sách chỉ số thành phố theo thứ tự đi
+    """
+    coords = np.asarray(tsp.city_coords, dtype=np.float64)
+    side = 1 << order
+    origin = coords.min(axis=0)
+    extent = max(float((coords.max(axis=0) - origin).max()), 1e-12)
+    cells = ((coords - origin) / extent * (side - 1)).astype(np.int64)
+    x, y = cells[:, 0], cells[:, 1]
+    
+    index = np.zeros(len(coords), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        # Xoay/lật góc phần tư để đường cong con có đúng hướng
+        flip = ~ry
+        mirror = flip & rx
+        x = np.where(mirror, side - 1 - x, x)
+        y = np.where(mirror, side - 1 - y, y)
+        x, y = np.where(flip, y, x), np.where(flip, x, y)
+        s >>= 1
+    return np.argsort(index, kind='stable').tolist()
+
+
+def farthest_insertion_route(tsp, start: int = 0) -> List[int]:
+    """
+    Dựng tuyến bằng farthest insertion: chèn thành phố xa tuyến nhất vào vị trí rẻ nhất
+    
+    Mỗi bước là vài phép toán vector trên một hàng khoảng cách, tổng cộng O(n²).
+    
+    Args:
+        tsp: Đối tượng TSProblem
+        start: Thành phố xuất phát
+        
+    Returns:
+        Danh sách chỉ số thành phố theo thứ tự đi
+    """
+    n = tsp.num_cities
+    tour = np.array([start])
+    edge_lengths = np.zeros(1)  # edge_lengths[i] = d(tour[i], tour[i + 1])
+    # Khoảng cách từ mỗi thành phố tới tuyến; -inf đánh dấu thành phố đã nằm trong tuyến
+    to_tour = np.array(tsp.get_distance_row(start), dtype=np.float64)
+    to_tour[start] = -np.inf
+    
+    for _ in range(n - 1):
+        city = int(np.argmax(to_tour))
+        row = np.asarray(tsp.get_distance_row(city), dtype=np.float64)
+        before, after = row[tour], row[np.roll(tour, -1)]
+        position = int(np.argmin(before + after - edge_lengths))
+        edge_lengths[position] = before[position]
+        edge_lengths = np.insert(edge_lengths, position + 1, after[position])
+        tour = np.insert(tour, position + 1, city)
+        np.minimum(to_tour, row, out=to_tour)
+        to_tour[city] = -np.inf
+    return tour.tolist()
+
+
+def cheapest_insertion_route(tsp, start: int = 0) -> List[int]:
+    """
+    Dựng tuyến bằng cheapest insertion: mỗi bước chèn thành phố có chi phí chèn nhỏ nhất
+    
+    Mỗi thành phố ngoài tuyến giữ chi phí chèn tốt nhất và cạnh tương ứng; sau
+    mỗi lần chèn chỉ cần so với 2 cạnh mới (vector). Thành phố có cạnh tốt nhất
+    vừa bị phá giữ giá trị cũ làm cận dưới và chỉ được tính lại khi nó được chọn.
+    
+    Args:
+        tsp: Đối tượng TSProblem
+        start: Thành phố xuất phát
+        
+    Returns:
+        Danh sách chỉ số thành phố theo thứ tự đi
+    """
+    n = tsp.num_cities
+    
+    def row_of(city):
+        return np.asarray(tsp.get_distance_row(city), dtype=np.float64)
+    
+    # Tuyến lưu dạng danh sách liên kết: cạnh (a, successor[a]) được định danh bởi a
+    successor = np.arange(n)
+    edge_length = np.zeros(n)
+    tour = np.empty(n, dtype=np.int64)  # tour[:size] = các thành phố đã chèn
+    slot = np.empty(n, dtype=np.int64)  # slot[tour[i]] = i
+    tour[0], slot[start], size = start, 0, 1
+    outside = np.ones(n, dtype=bool)
+    outside[start] = False
+    best_cost = 2 * row_of(start)
+    best_cost[start] = np.inf
+    best_edge = np.full(n, start)
+    stale = np.zeros(n, dtype=bool)
+    
+    for _ in range(n - 1):
+        while True:
+            city = int(np.argmin(best_cost))
+            if not stale[city]:
+                break
+            # Giá trị cũ chỉ là cận dưới: tính lại chính xác trên mọi cạnh rồi chọn lại
+            members = tour[:size]
+            to_members = tsp._pair_distances(np.full(size, city), members)
+            costs = to_members + to_members[slot[successor[members]]] - edge_length[members]
+            best = int(np.argmin(costs))
+            best_cost[city], best_edge[city] = costs[best], members[best]
+            stale[city] = False
+        
+        a = int(best_edge[city])
+        b = int(successor[a])
+        row_a, row_c, row_b = row_of(a), row_of(city), row_of(b)
+        successor[a], successor[city] = city, b
+        edge_length[a], edge_length[city] = row_c[a], row_c[b]
+        tour[size], slot[city] = city, size
+        size += 1
+        outside[city] = False
+        best_cost[city] = np.inf
+        stale |= outside & (best_edge == a)
+        
+        # Mọi thành phố ngoài tuyến: so với 2 cạnh mới (a, city) và (city, b); giá
+        # trị mới nhỏ hơn cận dưới cũ thì chắc chắn là tốt nhất
+        for edge, cost in ((a, row_a + row_c - edge_length[a]),
+                           (city, row_c + row_b - edge_length[city])):
+            better = outside & (cost < best_cost)
+            best_cost[better] = cost[better]
+            best_edge[better] = edge
+            stale[better] = False
+    
+    route = [start]
+    city = int(successor[start])
+    while city != start:
+        route.append(city)
+        city = int(successor[city])
+    return route
+
+
+def double_bridge(route: List[int], rng) -> List[int]:
+    """
+    Nhiễu double-bridge: cắt tuyến thành 4 đoạn A B C D và ghép lại thành A C B D
+    
+    Chỉ thay 4 cạnh nên giữ được phần lớn cấu trúc của tuyến; dùng để tạo
+    các biến thể khác nhau của cùng một tuyến dựng sẵn.
+    
+    Args:
+        route: Tuyến đường gốc (không bị sửa)
+        rng: RandomStream dùng để chọn điểm cắt
+        
+    Returns:
+        Tuyến đường mới
+    """
+    n = len(route)
+    if n < 4:
+        return list(route)
+    i, j, k = sorted(rng.generator.choice(np.arange(1, n), size=3, replace=False).tolist())
+    return route[:i] + route[j:k] + route[i:j] + route[k:]
+
+
+# Tên phương pháp -> hàm dựng tuyến; các phương pháp có tham số start nhận
+# thành phố xuất phát ngẫu nhiên khi có rng
+CONSTRUCTION_METHODS = {
+    'nearest_neighbor': nearest_neighbor_route,
+    'greedy': greedy_edge_route,
+    'hilbert': hilbert_route,
+    'cheapest_insertion': cheapest_insertion_route,
+    'farthest_insertion': farthest_insertion_route,
+}
+STARTING_METHODS = ('nearest_neighbor', 'cheapest_insertion', 'farthest_insertion')
+INIT_METHODS = ('random',) + tuple(CONSTRUCTION_METHODS)
+
+
+def construct_route(tsp, method: str = 'greedy', rng=None, start: Optional[int] = None) -> List[int]:
+    """
+    Dựng một tuyến đường khởi đầu bằng phương pháp cho trước
+    
+    Args:
+        tsp: Đối tượng TSProblem
+        method: Một trong INIT_METHODS ('random' = hoán vị ngẫu nhiên)
+        rng: RandomStream (hoặc np.random.Generator cho 'random'); dùng để chọn
+             thành phố xuất phát khi start là None
+        start: Thành phố xuất phát cho các phương pháp trong STARTING_METHODS
+        
+    Returns:
+        Danh sách chỉ số thành phố theo thứ tự đi
+        
+    Raises:
+        ValueError: Nếu method hoặc start không hợp lệ
+    """
+    if method not in INIT_METHODS:
+        raise ValueError(f"Phương pháp khởi tạo phải thuộc {INIT_METHODS}, nhận được: {method}")
+    if method == 'random':
+        return tsp.generate_random_route(rng)
+    if method not in STARTING_METHODS:
+        return CONSTRUCTION_METHODS[method](tsp)
+    
+    if start is None:
+        start = rng.randrange(tsp.num_cities) if rng is not None else 0
+    if not 0 <= start < tsp.num_cities:
+        raise ValueError(f"Thành phố xuất phát phải trong [0, {tsp.num_cities - 1}], nhận được: {start}")
+    return CONSTRUCTION_METHODS[method](tsp, start)
@@ -7,19 +7,65 @@ import matplotlib
 # Set backend trước khi import pyplot để tránh lỗi trên một số hệ thống
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+import queue
 import threading
 import time
 
 from tsp_problem import TSProblem
 from simulated_annealing import SimulatedAnnealing
 from woa_algorithm import WOA
+from cancellation import CancellationToken
+from solver_process import SolverProcess
+
+
+def _decimate_min_max(x, y, buckets):
+    """
+    Rút gọn một đường (x tăng dần) bằng cách giữ điểm nhỏ nhất và lớn nhất trong mỗi cột
+    
+    Với buckets bằng số pixel chiều ngang, đường đã rút gọn vẽ ra giống hệt
+    đường đầy đủ nhưng chỉ còn tối đa 2 * buckets + 2 điểm.
+    
+    Args:
+        x: Mảng hoành độ tăng dần
+        y: Mảng tung độ cùng độ dài
+        buckets: Số cột
+        
+    Returns:
+        Tuple (x, y) đã rút gọn, giữ nguyên thứ tự và hai điểm đầu/cuối
+    """
+    n = len(x)
+    edges = np.linspace(x[0], x[-1], buckets + 1)[:-1]
+    starts = np.unique(np.searchsorted(x, edges, side='left'))
+    counts = np.diff(np.append(starts, n))
+    segment = np.repeat(np.arange(len(starts)), counts)
+    keep = [np.array([0, n - 1])]
+    for reduce in (np.minimum, np.maximum):
+        # Chỉ số đầu tiên trong mỗi cột đạt giá trị cực trị của cột đó
+        hits = np.flatnonzero(y == np.repeat(reduce.reduceat(y, starts), counts))
+        first = np.ones(len(hits), dtype=bool)
+        first[1:] = segment[hits[1:]] != segment[hits[:-1]]
+        keep.append(hits[first])
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
 
 
 class TSPApplication:
     """Lớp ứng dụng GUI cho bài toán TSP"""
     
+    # Số lần vẽ lại tối đa mỗi giây khi thuật toán đang chạy
+    PROGRESS_FPS = 10
+    # Sức chứa hàng đợi tiến độ (thông điệp cũ nhất bị bỏ khi đầy)
+    PROGRESS_QUEUE_SIZE = 64
+    # Chỉ đánh số thành phố khi số thành phố không vượt quá ngưỡng này
+    MAP_LABEL_LIMIT = 60
+    # Hệ số nới trục x khi đồ thị hội tụ chạm mép phải (tránh đổi trục liên tục)
+    CONVERGENCE_HEADROOM = 1.5
+    # Số giây chờ tiến trình con tự dừng sau khi nhấn Dừng trước khi dừng hẳn nó
+    STOP_TIMEOUT = 5.0
+    
     def __init__(self, root):
         """
         Khởi tạo ứng dụng
@@ -36,8 +82,27 @@ class TSPApplication:
         self.tsp_problem = None
         self.current_algorithm = None
         self.is_running = False
+        self.cancel_token = None  # CancellationToken của lần chạy hiện tại
+        self._stop_requested_at = None  # Thời điểm (perf_counter) nhấn Dừng, None = chưa dừng
+        self.solver_process = None  # SolverProcess của lần chạy hiện tại (chế độ tiến trình)
+        self.race_window = None  # RaceWindow đang mở (chế độ đua SA vs WOA)
+        # Hàng đợi tiến độ: thread thuật toán đẩy vào, main thread rút ra qua root.after
+        self.progress_queue = queue.Queue(maxsize=self.PROGRESS_QUEUE_SIZE)
+        self._run_id = 0  # Đánh dấu thông điệp theo lần chạy
+        self._poll_id = None
+        # Các artist của bản đồ được giữ lại giữa các lần cập nhật (xem _reset_map)
+        self._map_problem = None
+        self._route_line = None
+        self._backgrounds = {}  # Axes -> nền đã chụp để blit
+        # Đồ thị hội tụ: dữ liệu tích lũy dần từ history của thuật toán (xem _reset_convergence)
+        self._convergence_source = None
+        self._convergence_line = None
+        self._convergence_data = np.empty((0, 2))
+        self._convergence_len = 0
         self.best_route = None
         self.best_distance = None
+        # Tiến trình con không phải daemon: phải dừng khi đóng cửa sổ chính
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         
         # Tạo giao diện
         self._create_widgets()
@@ -73,6 +138,11 @@ class TSPApplication:
         ttk.Radiobutton(algo_frame, text="WOA (Whale Optimization)", 
                         variable=self.algorithm_var, value="WOA").grid(row=1, column=0, sticky=tk.W)
         
+        # Chạy thuật toán trong tiến trình con: thuật toán và giao diện không tranh nhau GIL
+        self.use_process_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(algo_frame, text="Chạy trong tiến trình riêng",
+                        variable=self.use_process_var).grid(row=2, column=0, sticky=tk.W)
+        
         # Phần tham số Simulated Annealing
         sa_frame = ttk.LabelFrame(control_frame, text="Tham số Simulated Annealing", padding="10")
         sa_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
@@ -125,6 +195,10 @@ class TSPApplication:
                                         command=self._export_results, state=tk.DISABLED)
         self.export_button.grid(row=1, column=0, columnspan=2, pady=5, padx=2, sticky=(tk.W, tk.E))
         
+        self.race_button = ttk.Button(button_frame, text="Đua SA vs WOA", 
+                                      command=self._run_race)
+        self.race_button.grid(row=2, column=0, columnspan=2, pady=5, padx=2, sticky=(tk.W, tk.E))
+        
         # Thanh tiến trình
         self.progress_var = tk.StringVar(value="Chưa chạy")
         ttk.Label(control_frame, textvariable=self.progress_var, 
@@ -160,6 +234,7 @@ class TSPApplication:
         
         # Embed matplotlib vào tkinter
         self.canvas = FigureCanvasTkAgg(self.fig, master=viz_frame)
+        self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
@@ -287,11 +362,13 @@ class TSPApplication:
         except Exception as e:
             messagebox.showerror("Lỗi", f"Không thể tạo bài toán: {str(e)}")
     
-    def _draw_map(self, route=None):
+    def _reset_map(self):
         """
-        Vẽ bản đồ thành phố và tuyến đường
-        Args:
-            route: Tuyến đường cần vẽ (None nếu chỉ vẽ thành phố)
+        Dựng lại lớp tĩnh của bản đồ cho bài toán hiện tại
+        
+        Thành phố là một scatter duy nhất, tuyến đường là một Line2D duy nhất
+        (animated) được cập nhật bằng set_data, nên mỗi lần cập nhật chỉ phải
+        vẽ lại đường đi thay vì dựng lại hàng trăm artist.
         """
         self.ax_map.clear()
         
@@ -299,68 +376,273 @@ class TSPApplication:
         coords = self.tsp_problem.get_city_coords()
         self.ax_map.scatter(coords[:, 0], coords[:, 1], c='red', s=100, zorder=5)
         
-        # Đánh số thành phố
-        for i, (x, y) in enumerate(coords):
-            self.ax_map.annotate(str(i), (x, y + 2), fontsize=8, ha='center', va='bottom')
-
-        # Vẽ tuyến đường nếu có
-        if route is not None:
-            for i in range(len(route)):
-                city1 = route[i]
-                city2 = route[(i + 1) % len(route)]
-                x1, y1 = coords[city1]
-                x2, y2 = coords[city2]
-                self.ax_map.plot([x1, x2], [y1, y2], 'b-', alpha=0.6, linewidth=1.5)
+        # Đánh số thành phố (bỏ qua khi quá nhiều thành phố vì nhãn chồng lên nhau)
+        if len(coords) <= self.MAP_LABEL_LIMIT:
+            for i, (x, y) in enumerate(coords):
+                self.ax_map.annotate(str(i), (x, y + 2), fontsize=8, ha='center', va='bottom')
+        
+        # Đường đi: vẽ riêng bằng blit, không nằm trong nền tĩnh
+        self._route_line, = self.ax_map.plot([], [], 'b-', alpha=0.6, linewidth=1.5,
+                                             animated=True)
         self.ax_map.set_title("Bản đồ thành phố và tuyến đường tốt nhất")
         self.ax_map.set_xlabel("X")
         self.ax_map.set_ylabel("Y")
         self.ax_map.grid(True, alpha=0.3)
+        self._map_problem = self.tsp_problem
         self.canvas.draw()
     
-    def _draw_convergence(self, history):
+    def _draw_map(self, route=None, draw=True):
+        """
+        Vẽ bản đồ thành phố và tuyến đường
+        Args:
+            route: Tuyến đường cần vẽ (None nếu chỉ vẽ thành phố)
+            draw: Nếu False, không vẽ lại canvas (người gọi tự vẽ một lần)
+        """
+        if self._map_problem is not self.tsp_problem or self._route_line is None:
+            self._reset_map()
+        
+        # Cập nhật dữ liệu đường đi khép kín (quay về thành phố đầu)
+        if route is not None and len(route) > 0:
+            coords = self.tsp_problem.get_city_coords()
+            closed = coords[np.append(route, route[0])]
+            self._route_line.set_data(closed[:, 0], closed[:, 1])
+        else:
+            self._route_line.set_data([], [])
+        if draw:
+            self._blit(self.ax_map)
+    
+    def _on_canvas_draw(self, event):
+        """
+        Sau mỗi lần vẽ lại toàn bộ (khởi tạo, đổi kích thước...): chụp lại nền
+        của từng trục rồi vẽ các artist animated lên trên
+        """
+        for ax in (self.ax_map, self.ax_convergence):
+            self._backgrounds[ax] = self.canvas.copy_from_bbox(ax.bbox)
+            self._draw_animated(ax)
+    
+    def _draw_animated(self, ax):
+        """Vẽ các artist animated của một trục lên canvas hiện tại"""
+        for artist in ax.get_children():
+            if artist.get_animated():
+                ax.draw_artist(artist)
+    
+    def _blit(self, ax):
+        """Chỉ vẽ lại các artist animated của một trục trên nền đã chụp"""
+        background = self._backgrounds.get(ax)
+        if background is None:
+            self.canvas.draw()  # Chưa có nền: draw_event sẽ chụp và vẽ animated
+            return
+        self.canvas.restore_region(background)
+        self._draw_animated(ax)
+        self.canvas.blit(ax.bbox)
+    
+    def _reset_convergence(self, history):
+        """
+        Dựng lại đồ thị hội tụ rỗng cho một history mới
+        
+        Đường hội tụ là một Line2D animated duy nhất; các điểm mới của history
+        được nối thêm vào bộ đệm thay vì vẽ lại toàn bộ history mỗi lần.
+        """
+        self.ax_convergence.clear()
+        self._convergence_line, = self.ax_convergence.plot([], [], 'b-', linewidth=2,
+                                                           animated=True)
+        self.ax_convergence.set_title("Đồ thị hội tụ")
+        self.ax_convergence.set_xlabel("Iteration")
+        self.ax_convergence.set_ylabel("Distance")
+        self.ax_convergence.grid(True, alpha=0.3)
+        self.ax_convergence.set_xlim(0, 1)
+        self._convergence_source = history
+        self._convergence_len = 0
+    
+    def _draw_convergence(self, history, draw=True):
         """
         Vẽ đồ thị hội tụ
         Args:
             history: Lịch sử quá trình tìm kiếm [(iteration, distance), ...]
+            draw: Nếu False, không vẽ lại canvas (người gọi tự vẽ một lần)
+            
+        Returns:
+            True nếu giới hạn trục đã đổi (cần vẽ lại toàn bộ canvas thay vì blit)
         """
-        self.ax_convergence.clear()
-        if len(history) > 0:
-            iterations, distances = zip(*history)
-            self.ax_convergence.plot(iterations, distances, 'b-', linewidth=2)
-            self.ax_convergence.set_title("Đồ thị hội tụ")
-            self.ax_convergence.set_xlabel("Iteration")
-            self.ax_convergence.set_ylabel("Distance")
-            self.ax_convergence.grid(True, alpha=0.3)
-        self.canvas.draw()
-    def _update_callback(self, route, distance, iteration):
+        rescaled = False
+        count = len(history)
+        if (history is not self._convergence_source or self._convergence_line is None
+                or count < self._convergence_len):
+            self._reset_convergence(history)
+            rescaled = True
+        
+        # Chỉ nối thêm các điểm mới (history chỉ được append trong lúc chạy)
+        if count > self._convergence_len:
+            new_points = history[self._convergence_len:count]
+            if count > len(self._convergence_data):
+                grown = np.empty((max(count, 2 * len(self._convergence_data)), 2))
+                grown[:self._convergence_len] = self._convergence_data[:self._convergence_len]
+                self._convergence_data = grown
+            self._convergence_data[self._convergence_len:count] = new_points
+            self._convergence_len = count
+        
+        if self._convergence_len > 0:
+            x, y = self._convergence_data[:self._convergence_len].T
+            
+            # Chỉ đổi giới hạn trục khi dữ liệu vượt ra ngoài khung hiện tại
+            x_low, x_high = self.ax_convergence.get_xlim()
+            if x[-1] > x_high or x[0] < x_low:
+                self.ax_convergence.set_xlim(x[0], max(x[-1] * self.CONVERGENCE_HEADROOM, x[0] + 1))
+                rescaled = True
+            y_min, y_max = y.min(), y.max()
+            y_low, y_high = self.ax_convergence.get_ylim()
+            if rescaled or y_min < y_low or y_max > y_high:
+                # Chừa nhiều chỗ phía dưới hơn vì khoảng cách tốt nhất chỉ giảm dần
+                span = max(y_max - y_min, 1.0)
+                self.ax_convergence.set_ylim(max(y_min - 0.25 * span, 0.0), y_max + 0.05 * span)
+                rescaled = True
+            
+            # History dài: rút gọn còn 2 điểm (min/max) cho mỗi pixel chiều ngang
+            buckets = max(int(self.ax_convergence.bbox.width), 1)
+            if len(x) > 2 * buckets:
+                x, y = _decimate_min_max(x, y, buckets)
+            self._convergence_line.set_data(x, y)
+        
+        if draw:
+            if rescaled:
+                self.canvas.draw()
+            else:
+                self._blit(self.ax_convergence)
+        return rescaled
+    
+    def _update_callback(self, route, distance, iteration, run_id=None):
         """
-        Callback để cập nhật giao diện trong quá trình chạy thuật toán
+        Callback của thuật toán (chạy trên thread của thuật toán)
+        
+        Chỉ đẩy một bản chụp nhẹ vào hàng đợi tiến độ, không đụng tới Tk; việc
+        vẽ do _poll_progress trên main thread đảm nhận.
         
         Args:
             route: Tuyến đường hiện tại
             distance: Khoảng cách hiện tại
             iteration: Vòng lặp hiện tại
+            run_id: Lần chạy phát ra bản chụp (mặc định: lần chạy hiện tại)
         """
         if not self.is_running:
             return
-        self.best_route = route
-        self.best_distance = distance
-        # Cập nhật progress
-        self.progress_var.set(f"Iteration: {iteration} | Distance: {distance:.2f}")
-        # Cập nhật bản đồ
-        self._draw_map(route)
-        # Cập nhật đồ thị hội tụ
-        if self.current_algorithm:
-            if hasattr(self.current_algorithm, 'history'):
-                self._draw_convergence(self.current_algorithm.history)
-        self.root.update()
-    def _validate_algorithm_params(self):
+        if run_id is None:
+            run_id = self._run_id
+        # Sao chép tuyến: thuật toán có thể sửa danh sách này ở các vòng lặp sau
+        self._post_progress(('progress', run_id, list(route), float(distance), iteration))
+    
+    def _post_progress(self, message):
+        """
+        Đẩy một thông điệp vào hàng đợi tiến độ (an toàn từ mọi thread)
+        
+        Hàng đợi có giới hạn: khi đầy, thông điệp cũ nhất bị bỏ vì giao diện chỉ
+        cần bản chụp mới nhất, nên thuật toán không bao giờ phải chờ giao diện.
+        """
+        while True:
+            try:
+                self.progress_queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.progress_queue.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _poll_progress(self):
+        """
+        Rút hết hàng đợi tiến độ trên main thread (gọi định kỳ bằng root.after)
+        
+        Các bản chụp tiến độ được gộp lại: chỉ bản mới nhất được vẽ, tối đa
+        PROGRESS_FPS lần mỗi giây. Thông điệp kết thúc ('done'/'error') được xử
+        lý tại đây thay vì trên thread của thuật toán.
+        """
+        self._poll_id = None
+        if self.solver_process is not None:
+            self._forward_process_messages()
+        latest = None
+        finished = None
+        while True:
+            try:
+                message = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message[1] != self._run_id:
+                continue  # Thông điệp muộn của lần chạy trước
+            if message[0] == 'progress':
+                latest = message
+            else:
+                finished = message
+        
+        if latest is not None and self.is_running:
+            _, _, route, distance, iteration = latest
+            self.best_route = route
+            self.best_distance = distance
+            if self._stop_requested_at is None:
+                self.progress_var.set(f"Iteration: {iteration} | Distance: {distance:.2f}")
+            self._draw_map(route, draw=False)
+            rescaled = False
+            if self.current_algorithm is not None:
+                rescaled = self._draw_convergence(self.current_algorithm.history, draw=False)
+            if rescaled:
+                # Trục đổi: vẽ lại toàn bộ, các đường được vẽ lại trong _on_canvas_draw
+                self.canvas.draw_idle()
+            else:
+                self._blit(self.ax_map)
+                self._blit(self.ax_convergence)
+        
+        if finished is not None:
+            if finished[0] == 'done':
+                self._finish_run(*finished[2:])
+            else:
+                self._fail_run(*finished[2:])
+        elif self.is_running:
+            self._poll_id = self.root.after(1000 // self.PROGRESS_FPS, self._poll_progress)
+    
+    def _forward_process_messages(self):
+        """
+        Chuyển thông điệp của tiến trình con vào hàng đợi tiến độ (main thread)
+        
+        Nhờ vậy phần còn lại của _poll_progress xử lý chế độ tiến trình giống
+        hệt chế độ thread.
+        """
+        process = self.solver_process
+        # Kiểm tra trước khi rút: tiến trình đã kết thúc thì mọi thông điệp đã nằm trong hàng đợi
+        alive = process.is_alive()
+        for message in process.poll():
+            if message[0] == 'progress':
+                _, route, distance, iteration, _, _ = message
+                self._post_progress(('progress', self._run_id, route, distance, iteration))
+            elif message[0] == 'done':
+                _, route, distance, _, elapsed, _ = message
+                self._post_progress(('done', self._run_id, route, distance,
+                                     process.solver.history, elapsed))
+            else:
+                self._post_progress(('error', self._run_id, *self._describe_error(message[1])))
+        
+        if (alive and not process.finished and self._stop_requested_at is not None
+                and time.perf_counter() - self._stop_requested_at > self.STOP_TIMEOUT):
+            # Tiến trình con không phản hồi yêu cầu dừng: dừng hẳn, giữ kết quả đã nhận
+            process.terminate()
+            if process.best_route is not None:
+                self._post_progress(('done', self._run_id, process.best_route, process.best_distance,
+                                     process.solver.history, process.elapsed))
+            else:
+                self._post_progress(('error', self._run_id, None, None, "Đã dừng"))
+        elif not alive and not process.finished:
+            # Tiến trình con chết mà không kịp gửi kết quả (hết bộ nhớ, bị hệ điều hành dừng...)
+            self._post_progress(('error', self._run_id, "Lỗi",
+                                 f"Tiến trình giải kết thúc bất thường (mã thoát: {process.exitcode}).",
+                                 "Lỗi: Tiến trình giải dừng bất thường"))
+        # Tiến trình con được thu dọn trong _end_run, khi thông điệp kết thúc được xử lý
+
+    def _validate_algorithm_params(self, algorithm_type=None):
         """
         Validate các tham số thuật toán trước khi chạy
+        Args:
+            algorithm_type: 'SA' hoặc 'WOA' (None = thuật toán đang được chọn)
         Returns:
             True nếu tất cả tham số hợp lệ, False nếu không
         """
-        algorithm_type = self.algorithm_var.get()
+        algorithm_type = algorithm_type or self.algorithm_var.get()
         try:
             if algorithm_type == "SA":
                 # Validate Simulated Annealing parameters
@@ -452,50 +734,95 @@ class TSPApplication:
             )
             return False
     
-    def _run_algorithm_thread(self):
-        """Chạy thuật toán trong thread riêng"""
-        try:
-            algorithm_type = self.algorithm_var.get()
-            
-            if algorithm_type == "SA":
-                # Simulated Annealing
-                self.current_algorithm = SimulatedAnnealing(
-                    self.tsp_problem,
-                    initial_temp=self.sa_temp_var.get(),
-                    cooling_rate=self.sa_cooling_var.get(),
-                    max_iterations=self.sa_iterations_var.get()
-                )
-            else:
-                # WOA
-                self.current_algorithm = WOA(
-                    self.tsp_problem,
-                    num_whales=self.woa_whales_var.get(),
-                    max_iterations=self.woa_iterations_var.get(),
-                    b=self.woa_b_var.get(),
-                    a_max=self.woa_a_var.get()
-                )
+    def _algorithm_params(self, algorithm_type=None):
+        """
+        Lấy thuật toán được chọn và tham số của nó từ giao diện
+        
+        Args:
+            algorithm_type: 'SA' hoặc 'WOA' (None = thuật toán đang được chọn)
             
-            # Chạy thuật toán
+        Returns:
+            Tuple (tên thuật toán 'SA'/'WOA', dict tham số cho hàm khởi tạo)
+        """
+        if (algorithm_type or self.algorithm_var.get()) == "SA":
+            # Simulated Annealing
+            return "SA", {
+                'initial_temp': self.sa_temp_var.get(),
+                'cooling_rate': self.sa_cooling_var.get(),
+                'max_iterations': self.sa_iterations_var.get()
+            }
+        # WOA
+        return "WOA", {
+            'num_whales': self.woa_whales_var.get(),
+            'max_iterations': self.woa_iterations_var.get(),
+            'b': self.woa_b_var.get(),
+            'a_max': self.woa_a_var.get()
+        }
+    
+    def _create_algorithm(self):
+        """Tạo đối tượng thuật toán từ các tham số trên giao diện (main thread)"""
+        name, params = self._algorithm_params()
+        algorithm_class = SimulatedAnnealing if name == "SA" else WOA
+        return algorithm_class(self.tsp_problem, **params)
+    
+    def _describe_error(self, error):
+        """
+        Tạo nội dung thông báo cho lỗi của thuật toán
+        
+        Returns:
+            Tuple (tiêu đề, nội dung, trạng thái); tiêu đề None nếu không cần hộp thoại
+        """
+        if isinstance(error, ValueError):
+            return ("Lỗi giá trị",
+                    f"Giá trị tham số không hợp lệ:\n{str(error)}\n\nVui lòng kiểm tra lại các tham số đầu vào.",
+                    "Lỗi: Giá trị không hợp lệ")
+        if isinstance(error, MemoryError):
+            return ("Lỗi bộ nhớ",
+                    "Không đủ bộ nhớ để chạy thuật toán.\n\nHãy thử giảm số thành phố hoặc số vòng lặp.",
+                    "Lỗi: Không đủ bộ nhớ")
+        if isinstance(error, KeyboardInterrupt):
+            return None, None, "Đã dừng bởi người dùng"
+        return ("Lỗi",
+                f"Có lỗi xảy ra khi chạy thuật toán:\n\n{type(error).__name__}: {str(error)}\n\nVui lòng kiểm tra lại cấu hình.",
+                f"Lỗi: {type(error).__name__}")
+    
+    def _run_algorithm_thread(self, algorithm, run_id, cancel_token):
+        """
+        Chạy thuật toán trong thread riêng
+        
+        Thread này không đụng tới Tk: kết quả hoặc lỗi được gửi qua hàng đợi
+        tiến độ để main thread hiển thị.
+        """
+        try:
             start_time = time.time()
-            best_route, best_distance, history = self.current_algorithm.solve(
-                callback=self._update_callback
+            best_route, best_distance, history = algorithm.solve(
+                callback=lambda route, distance, iteration:
+                    self._update_callback(route, distance, iteration, run_id),
+                cancel_token=cancel_token
             )
             end_time = time.time()
-            
+            self._post_progress(('done', run_id, best_route, best_distance, history,
+                                 end_time - start_time))
+        except (Exception, KeyboardInterrupt) as e:
+            self._post_progress(('error', run_id, *self._describe_error(e)))
+    
+    def _finish_run(self, best_route, best_distance, history, elapsed):
+        """Hiển thị kết quả khi thuật toán kết thúc (main thread)"""
+        try:
             if not self.is_running:
                 return
             
             # Hiển thị kết quả
             self.best_route = best_route
             self.best_distance = best_distance
-            self._last_run_time = end_time - start_time
+            self._last_run_time = elapsed
             
             self.result_text.delete(1.0, tk.END)
             info = self.current_algorithm.get_algorithm_info()
             self.result_text.insert(tk.END, f"Thuật toán: {info['name']}\n")
             self.result_text.insert(tk.END, f"\n{'='*35}\n")
             self.result_text.insert(tk.END, f"Khoảng cách tốt nhất: {best_distance:.2f}\n")
-            self.result_text.insert(tk.END, f"Thời gian: {end_time - start_time:.2f}s\n")
+            self.result_text.insert(tk.END, f"Thời gian: {elapsed:.2f}s\n")
             self.result_text.insert(tk.END, f"Số thành phố: {len(best_route)}\n")
             self.result_text.insert(tk.END, f"\nTuyến đường:\n")
             # Hiển thị tối đa 20 thành phố
@@ -512,32 +839,30 @@ class TSPApplication:
             self._draw_map(best_route)
             self._draw_convergence(history)
             
-            self.progress_var.set("Hoàn thành!")
-            
-        except ValueError as e:
-            messagebox.showerror(
-                "Lỗi giá trị",
-                f"Giá trị tham số không hợp lệ:\n{str(e)}\n\nVui lòng kiểm tra lại các tham số đầu vào."
-            )
-            self.progress_var.set("Lỗi: Giá trị không hợp lệ")
-        except MemoryError:
-            messagebox.showerror(
-                "Lỗi bộ nhớ",
-                "Không đủ bộ nhớ để chạy thuật toán.\n\nHãy thử giảm số thành phố hoặc số vòng lặp."
-            )
-            self.progress_var.set("Lỗi: Không đủ bộ nhớ")
-        except KeyboardInterrupt:
-            self.progress_var.set("Đã dừng bởi người dùng")
-        except Exception as e:
-            messagebox.showerror(
-                "Lỗi",
-                f"Có lỗi xảy ra khi chạy thuật toán:\n\n{type(e).__name__}: {str(e)}\n\nVui lòng kiểm tra lại cấu hình."
-            )
-            self.progress_var.set(f"Lỗi: {type(e).__name__}")
+            if self.current_algorithm.stop_reason == 'cancelled':
+                self.progress_var.set("Đã dừng (kết quả tốt nhất đến lúc dừng)")
+            else:
+                self.progress_var.set("Hoàn thành!")
         finally:
-            self.is_running = False
-            self.run_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
+            self._end_run()
+    
+    def _fail_run(self, title, message, status):
+        """Báo lỗi khi thuật toán kết thúc bất thường (main thread)"""
+        try:
+            if title is not None:
+                messagebox.showerror(title, message)
+            self.progress_var.set(status)
+        finally:
+            self._end_run()
+    
+    def _end_run(self):
+        """Thu dọn tiến trình con (nếu có) và đưa các nút về trạng thái chờ"""
+        if self.solver_process is not None:
+            self.solver_process.close()
+            self.solver_process = None
+        self.is_running = False
+        self.run_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
     
     def _run_algorithm(self):
         """Bắt đầu chạy thuật toán"""
@@ -569,24 +894,104 @@ class TSPApplication:
             if not response:
                 return
         
+        try:
+            if self.use_process_var.get():
+                # Đối tượng đại diện kiểm tra tham số ngay và nhận kết quả từ tiến trình con
+                name, params = self._algorithm_params()
+                self.solver_process = SolverProcess(self.tsp_problem, name, params)
+                self.current_algorithm = self.solver_process.solver
+            else:
+                self.solver_process = None
+                self.current_algorithm = self._create_algorithm()
+        except ValueError as e:
+            messagebox.showerror(
+                "Lỗi giá trị",
+                f"Giá trị tham số không hợp lệ:\n{str(e)}\n\nVui lòng kiểm tra lại các tham số đầu vào."
+            )
+            self.progress_var.set("Lỗi: Giá trị không hợp lệ")
+            return
+        
         self.is_running = True
+        self.cancel_token = CancellationToken()
+        self._stop_requested_at = None
+        self._run_id += 1
         self.run_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.export_button.config(state=tk.DISABLED)
         self.progress_var.set("Đang chạy...")
         
-        # Chạy trong thread riêng để không block GUI
-        thread = threading.Thread(target=self._run_algorithm_thread)
-        thread.daemon = True
-        thread.start()
+        if self.solver_process is not None:
+            # Chạy trong tiến trình con; _poll_progress chuyển tiếp tiến độ về
+            self.solver_process.start()
+        else:
+            # Chạy trong thread riêng để không block GUI
+            thread = threading.Thread(target=self._run_algorithm_thread,
+                                      args=(self.current_algorithm, self._run_id, self.cancel_token))
+            thread.daemon = True
+            thread.start()
+        
+        # Main thread rút hàng đợi tiến độ định kỳ
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+        self._poll_id = self.root.after(1000 // self.PROGRESS_FPS, self._poll_progress)
+    
+    def _run_race(self):
+        """Mở cửa sổ đua: chạy SA và WOA đồng thời trên cùng bài toán"""
+        if self.tsp_problem is None:
+            messagebox.showwarning(
+                "Cảnh báo",
+                "Vui lòng tạo bài toán trước!\n\nNhấn nút 'Tạo bài toán mới' để bắt đầu."
+            )
+            return
+        
+        # Chỉ mở một cuộc đua tại một thời điểm
+        if self.race_window is not None and not self.race_window.closed:
+            self.race_window.window.lift()
+            return
+        
+        # Cả hai thuật toán đều chạy nên phải kiểm tra tham số của cả hai
+        if not (self._validate_algorithm_params("SA") and self._validate_algorithm_params("WOA")):
+            return
+        
+        try:
+            params = {name: self._algorithm_params(name)[1] for name in RaceWindow.ALGORITHMS}
+            self.race_window = RaceWindow(self.root, self.tsp_problem, params, self.PROGRESS_FPS)
+        except ValueError as e:
+            messagebox.showerror(
+                "Lỗi giá trị",
+                f"Giá trị tham số không hợp lệ:\n{str(e)}\n\nVui lòng kiểm tra lại các tham số đầu vào."
+            )
+            return
+        self.race_window.start()
     
     def _stop_algorithm(self):
-        """Dừng thuật toán"""
-        self.is_running = False
-        self.progress_var.set("Đã dừng")
-        self.run_button.config(state=tk.NORMAL)
+        """
+        Dừng thuật toán
+        
+        Thuật toán (thread hoặc tiến trình con) dừng ở điểm kiểm tra kế tiếp và
+        vẫn gửi kết quả tốt nhất hiện có; _poll_progress tiếp tục rút hàng đợi
+        tới thông điệp 'done' rồi _finish_run hiển thị kết quả đó. Tiến trình
+        con không dừng trong STOP_TIMEOUT giây thì bị dừng hẳn.
+        """
+        if not self.is_running or self._stop_requested_at is not None:
+            return
+        self._stop_requested_at = time.perf_counter()
+        if self.solver_process is not None:
+            self.solver_process.cancel()
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        self.progress_var.set("Đang dừng...")
         self.stop_button.config(state=tk.DISABLED)
     
+    def _on_close(self):
+        """Đóng ứng dụng: dừng các tiến trình con còn chạy rồi hủy cửa sổ chính"""
+        if self.race_window is not None and not self.race_window.closed:
+            self.race_window.close()
+        if self.solver_process is not None:
+            self.solver_process.terminate()
+            self.solver_process = None
+        self.root.destroy()
+    
     def _export_results(self):
         """Xuất kết quả chi tiết ra cửa sổ mới"""
         if self.best_route is None or self.best_distance is None:
@@ -839,6 +1244,178 @@ class TSPApplication:
         btn_save.pack(side=tk.LEFT, fill=tk.X, padx=(0, 5))
         btn_close.pack(side=tk.LEFT, fill=tk.X)
 
+class RaceWindow:
+    """
+    Cửa sổ đua SA vs WOA
+    
+    Hai thuật toán chạy đồng thời trên cùng một bài toán, mỗi thuật toán trong
+    một tiến trình con (SolverProcess). Cửa sổ hiển thị hai bản đồ và hai
+    đường hội tụ chồng lên nhau theo thời gian thực (giây) thay vì theo vòng
+    lặp, vì một vòng lặp WOA tốn hơn nhiều so với một vòng lặp SA.
+    
+    Attributes:
+        window: tk.Toplevel của cửa sổ đua
+        processes: Dict tên thuật toán -> SolverProcess
+        results: Dict tên thuật toán -> chuỗi kết quả khi thuật toán đã kết thúc
+        closed: True khi cửa sổ đã đóng
+    """
+    
+    ALGORITHMS = ("SA", "WOA")
+    COLORS = {"SA": "b", "WOA": "g"}
+    
+    def __init__(self, root, tsp_problem, params, refresh_fps=TSPApplication.PROGRESS_FPS):
+        """
+        Tạo cửa sổ đua (chưa khởi động các tiến trình con)
+        
+        Args:
+            root: Cửa sổ chính Tkinter
+            tsp_problem: Đối tượng TSProblem dùng chung cho cả hai thuật toán
+            params: Dict tên thuật toán -> dict tham số
+            refresh_fps: Số lần vẽ lại tối đa mỗi giây
+            
+        Raises:
+            ValueError: Nếu tham số của một thuật toán không hợp lệ
+        """
+        # Tạo tiến trình trước cửa sổ: tham số sai thì không để lại cửa sổ trống
+        self.processes = {name: SolverProcess(tsp_problem, name, params[name])
+                          for name in self.ALGORITHMS}
+        self.tsp_problem = tsp_problem
+        self.refresh_interval = 1000 // refresh_fps
+        self.curves = {name: ([], []) for name in self.ALGORITHMS}  # (thời gian, khoảng cách)
+        self.best = {}  # Tên thuật toán -> (khoảng cách, thời gian) tốt nhất đã nhận
+        self.results = {}
+        self.closed = False
+        self._poll_id = None
+        
+        self.window = tk.Toplevel(root)
+        self.window.title(f"Đua SA vs WOA - {tsp_problem.num_cities} thành phố")
+        self.window.geometry("1200x800")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        control_frame = ttk.Frame(self.window, padding="5")
+        control_frame.pack(side=tk.TOP, fill=tk.X)
+        self.status_var = tk.StringVar(value="Đang khởi động...")
+        ttk.Label(control_frame, textvariable=self.status_var,
+                  font=('Arial', 10)).pack(side=tk.LEFT, padx=5)
+        self.stop_button = ttk.Button(control_frame, text="Dừng", command=self.stop)
+        self.stop_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Hàng trên: hai bản đồ; hàng dưới: đồ thị hội tụ theo thời gian
+        self.fig = Figure(figsize=(12, 8))
+        coords = tsp_problem.get_city_coords()
+        self.map_axes = {}
+        self.route_lines = {}
+        self.curve_lines = {}
+        self.ax_convergence = self.fig.add_subplot(2, 1, 2)
+        for index, name in enumerate(self.ALGORITHMS):
+            ax = self.fig.add_subplot(2, 2, index + 1)
+            ax.scatter(coords[:, 0], coords[:, 1], c='red', s=30, zorder=5)
+            self.route_lines[name], = ax.plot([], [], self.COLORS[name] + '-',
+                                              alpha=0.6, linewidth=1.5)
+            ax.set_title(name)
+            ax.grid(True, alpha=0.3)
+            self.map_axes[name] = ax
+            self.curve_lines[name], = self.ax_convergence.plot(
+                [], [], self.COLORS[name] + '-', linewidth=2, drawstyle='steps-post', label=name)
+        self.ax_convergence.set_title("Đồ thị hội tụ theo thời gian")
+        self.ax_convergence.set_xlabel("Thời gian (s)")
+        self.ax_convergence.set_ylabel("Distance")
+        self.ax_convergence.grid(True, alpha=0.3)
+        self.ax_convergence.legend(loc='upper right')
+        self.fig.tight_layout()
+        
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.window)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def start(self):
+        """Khởi động cả hai tiến trình con và vòng cập nhật giao diện"""
+        for process in self.processes.values():
+            process.start()
+        self.status_var.set("Đang chạy...")
+        self._poll_id = self.window.after(self.refresh_interval, self._poll)
+    
+    def _poll(self):
+        """Rút thông điệp của hai tiến trình con và vẽ lại nếu có thay đổi (main thread)"""
+        self._poll_id = None
+        changed = False
+        for name, process in self.processes.items():
+            if name in self.results:
+                continue
+            # Kiểm tra trước khi rút: tiến trình đã kết thúc thì mọi thông điệp đã nằm trong hàng đợi
+            alive = process.is_alive()
+            for message in process.poll():
+                if message[0] == 'error':
+                    error = message[1]
+                    self.results[name] = f"Lỗi {type(error).__name__}: {error}"
+                    continue
+                _, route, distance, _, elapsed = message[:5]
+                self._record(name, route, distance, elapsed)
+                changed = True
+                if message[0] == 'done':
+                    self.results[name] = f"{distance:.2f} ({elapsed:.2f}s)"
+            if name not in self.results and not alive and not process.finished:
+                self.results[name] = f"Tiến trình kết thúc bất thường (mã thoát: {process.exitcode})"
+            if name in self.results:
+                process.close()
+        
+        if changed:
+            self.ax_convergence.relim()
+            self.ax_convergence.autoscale_view()
+            self.canvas.draw_idle()
+        self._update_status()
+        if len(self.results) < len(self.processes):
+            self._poll_id = self.window.after(self.refresh_interval, self._poll)
+        else:
+            self.stop_button.config(state=tk.DISABLED)
+    
+    def _record(self, name, route, distance, elapsed):
+        """Cập nhật bản đồ và đường hội tụ của một thuật toán theo bản chụp mới"""
+        coords = self.tsp_problem.get_city_coords()
+        closed = coords[np.append(route, route[0])]
+        self.route_lines[name].set_data(closed[:, 0], closed[:, 1])
+        self.map_axes[name].set_title(f"{name}: {distance:.2f}")
+        
+        times, distances = self.curves[name]
+        times.append(elapsed)
+        distances.append(distance)
+        self.curve_lines[name].set_data(times, distances)
+        self.best[name] = (distance, elapsed)
+    
+    def _update_status(self):
+        """Hiển thị kết quả hiện tại và người thắng khi cả hai đã kết thúc"""
+        parts = []
+        for name in self.ALGORITHMS:
+            if name in self.results:
+                parts.append(f"{name}: {self.results[name]}")
+            elif name in self.best:
+                distance, elapsed = self.best[name]
+                parts.append(f"{name}: {distance:.2f} @ {elapsed:.1f}s")
+            else:
+                parts.append(f"{name}: đang khởi động")
+        status = " | ".join(parts)
+        if len(self.results) == len(self.processes) and self.best:
+            winner = min(self.best, key=lambda name: self.best[name][0])
+            status += f" | Tốt hơn: {winner}"
+        self.status_var.set(status)
+    
+    def stop(self):
+        """Dừng ngay cả hai tiến trình con (giữ kết quả tốt nhất đã nhận)"""
+        if self._poll_id is not None:
+            self.window.after_cancel(self._poll_id)
+            self._poll_id = None
+        for name, process in self.processes.items():
+            process.terminate()
+            self.results.setdefault(name, "Đã dừng")
+        self.stop_button.config(state=tk.DISABLED)
+        self._update_status()
+    
+    def close(self):
+        """Đóng cửa sổ đua (dừng các tiến trình con nếu còn chạy)"""
+        self.stop()
+        self.closed = True
+        self.window.destroy()
+
 def main():
     """Hàm main để chạy ứng dụng"""
     root = tk.Tk()
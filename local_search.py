@@ -0,0 +1,205 @@
+"""
+Module tìm kiếm cục bộ 2-opt + Or-opt cho TSP
+Dùng để đánh bóng (polish) tuyến đường do SA/WOA trả về và làm bước memetic trong WOA
+"""
+from collections import deque
+from typing import List, Tuple
+
+
+class LocalSearch:
+    """
+    Tìm kiếm cục bộ 2-opt + Or-opt với danh sách láng giềng và don't-look bits
+    
+    Mỗi thành phố chỉ xét các bước đi tạo cạnh nối nó với một trong k láng
+    giềng gần nhất, và dừng sớm khi cạnh mới đã dài hơn phần có thể tiết kiệm.
+    Các thành phố được xử lý theo hàng đợi: thành phố không tìm được bước cải
+    thiện nào bị "tắt" (don't-look bit) cho tới khi một cạnh kề nó thay đổi.
+    
+    Attributes:
+        tsp: Đối tượng TSProblem
+        neighbors: Số láng giềng gần nhất được xét cho mỗi thành phố
+        operators: Các toán tử được dùng ('2opt', 'or_opt')
+        max_segment: Độ dài tối đa của đoạn được di chuyển trong Or-opt
+        moves_applied: Dict toán tử -> số bước cải thiện đã áp dụng
+    """
+    
+    OPERATORS = ('2opt', 'or_opt')
+    DEFAULT_NEIGHBORS = 8
+    MAX_SEGMENT = 3
+    # Ngưỡng cải thiện tối thiểu, tránh lặp vô hạn do sai số làm tròn
+    EPSILON = 1e-9
+    
+    def __init__(self, tsp_problem, neighbors: int = DEFAULT_NEIGHBORS,
+                 operators=OPERATORS, max_segment: int = MAX_SEGMENT):
+        """
+        Khởi tạo bộ tìm kiếm cục bộ
+        
+        Args:
+            tsp_problem: Đối tượng TSProblem
+            neighbors: Số láng giềng gần nhất của mỗi thành phố
+            operators: Tập con của OPERATORS
+            max_segment: Độ dài tối đa của đoạn trong Or-opt
+            
+        Raises:
+            ValueError: Nếu tham số không hợp lệ
+        """
+        if tsp_problem is None:
+            raise ValueError("tsp_problem không được None")
+        
+        if neighbors < 1:
+            raise ValueError(f"Số láng giềng phải >= 1, nhận được: {neighbors}")
+        
+        operators = tuple(operators)
+        if not operators or any(name not in self.OPERATORS for name in operators):
+            raise ValueError(f"Các toán tử phải thuộc {self.OPERATORS}, nhận được: {operators}")
+        
+        if max_segment < 1:
+            raise ValueError(f"max_segment phải >= 1, nhận được: {max_segment}")
+        
+        self.tsp = tsp_problem
+        self.neighbors = neighbors
+        self.operators = operators
+        self.max_segment = max_segment
+        # List các list để truy cập nhanh trong vòng lặp
+        self._candidates = tsp_problem.get_candidate_lists(neighbors).tolist()
+        self.moves_applied = dict.fromkeys(self.OPERATORS, 0)
+    
+    def improve(self, route: List[int]) -> Tuple[List[int], float]:
+        """
+        Cải thiện tuyến đường tới khi đạt cực tiểu cục bộ của các toán tử
+        
+        Args:
+            route: Tuyến đường ban đầu (không bị sửa)
+            
+        Returns:
+            Tuple (route, distance) của tuyến đã cải thiện
+        """
+        self._route = [int(city) for city in route]
+        self.tsp._validate_route(self._route)
+        n = len(self._route)
+        self._positions = [0] * n
+        for index, city in enumerate(self._route):
+            self._positions[city] = index
+        
+        if n >= 5:
+            use_two_opt = '2opt' in self.operators
+            use_or_opt = 'or_opt' in self.operators
+            queue = deque(self._route)
+            queued = [True] * n
+            while queue:
+                city = queue.popleft()
+                queued[city] = False
+                touched = None
+                if use_two_opt:
+                    touched = self._try_two_opt(city)
+                if touched is None and use_or_opt:
+                    touched = self._try_or_opt(city)
+                if touched is not None:
+                    # Bật lại don't-look bit của các thành phố có cạnh vừa thay đổi
+                    for other in touched:
+                        if not queued[other]:
+                            queued[other] = True
+                            queue.append(other)
+        
+        route = self._route
+        return route, self.tsp.calculate_route_distance(route)
+    
+    def _reverse(self, i: int, j: int) -> None:
+        """Đảo ngược đoạn route[i..j] (i <= j) và cập nhật vị trí"""
+        route, positions = self._route, self._positions
+        route[i:j + 1] = route[i:j + 1][::-1]
+        for index in range(i, j + 1):
+            positions[route[index]] = index
+    
+    def _try_two_opt(self, a: int):
+        """
+        Tìm và áp dụng bước 2-opt cải thiện đầu tiên tạo cạnh (a, c) với c là láng giềng của a
+        
+        Returns:
+            Các thành phố có cạnh thay đổi, hoặc None nếu không có bước cải thiện
+        """
+        d = self.tsp.get_distance
+        route, positions = self._route, self._positions
+        n = len(route)
+        i = positions[a]
+        # Hai hướng: bỏ cạnh (a, sau a) hoặc (trước a, a)
+        for step in (1, -1):
+            b = route[(i + step) % n]
+            d_ab = d(a, b)
+            for c in self._candidates[a]:
+                d_ac = d(a, c)
+                if d_ac >= d_ab:
+                    break
+                j = positions[c]
+                e = route[(j + step) % n]
+                if e == a:
+                    continue
+                delta = d_ac + d(b, e) - d_ab - d(c, e)
+                if delta < -self.EPSILON:
+                    if step == 1:
+                        # ... a b ... c e ...  ->  ... a c ... b e ...
+                        lo, hi = (i + 1, j) if i < j else (j + 1, i)
+                    else:
+                        # ... b a ... e c ...  ->  ... b e ... a c ...
+                        lo, hi = (i, j - 1) if i < j else (j, i - 1)
+                    self._reverse(lo, hi)
+                    self.moves_applied['2opt'] += 1
+                    return (a, b, c, e)
+        return None
+    
+    def _try_or_opt(self, first: int):
+        """
+        Tìm và áp dụng bước Or-opt cải thiện đầu tiên cho các đoạn bắt đầu tại first
+        
+        Đoạn dài 1..max_segment được chuyển (giữ chiều hoặc đảo chiều) vào một
+        cạnh kề với láng giềng gần của một trong hai đầu đoạn.
+        
+        Returns:
+            Các thành phố có cạnh thay đổi, hoặc None nếu không có bước cải thiện
+        """
+        d = self.tsp.get_distance
+        route, positions = self._route, self._positions
+        n = len(route)
+        i = positions[first]
+        for length in range(1, min(self.max_segment, n - 3) + 1):
+            end = i + length - 1
+            if end >= n:
+                break
+            last = route[end]
+            prev_s, next_s = route[i - 1], route[(end + 1) % n]
+            segment = route[i:end + 1]
+            gain = d(prev_s, first) + d(last, next_s) - d(prev_s, next_s)
+            if gain <= self.EPSILON:
+                continue
+            
+            for endpoint in (first, last):
+                for c in self._candidates[endpoint]:
+                    if d(endpoint, c) >= gain:
+                        break
+                    if c in segment:
+                        continue
+                    k = positions[c]
+                    # Hai cạnh kề c: (c, sau c) và (trước c, c)
+                    for u_pos in (k, (k - 1) % n):
+                        u, v = route[u_pos], route[(u_pos + 1) % n]
+                        if u in segment or v in segment:
+                            continue
+                        base = gain + d(u, v)
+                        forward = d(u, first) + d(last, v) - base
+                        backward = d(u, last) + d(first, v) - base
+                        if min(forward, backward) < -self.EPSILON:
+                            self._move_segment(i, length, u_pos, reverse=backward < forward)
+                            self.moves_applied['or_opt'] += 1
+                            return (prev_s, next_s, first, last, u, v)
+        return None
+    
+    def _move_segment(self, i: int, length: int, j: int, reverse: bool) -> None:
+        """Chuyển đoạn route[i..i+length-1] sang ngay sau vị trí j, có thể đảo chiều"""
+        route, positions = self._route, self._positions
+        self.tsp.apply_or_opt(route, i, length, j)
+        start = j - length + 1 if j > i else j + 1
+        if reverse:
+            route[start:start + length] = route[start:start + length][::-1]
+        lo, hi = min(i, start), max(i + length - 1, start + length - 1)
+        for index in range(lo, hi + 1):
+            positions[route[index]] = index
@@ -0,0 +1,100 @@
+"""
+Module luồng số ngẫu nhiên riêng cho từng thuật toán
+Bọc np.random.Generator và rút số ngẫu nhiên theo từng khối để giảm chi phí mỗi lần gọi
+"""
+from itertools import chain
+
+import numpy as np
+
+
+class RandomStream:
+    """
+    Luồng số ngẫu nhiên có hạt giống, sở hữu một np.random.Generator riêng
+    
+    Số thực đều trong [0, 1) được rút sẵn từng khối block_size số bằng một lời
+    gọi numpy vectơ hóa rồi tiêu thụ dần; random() là __next__ của iterator nên
+    mỗi lần gọi không phải chạy mã Python. Các hàm chỉ số (randrange, randint,
+    choice, sample_pair) được suy ra từ các số thực này.
+    
+    Attributes:
+        seed_sequence: np.random.SeedSequence gốc (dùng để spawn luồng con)
+        generator: np.random.Generator dùng cho các phép rút dạng mảng
+    """
+    
+    BLOCK_SIZE = 1024
+    
+    def __init__(self, seed=None, block_size: int = BLOCK_SIZE):
+        """
+        Khởi tạo luồng ngẫu nhiên
+        
+        Args:
+            seed: Hạt giống (int), np.random.SeedSequence, hoặc None (lấy entropy
+                  từ hệ điều hành)
+            block_size: Số giá trị được rút sẵn mỗi lần
+        """
+        if block_size < 1:
+            raise ValueError(f"block_size phải >= 1, nhận được: {block_size}")
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.block_size = block_size
+        self.generator = np.random.default_rng(seed)
+        self._bind()
+    
+    def _bind(self) -> None:
+        """Tạo iterator vô hạn qua các khối số thực và gán random() trực tiếp vào nó"""
+        blocks = iter(self._uniform_block, None)
+        self.random = chain.from_iterable(blocks).__next__
+    
+    def _uniform_block(self) -> list:
+        """Rút một khối block_size số thực đều trong [0, 1)"""
+        return self.generator.random(self.block_size).tolist()
+    
+    def randrange(self, n: int) -> int:
+        """Số nguyên đều trong [0, n)"""
+        return int(self.random() * n)
+    
+    def randint(self, a: int, b: int) -> int:
+        """Số nguyên đều trong [a, b] (gồm cả b, như random.randint)"""
+        return a + int(self.random() * (b - a + 1))
+    
+    def uniform(self, a: float, b: float) -> float:
+        """Số thực đều trong [a, b)"""
+        return a + (b - a) * self.random()
+    
+    def choice(self, seq):
+        """Chọn ngẫu nhiên đều một phần tử của seq"""
+        return seq[int(self.random() * len(seq))]
+    
+    def sample_pair(self, n: int):
+        """Hai số nguyên khác nhau đều trong [0, n) (như random.sample(range(n), 2))"""
+        i = int(self.random() * n)
+        j = int(self.random() * (n - 1))
+        if j >= i:
+            j += 1
+        return i, j
+    
+    def permutation(self, n: int) -> np.ndarray:
+        """Hoán vị ngẫu nhiên của range(n)"""
+        return self.generator.permutation(n)
+    
+    def spawn(self, count: int) -> list:
+        """
+        Tạo count luồng con độc lập (SeedSequence.spawn), ví dụ cho các tiến trình worker
+        
+        Dãy các luồng con chỉ phụ thuộc hạt giống gốc và số lần spawn trước đó,
+        nên kết quả tái lập được bất kể luồng con chạy ở tiến trình nào.
+        """
+        return [RandomStream(child, self.block_size) for child in self.seed_sequence.spawn(count)]
+    
+    def __getstate__(self) -> dict:
+        # Các số đã rút sẵn nhưng chưa dùng bị bỏ; bên nhận tiếp tục từ trạng thái generator
+        return {'seed_sequence': self.seed_sequence, 'block_size': self.block_size,
+                'state': self.generator.bit_generator.state}
+    
+    def __setstate__(self, state: dict) -> None:
+        self.seed_sequence = state['seed_sequence']
+        self.block_size = state['block_size']
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self.generator.bit_generator.state = state['state']
+        self._bind()
@@ -2,57 +2,219 @@
 Module triển khai thuật toán Simulated Annealing cho TSP
 """
 import numpy as np
-import random
 import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from cancellation import StopCondition
+from construction import INIT_METHODS, construct_route
+from local_search import LocalSearch
+from random_stream import RandomStream
+from solver_stats import SolverStats
+
+
+# Bộ giải mẫu của tiến trình worker (được gán một lần bởi _init_chain_worker)
+_chain_solver = None
+
+
+def _init_chain_worker(solver):
+    """Initializer của Pool: lưu bộ giải (kèm TSProblem) cho tiến trình worker"""
+    global _chain_solver
+    _chain_solver = solver
+
+
+def _run_chain_segment(task):
+    """
+    Chạy một đoạn chuỗi Metropolis trong tiến trình worker
+    
+    Args:
+        task: Tuple (route, distance, temp, steps, seed)
+        
+    Returns:
+        Kết quả của SimulatedAnnealing._run_segment
+    """
+    return _chain_solver._run_seeded_segment(*task)
 
 
 class SimulatedAnnealing:
     """Lớp triển khai thuật toán Simulated Annealing"""
     
-    def __init__(self, tsp_problem, initial_temp=10000, cooling_rate=0.995, 
-                 min_temp=1, max_iterations=10000):
+    # Các toán tử láng giềng được hỗ trợ
+    NEIGHBORHOODS = ('swap', '2opt', 'or_opt', 'insertion', 'mixed')
+    # Trọng số mặc định khi neighborhood='mixed'
+    DEFAULT_MIXED_WEIGHTS = {'2opt': 0.5, 'or_opt': 0.2, 'insertion': 0.2, 'swap': 0.1}
+    # Độ dài tối đa của đoạn được di chuyển trong Or-opt
+    MAX_OR_OPT_SEGMENT = 3
+    # Từ độ dài đoạn này trở lên, vị trí các thành phố được cập nhật bằng numpy
+    VECTORIZE_SYNC_FROM = 32
+    # Hiệu chỉnh nhiệt độ tự động ('auto'): số bước đi được lấy mẫu, xác suất chấp
+    # nhận một bước xấu đi trung bình ở nhiệt độ đầu, và tỉ lệ nhiệt độ cuối / đầu
+    AUTO_TEMP_SAMPLES = 200
+    AUTO_INITIAL_ACCEPTANCE = 0.5
+    AUTO_TEMP_RATIO = 0.002
+    
+    def __init__(self, tsp_problem, initial_temp=10000, cooling_rate=0.995,
+                 min_temp=1, max_iterations=10000, use_delta=True,
+                 neighborhood='swap', neighborhood_weights=None, candidate_k=None,
+                 num_chains=1, exchange_interval=100, num_workers=None,
+                 collect_stats=False, stats_stream=None, seed=None, init='random',
+                 polish=False, time_budget=None):
         """
         Khởi tạo thuật toán SA
         
         Args:
             tsp_problem: Đối tượng TSProblem
-            initial_temp: Nhiệt độ ban đầu
+            initial_temp: Nhiệt độ ban đầu, hoặc 'auto' để hiệu chỉnh từ độ thay đổi
+                          khoảng cách của các bước đi lấy mẫu trên tuyến khởi đầu
             cooling_rate: Tốc độ làm nguội (0 < cooling_rate < 1)
-            min_temp: Nhiệt độ tối thiểu
+            min_temp: Nhiệt độ tối thiểu, hoặc 'auto' (tỉ lệ cố định của nhiệt độ đầu)
             max_iterations: Số vòng lặp tối đa
+            use_delta: Nếu True, chỉ tính phần thay đổi của khoảng cách (O(1))
+                       và áp dụng bước đi trực tiếp lên tuyến khi được chấp nhận
+            neighborhood: Toán tử láng giềng ('swap', '2opt', 'or_opt',
+                          'insertion' hoặc 'mixed')
+            neighborhood_weights: Trọng số các toán tử khi neighborhood='mixed'
+                                  (dict tên toán tử -> trọng số)
+            candidate_k: Nếu khác None, chỉ sinh bước đi tạo cạnh nối một thành phố
+                         với một trong candidate_k thành phố gần nó nhất
+            num_chains: Số chuỗi song song (parallel tempering). Với num_chains > 1,
+                        các chuỗi chạy ở thang nhiệt độ cố định từ initial_temp
+                        xuống min_temp và không dùng cooling_rate
+            exchange_interval: Số vòng lặp giữa hai lần trao đổi trạng thái giữa
+                               các chuỗi kề nhau
+            num_workers: Số tiến trình worker (None = min(num_chains, số CPU);
+                         1 = chạy tất cả các chuỗi trong tiến trình hiện tại)
+            collect_stats: Thu thập thống kê vòng lặp (xem get_stats); False thì
+                           không bấm giờ trong vòng lặp
+            stats_stream: Đường dẫn tệp hoặc file object để ghi thống kê dạng
+                          JSON lines tại mỗi mốc lịch sử (cần collect_stats=True)
+            seed: Hạt giống cho luồng ngẫu nhiên riêng của thuật toán (int hoặc
+                  np.random.SeedSequence; None = ngẫu nhiên theo hệ điều hành)
+            init: Cách dựng tuyến khởi đầu: 'random' hoặc một heuristic trong
+                  construction ('nearest_neighbor', 'greedy', 'hilbert',
+                  'cheapest_insertion', 'farthest_insertion')
+            polish: Nếu True, đánh bóng tuyến tốt nhất bằng tìm kiếm cục bộ
+                    2-opt + Or-opt (LocalSearch) sau khi SA kết thúc
+            time_budget: Nếu khác None, số giây chạy: nhiệt độ giảm theo thời gian
+                         đã trôi qua (từ initial_temp xuống min_temp đúng lúc hết
+                         giờ, theo tốc độ vòng lặp đo được) thay cho cooling_rate,
+                         và max_iterations không còn giới hạn số vòng lặp (với
+                         num_chains > 1: chỉ giới hạn thời gian chạy)
         """
         # Validate parameters
         if tsp_problem is None:
             raise ValueError("tsp_problem không được None")
         
-        if initial_temp <= 0:
-            raise ValueError(f"Nhiệt độ ban đầu phải > 0, nhận được: {initial_temp}")
+        if isinstance(initial_temp, str) and initial_temp != 'auto':
+            raise ValueError(f"Nhiệt độ ban đầu phải là số hoặc 'auto', nhận được: {initial_temp!r}")
+        
+        if initial_temp != 'auto' and initial_temp <= 0:
+            raise ValueError(f"Nhiệt độ ban đầu phải > 0 hoặc 'auto', nhận được: {initial_temp}")
         
         if not 0 < cooling_rate < 1:
             raise ValueError(f"Tốc độ làm nguội phải trong khoảng (0, 1), nhận được: {cooling_rate}")
         
-        if min_temp <= 0:
-            raise ValueError(f"Nhiệt độ tối thiểu phải > 0, nhận được: {min_temp}")
+        if isinstance(min_temp, str) and min_temp != 'auto':
+            raise ValueError(f"Nhiệt độ tối thiểu phải là số hoặc 'auto', nhận được: {min_temp!r}")
+        
+        if min_temp != 'auto' and min_temp <= 0:
+            raise ValueError(f"Nhiệt độ tối thiểu phải > 0 hoặc 'auto', nhận được: {min_temp}")
         
-        if min_temp >= initial_temp:
+        if 'auto' not in (initial_temp, min_temp) and min_temp >= initial_temp:
             raise ValueError(f"Nhiệt độ tối thiểu ({min_temp}) phải < nhiệt độ ban đầu ({initial_temp})")
         
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError(f"time_budget phải > 0, nhận được: {time_budget}")
+        
         if max_iterations <= 0:
             raise ValueError(f"Số vòng lặp phải > 0, nhận được: {max_iterations}")
         
+        if neighborhood not in self.NEIGHBORHOODS:
+            raise ValueError(
+                f"Toán tử láng giềng phải thuộc {self.NEIGHBORHOODS}, nhận được: {neighborhood}"
+            )
+        
+        if candidate_k is not None and candidate_k < 1:
+            raise ValueError(f"candidate_k phải >= 1, nhận được: {candidate_k}")
+        
+        if num_chains < 1:
+            raise ValueError(f"Số chuỗi phải >= 1, nhận được: {num_chains}")
+        
+        if exchange_interval < 1:
+            raise ValueError(f"exchange_interval phải >= 1, nhận được: {exchange_interval}")
+        
+        if num_workers is not None and num_workers < 1:
+            raise ValueError(f"Số worker phải >= 1, nhận được: {num_workers}")
+        
+        if init not in INIT_METHODS:
+            raise ValueError(f"Cách khởi tạo phải thuộc {INIT_METHODS}, nhận được: {init}")
+        
         self.tsp = tsp_problem
         self.initial_temp = initial_temp
         self.cooling_rate = cooling_rate
         self.min_temp = min_temp
         self.max_iterations = max_iterations
+        self.use_delta = use_delta
+        self.neighborhood = neighborhood
+        self.candidate_k = candidate_k
+        self.num_chains = num_chains
+        self.exchange_interval = exchange_interval
+        self.num_workers = num_workers
+        self.seed = seed
+        self.rng = RandomStream(seed)
+        self.init = init
+        self.polish = polish
+        self.time_budget = time_budget
+        # Nhiệt độ đầu/cuối thực sự dùng ở lần chạy gần nhất (sau khi hiệu chỉnh 'auto')
+        self.start_temp = None
+        self.end_temp = None
+        self._local_search = LocalSearch(tsp_problem) if polish else None
+        self._init_operators(neighborhood, neighborhood_weights)
+        
+        # Danh sách láng giềng gần (list các list để truy cập nhanh trong vòng lặp)
+        self._candidates = None
+        if candidate_k is not None:
+            self._candidates = self.tsp.get_candidate_lists(candidate_k).tolist()
+        self._positions = None  # Vị trí của từng thành phố trong tuyến hiện tại
         
         self.best_route = None
         self.best_distance = float('inf')
         self.history = []  # Lưu lịch sử quá trình tìm kiếm
+        self.exchange_attempts = 0
+        self.exchange_accepted = 0
+        self.stop_reason = None  # Lý do dừng của lần chạy gần nhất
+        self.stats = SolverStats(enabled=collect_stats, stream=stats_stream)
+    
+    def _init_operators(self, neighborhood, weights):
+        """Chuẩn bị danh sách toán tử và trọng số tích lũy để chọn ngẫu nhiên"""
+        if neighborhood != 'mixed':
+            if weights is not None:
+                raise ValueError("neighborhood_weights chỉ dùng với neighborhood='mixed'")
+            self._operators = (neighborhood,)
+            self._cumulative_weights = (1.0,)
+            return
+        
+        weights = dict(self.DEFAULT_MIXED_WEIGHTS if weights is None else weights)
+        for name, weight in weights.items():
+            if name not in self.NEIGHBORHOODS or name == 'mixed':
+                raise ValueError(f"Toán tử không hợp lệ trong neighborhood_weights: {name}")
+            if weight < 0:
+                raise ValueError(f"Trọng số của '{name}' phải >= 0, nhận được: {weight}")
+        total = sum(weights.values())
+        if total <= 0:
+            raise ValueError("Tổng trọng số của neighborhood_weights phải > 0")
+        
+        self._operators = tuple(weights)
+        cumulative = np.cumsum([weights[name] / total for name in self._operators])
+        cumulative[-1] = 1.0
+        self._cumulative_weights = tuple(cumulative.tolist())
+        self.neighborhood_weights = weights
     
     def _get_neighbor(self, route):
         """
-        Tạo láng giềng của tuyến đường hiện tại bằng cách swap 2 thành phố
+        Tạo láng giềng của tuyến đường hiện tại bằng toán tử đã chọn
         
         Args:
             route: Tuyến đường hiện tại
@@ -61,10 +223,130 @@ class SimulatedAnnealing:
             Tuyến đường láng giềng
         """
         neighbor = route.copy()
-        i, j = random.sample(range(len(route)), 2)
-        neighbor[i], neighbor[j] = neighbor[j], neighbor[i]
+        self._apply_move(neighbor, self._propose_move(route))
         return neighbor
     
+    def _pick_operator(self):
+        """Chọn toán tử láng giềng theo trọng số"""
+        if len(self._operators) == 1:
+            return self._operators[0]
+        r = self.rng.random()
+        for name, threshold in zip(self._operators, self._cumulative_weights):
+            if r < threshold:
+                return name
+        return self._operators[-1]
+    
+    def _propose_move(self, route):
+        """
+        Chọn một bước đi mà không sao chép tuyến đường
+        
+        Args:
+            route: Tuyến đường hiện tại
+            
+        Returns:
+            Tuple (kind, i, j, length) mô tả bước đi
+        """
+        kind = self._pick_operator()
+        if self._candidates is not None:
+            return self._candidate_move(kind, route)
+        return self._random_move(kind, route)
+    
+    def _random_move(self, kind, route):
+        """Sinh bước đi với các vị trí chọn ngẫu nhiên đều"""
+        n = len(route)
+        rng = self.rng
+        if kind == 'swap' or kind == '2opt':
+            i, j = rng.sample_pair(n)
+            if kind == '2opt' and i > j:
+                i, j = j, i
+            return (kind, i, j, 1)
+        if kind == 'insertion':
+            i = rng.randrange(n)
+            j = rng.randrange(n - 1)
+            if j >= i:
+                j += 1
+            return (kind, i, j, 1)
+        # Or-opt: đoạn [i, i+length) chuyển sang sau vị trí j nằm ngoài đoạn
+        length = rng.randint(1, min(self.MAX_OR_OPT_SEGMENT, n - 2))
+        i = rng.randrange(n - length + 1)
+        j = rng.randrange(n - length)
+        if j >= i:
+            j += length
+        return (kind, i, j, length)
+    
+    def _candidate_move(self, kind, route):
+        """
+        Sinh bước đi tạo cạnh (c, m) với m thuộc danh sách láng giềng gần của c
+        
+        Args:
+            kind: Tên toán tử
+            route: Tuyến đường hiện tại
+            
+        Returns:
+            Tuple (kind, i, j, length) mô tả bước đi
+        """
+        n = len(route)
+        p = self.rng.randrange(n)
+        q = self._positions.item(self.rng.choice(self._candidates[route[p]]))
+        
+        if kind == '2opt':
+            # Đảo đoạn nằm giữa để c và m trở thành 2 thành phố liền kề
+            lo, hi = (p, q) if p < q else (q, p)
+            return (kind, lo + 1, hi, 1)
+        if kind == 'swap':
+            # Đưa m về ngay sau c
+            return (kind, (p + 1) % n, q, 1)
+        if kind == 'insertion':
+            # Đưa c về ngay sau m
+            return (kind, p, q, 1)
+        
+        length = self.rng.randint(1, min(self.MAX_OR_OPT_SEGMENT, n - 2))
+        if p + length > n or p <= q < p + length:
+            return self._random_move(kind, route)
+        return (kind, p, q, length)
+    
+    def _move_delta(self, route, move):
+        """Tính độ thay đổi khoảng cách của bước đi (không sửa tuyến)"""
+        kind, i, j, length = move
+        if kind == '2opt':
+            return self.tsp.two_opt_delta(route, i, j)
+        if kind == 'swap':
+            return self.tsp.swap_delta(route, i, j)
+        if kind == 'insertion':
+            return self.tsp.insertion_delta(route, i, j)
+        return self.tsp.or_opt_delta(route, i, length, j)
+    
+    def _apply_move(self, route, move):
+        """Áp dụng bước đi trực tiếp lên tuyến đường"""
+        kind, i, j, length = move
+        if kind == '2opt':
+            self.tsp.apply_two_opt(route, i, j)
+        elif kind == 'swap':
+            self.tsp.apply_swap(route, i, j)
+        elif kind == 'insertion':
+            self.tsp.apply_insertion(route, i, j)
+        else:
+            self.tsp.apply_or_opt(route, i, length, j)
+    
+    def _sync_positions(self, route, move):
+        """Cập nhật vị trí các thành phố nằm trong vùng bị bước đi thay đổi"""
+        kind, i, j, length = move
+        positions = self._positions
+        if kind == 'swap':
+            positions[route[i]] = i
+            positions[route[j]] = j
+            return
+        if kind == '2opt':
+            lo, hi = i, j
+        else:
+            lo, hi = min(i, j), max(i + length - 1, j)
+        if hi - lo < self.VECTORIZE_SYNC_FROM:
+            for k in range(lo, hi + 1):
+                positions[route[k]] = k
+        else:
+            # Đoạn dài (bài toán lớn): gán theo vector thay vì vòng lặp Python
+            positions[route[lo:hi + 1]] = np.arange(lo, hi + 1)
+    
     def _acceptance_probability(self, current_dist, neighbor_dist, temp):
         """
         Tính xác suất chấp nhận giải pháp xấu hơn
@@ -81,61 +363,452 @@ class SimulatedAnnealing:
             return 1.0
         return math.exp((current_dist - neighbor_dist) / temp)
     
-    def solve(self, callback=None):
+    def _initial_route(self, initial_route=None):
+        """Tuyến khởi đầu: bản sao của initial_route nếu có, nếu không thì dựng theo init"""
+        if initial_route is not None:
+            route = [int(city) for city in initial_route]
+            self.tsp._validate_route(route)
+            return route
+        return construct_route(self.tsp, self.init, self.rng)
+    
+    def solve(self, callback=None, initial_route=None, cancel_token=None,
+              time_limit=None, deadline=None, max_evaluations=None):
         """
         Giải bài toán TSP bằng Simulated Annealing
         
+        Các điều kiện dừng sớm được kiểm tra mỗi 100 vòng lặp (mỗi đoạn với
+        parallel tempering); khi một điều kiện xảy ra, solve() trả về ngay kết
+        quả tốt nhất hiện có và ghi lý do vào stop_reason.
+        
         Args:
             callback: Hàm callback để cập nhật giao diện (route, distance, iteration)
+            initial_route: Tuyến khởi đầu cho trước (warm start); None thì dựng
+                           theo tham số init
+            cancel_token: CancellationToken để dừng từ luồng khác
+            time_limit: Số giây chạy tối đa (đồng hồ thực)
+            deadline: Mốc dừng tuyệt đối theo time.time()
+            max_evaluations: Số lần đánh giá tuyến tối đa (mỗi bước đi là một lần)
             
         Returns:
             Tuple (best_route, best_distance, history)
         """
+        stop = StopCondition(cancel_token, time_limit, deadline, max_evaluations)
+        self.stats.reset()
+        self.stats.emit('start', algorithm='SA')
+        if self.num_chains > 1:
+            result = self._solve_parallel_tempering(callback, initial_route, stop)
+        else:
+            result = self._solve_single(callback, initial_route, stop)
+        self.stop_reason = stop.reason or 'completed'
+        # Khi bị hủy hoặc hết thời gian thì trả kết quả ngay, không đánh bóng
+        if self.polish and stop.reason in (None, 'max_evaluations'):
+            self._polish()
+            result = (self.best_route, self.best_distance, self.history)
+        self.stats.stop()
+        self.stats.emit('end', algorithm='SA', iteration=self.actual_iterations,
+                        best_distance=self.best_distance, stop_reason=self.stop_reason)
+        self.stats.close()
+        return result
+    
+    def _calibrate_temperatures(self, route):
+        """
+        Xác định start_temp và end_temp cho lần chạy
+        
+        initial_temp='auto': lấy mẫu AUTO_TEMP_SAMPLES bước đi ngẫu nhiên trên route
+        và chọn nhiệt độ để một bước xấu đi trung bình được chấp nhận với xác suất
+        AUTO_INITIAL_ACCEPTANCE. min_temp='auto': AUTO_TEMP_RATIO lần nhiệt độ đầu
+        (các bước xấu đi lấy mẫu trên tuyến ngẫu nhiên lớn hơn nhiều so với các
+        bước còn có ý nghĩa ở cuối quá trình, nên không dùng chúng cho nhiệt độ cuối).
+        
+        Raises:
+            ValueError: Nếu nhiệt độ sau hiệu chỉnh không thỏa end_temp < start_temp
+        """
+        start, end = self.initial_temp, self.min_temp
+        if start == 'auto':
+            deltas = [self._move_delta(route, self._random_move(self._pick_operator(), route))
+                      for _ in range(self.AUTO_TEMP_SAMPLES)]
+            uphill = [delta for delta in deltas if delta > 0]
+            # Mọi bước đều không xấu đi (bài toán suy biến): dùng thang độ lớn 1
+            mean_uphill = sum(uphill) / len(uphill) if uphill else 1.0
+            start = -mean_uphill / math.log(self.AUTO_INITIAL_ACCEPTANCE)
+        if end == 'auto':
+            end = start * self.AUTO_TEMP_RATIO
+        if end >= start:
+            raise ValueError(f"Nhiệt độ tối thiểu ({end}) phải < nhiệt độ ban đầu ({start})")
+        self.start_temp, self.end_temp = start, end
+    
+    def _time_schedule(self, elapsed, iteration):
+        """
+        Lịch làm nguội theo thời gian cho chế độ time_budget
+        
+        Nhiệt độ giảm theo cấp số nhân của phần thời gian đã dùng; hệ số làm nguội
+        mỗi vòng lặp tới mốc kế tiếp được suy ra từ tốc độ vòng lặp đo được, để
+        nhiệt độ chạm end_temp đúng lúc hết ngân sách.
+        
+        Args:
+            elapsed: Số giây đã chạy (> 0, < time_budget)
+            iteration: Số vòng lặp đã chạy
+            
+        Returns:
+            Tuple (temp, cooling) - nhiệt độ hiện tại và hệ số nhân mỗi vòng lặp
+        """
+        log_ratio = math.log(self.end_temp / self.start_temp)
+        fraction = elapsed / self.time_budget
+        temp = self.start_temp * math.exp(log_ratio * fraction)
+        remaining = max(iteration * (self.time_budget - elapsed) / elapsed, 1.0)
+        cooling = math.exp(log_ratio * (1 - fraction) / remaining)
+        return temp, cooling
+    
+    def _polish(self):
+        """Hậu xử lý: tìm kiếm cục bộ trên best_route, ghi thêm một mốc lịch sử nếu cải thiện"""
+        with self.stats.timer('local_search'):
+            route, distance = self._local_search.improve(self.best_route)
+        if distance < self.best_distance:
+            self.best_route, self.best_distance = route, distance
+            self.history.append((self.actual_iterations, distance))
+    
+    def _solve_single(self, callback=None, initial_route=None, stop=None):
+        """Chạy một chuỗi SA với lịch làm nguội cooling_rate"""
         # Khởi tạo tuyến đường ban đầu
-        current_route = self.tsp.generate_random_route()
+        current_route = self._initial_route(initial_route)
         current_distance = self.tsp.calculate_route_distance(current_route)
         
         self.best_route = current_route.copy()
         self.best_distance = current_distance
         self.history = [(0, current_distance)]
         
-        temp = self.initial_temp
+        use_candidates = self._candidates is not None
+        if use_candidates:
+            self._positions = np.empty(len(current_route), dtype=np.int64)
+            self._positions[current_route] = np.arange(len(current_route))
+        self._calibrate_temperatures(current_route)
+        
+        # best_route chỉ được sao chép khi tuyến hiện tại rời khỏi trạng thái tốt nhất,
+        # tránh sao chép O(n) ở mỗi lần cải thiện
+        best_is_current = True
+        
+        # Thống kê được cộng dồn vào biến cục bộ, ghi vào self.stats tại các mốc lịch sử
+        stats = self.stats
+        timed = stats.enabled
+        perf_counter = time.perf_counter
+        rand = self.rng.random
+        accepted = improvements = 0
+        move_time = eval_time = 0.0
+        last_flush = 0
+        stats.add(distance_evaluations=1)
+        
+        temp = self.start_temp
+        cooling = self.cooling_rate
+        min_temp = self.end_temp
+        max_iterations = self.max_iterations
+        budget = self.time_budget
+        if budget is not None:
+            # Chế độ ngân sách thời gian: chỉ dừng khi hết giờ; nhiệt độ được đặt lại
+            # theo thời gian ở mỗi mốc, hệ số làm nguội chưa biết cho tới mốc đầu tiên
+            min_temp = 0.0
+            max_iterations = sys.maxsize
+            cooling = 1.0
+            start_time = perf_counter()
         iteration = 0
         self.actual_iterations = 0  # Track actual completed iterations
         
-        while temp > self.min_temp and iteration < self.max_iterations:
+        while temp > min_temp and iteration < max_iterations:
             # Tạo láng giềng
-            neighbor_route = self._get_neighbor(current_route)
-            neighbor_distance = self.tsp.calculate_route_distance(neighbor_route)
+            if timed:
+                t0 = perf_counter()
+            move = self._propose_move(current_route)
+            if not self.use_delta:
+                neighbor_route = current_route.copy()
+                self._apply_move(neighbor_route, move)
+            if timed:
+                t1 = perf_counter()
+                move_time += t1 - t0
+            
+            if self.use_delta:
+                # Chỉ định giá bước đi qua các cạnh bị thay đổi, chưa sửa tuyến
+                neighbor_distance = current_distance + self._move_delta(current_route, move)
+            else:
+                neighbor_distance = self.tsp.calculate_route_distance(neighbor_route)
+            if timed:
+                eval_time += perf_counter() - t1
             
             # Quyết định có chấp nhận láng giềng không
-            if self._acceptance_probability(current_distance, neighbor_distance, temp) > random.random():
-                current_route = neighbor_route
+            if self._acceptance_probability(current_distance, neighbor_distance, temp) > rand():
+                accepted += 1
+                if best_is_current and neighbor_distance > self.best_distance:
+                    self.best_route = current_route.copy()
+                    best_is_current = False
+                if self.use_delta:
+                    self._apply_move(current_route, move)
+                else:
+                    current_route = neighbor_route
                 current_distance = neighbor_distance
+                if use_candidates:
+                    self._sync_positions(current_route, move)
                 
                 # Cập nhật best nếu tốt hơn
                 if current_distance < self.best_distance:
-                    self.best_route = current_route.copy()
                     self.best_distance = current_distance
+                    best_is_current = True
+                    improvements += 1
             
             # Làm nguội
-            temp *= self.cooling_rate
+            temp *= cooling
             iteration += 1
             self.actual_iterations = iteration
             
             # Lưu lịch sử mỗi 100 iterations
             if iteration % 100 == 0:
                 self.history.append((iteration, self.best_distance))
+                if timed:
+                    steps = iteration - last_flush
+                    stats.add(moves_proposed=steps, moves_accepted=accepted,
+                              improvements=improvements, distance_evaluations=steps)
+                    stats.add_time(move_generation=move_time, evaluation=eval_time)
+                    accepted = improvements = 0
+                    move_time = eval_time = 0.0
+                    last_flush = iteration
+                    stats.emit('progress', algorithm='SA', iteration=iteration,
+                               best_distance=self.best_distance, temperature=temp)
                 
                 # Gọi callback nếu có
                 if callback:
-                    callback(self.best_route, self.best_distance, iteration)
+                    if best_is_current:
+                        self.best_route = current_route.copy()
+                    with stats.timer('callback'):
+                        callback(self.best_route, self.best_distance, iteration)
+                
+                if budget is not None:
+                    elapsed = perf_counter() - start_time
+                    if elapsed >= budget:
+                        break
+                    temp, cooling = self._time_schedule(elapsed, iteration)
+                
+                # Điểm kiểm tra dừng sớm: mỗi vòng lặp là một lần đánh giá (+1 tuyến đầu)
+                if stop is not None and stop.should_stop(iteration + 1):
+                    break
+        
+        steps = iteration - last_flush
+        stats.add(moves_proposed=steps, moves_accepted=accepted,
+                  improvements=improvements, distance_evaluations=steps)
+        stats.add_time(move_generation=move_time, evaluation=eval_time)
+        
+        if best_is_current:
+            self.best_route = current_route.copy()
+        if self.use_delta:
+            # Tính lại chính xác để loại bỏ sai số cộng dồn của các delta
+            self.best_distance = self.tsp.calculate_route_distance(self.best_route)
+            stats.add(distance_evaluations=1)
         
         # Lưu kết quả cuối cùng
         self.history.append((iteration, self.best_distance))
         
         return self.best_route, self.best_distance, self.history
     
+    def _run_segment(self, route, distance, temp, steps):
+        """
+        Chạy steps bước Metropolis ở nhiệt độ cố định (một đoạn của một chuỗi)
+        
+        Args:
+            route: Tuyến đường hiện tại của chuỗi (được sửa trực tiếp)
+            distance: Khoảng cách của route
+            temp: Nhiệt độ của chuỗi
+            steps: Số bước
+            
+        Returns:
+            Tuple (route, distance, best_route, best_distance, counts) với best là
+            tuyến tốt nhất chuỗi gặp trong đoạn này và counts là dict thống kê của
+            đoạn (số bước được chấp nhận, thời gian sinh bước đi và đánh giá)
+        """
+        use_candidates = self._candidates is not None
+        if use_candidates:
+            self._positions = np.empty(len(route), dtype=np.int64)
+            self._positions[route] = np.arange(len(route))
+        
+        best_route = None
+        best_distance = distance
+        best_is_current = True
+        timed = self.stats.enabled
+        perf_counter = time.perf_counter
+        rand = self.rng.random
+        accepted = 0
+        move_time = eval_time = 0.0
+        
+        for _ in range(steps):
+            if timed:
+                t0 = perf_counter()
+            move = self._propose_move(route)
+            if not self.use_delta:
+                neighbor_route = route.copy()
+                self._apply_move(neighbor_route, move)
+            if timed:
+                t1 = perf_counter()
+                move_time += t1 - t0
+            
+            if self.use_delta:
+                neighbor_distance = distance + self._move_delta(route, move)
+            else:
+                neighbor_distance = self.tsp.calculate_route_distance(neighbor_route)
+            if timed:
+                eval_time += perf_counter() - t1
+            
+            if self._acceptance_probability(distance, neighbor_distance, temp) > rand():
+                accepted += 1
+                if best_is_current and neighbor_distance > best_distance:
+                    best_route = route.copy()
+                    best_is_current = False
+                if self.use_delta:
+                    self._apply_move(route, move)
+                else:
+                    route = neighbor_route
+                distance = neighbor_distance
+                if use_candidates:
+                    self._sync_positions(route, move)
+                if distance < best_distance:
+                    best_distance = distance
+                    best_is_current = True
+        
+        if best_is_current:
+            best_route = route.copy()
+        evaluations = steps
+        if self.use_delta:
+            # Tính lại chính xác sau mỗi đoạn để sai số delta không cộng dồn giữa các đoạn
+            distance = self.tsp.calculate_route_distance(route)
+            best_distance = self.tsp.calculate_route_distance(best_route)
+            evaluations += 2
+        counts = {'accepted': accepted, 'evaluations': evaluations,
+                  'move_time': move_time, 'eval_time': eval_time}
+        return route, distance, best_route, best_distance, counts
+    
+    def _run_seeded_segment(self, route, distance, temp, steps, seed):
+        """Chạy _run_segment với luồng ngẫu nhiên riêng của chuỗi (seed là SeedSequence)"""
+        outer_rng, self.rng = self.rng, RandomStream(seed)
+        try:
+            return self._run_segment(route, distance, temp, steps)
+        finally:
+            self.rng = outer_rng
+    
+    def _temperature_ladder(self):
+        """Thang nhiệt độ cấp số nhân từ start_temp (chuỗi 0) xuống end_temp"""
+        ratio = self.end_temp / self.start_temp
+        last = self.num_chains - 1
+        return [self.start_temp * ratio ** (k / last) for k in range(self.num_chains)]
+    
+    def _exchange_replicas(self, routes, distances, temps, offset):
+        """
+        Trao đổi trạng thái giữa các cặp chuỗi kề nhau (k, k+1) với k = offset, offset+2, ...
+        
+        Cặp được đổi theo tiêu chí Metropolis: xác suất
+        min(1, exp((1/T_k - 1/T_{k+1}) * (E_k - E_{k+1}))).
+        """
+        for k in range(offset, self.num_chains - 1, 2):
+            self.exchange_attempts += 1
+            exponent = (1 / temps[k] - 1 / temps[k + 1]) * (distances[k] - distances[k + 1])
+            if exponent >= 0 or math.exp(exponent) > self.rng.random():
+                routes[k], routes[k + 1] = routes[k + 1], routes[k]
+                distances[k], distances[k + 1] = distances[k + 1], distances[k]
+                self.exchange_accepted += 1
+    
+    def _solve_parallel_tempering(self, callback=None, initial_route=None, stop=None):
+        """
+        Giải bằng parallel tempering: num_chains chuỗi ở các nhiệt độ khác nhau
+        
+        Các chuỗi chạy từng đoạn exchange_interval vòng lặp (song song trên các
+        tiến trình worker), sau mỗi đoạn tiến trình chính cập nhật best toàn cục
+        và trao đổi trạng thái giữa các chuỗi kề nhau.
+        
+        Args:
+            callback: Hàm callback (route, distance, iteration), gọi sau mỗi đoạn
+            initial_route: Tuyến khởi đầu chung cho mọi chuỗi (None = theo init)
+            stop: StopCondition, được kiểm tra sau mỗi đoạn
+            
+        Returns:
+            Tuple (best_route, best_distance, history)
+        """
+        if initial_route is None and self.init == 'random':
+            routes = [self._initial_route() for _ in range(self.num_chains)]
+        else:
+            # Mọi chuỗi bắt đầu từ cùng tuyến dựng sẵn; các chuỗi nóng tự phân tán
+            base = self._initial_route(initial_route)
+            routes = [base.copy() for _ in range(self.num_chains)]
+        distances = [self.tsp.calculate_route_distance(route) for route in routes]
+        self.stats.add(distance_evaluations=self.num_chains)
+        self._calibrate_temperatures(routes[0])
+        temps = self._temperature_ladder()
+        
+        best = int(np.argmin(distances))
+        self.best_route = routes[best].copy()
+        self.best_distance = distances[best]
+        self.history = [(0, self.best_distance)]
+        self.exchange_attempts = 0
+        self.exchange_accepted = 0
+        
+        num_workers = self.num_workers or min(self.num_chains, os.cpu_count() or 1)
+        pool = None
+        shared_here = False
+        iteration = 0
+        self.actual_iterations = 0
+        try:
+            if num_workers > 1:
+                # Đưa bài toán vào bộ nhớ dùng chung: mỗi worker chỉ nhận handle
+                # thay vì bản sao ma trận khoảng cách (bài toán đã chia sẻ sẵn
+                # thì dùng nguyên trạng và không unlink)
+                if not self.tsp.is_shared:
+                    self.tsp.share_memory()
+                    shared_here = True
+                pool = Pool(min(num_workers, self.num_chains),
+                            initializer=_init_chain_worker, initargs=(self,))
+            
+            # Với time_budget, số vòng lặp không giới hạn: dừng khi hết giờ (sau một đoạn)
+            max_iterations = self.max_iterations if self.time_budget is None else sys.maxsize
+            start_time = time.perf_counter()
+            while iteration < max_iterations:
+                steps = min(self.exchange_interval, max_iterations - iteration)
+                # Mỗi đoạn của mỗi chuỗi có luồng con spawn từ luồng chính:
+                # kết quả không phụ thuộc số worker
+                seeds = self.rng.seed_sequence.spawn(self.num_chains)
+                tasks = [(routes[k], distances[k], temps[k], steps, seeds[k])
+                         for k in range(self.num_chains)]
+                if pool is not None:
+                    results = pool.map(_run_chain_segment, tasks)
+                else:
+                    results = [self._run_seeded_segment(*task) for task in tasks]
+                
+                for k, (route, distance, best_route, best_distance, counts) in enumerate(results):
+                    routes[k], distances[k] = route, distance
+                    if best_distance < self.best_distance:
+                        self.best_route = best_route
+                        self.best_distance = best_distance
+                        self.stats.add(improvements=1)
+                    self.stats.add(moves_proposed=steps, moves_accepted=counts['accepted'],
+                                   distance_evaluations=counts['evaluations'])
+                    self.stats.add_time(move_generation=counts['move_time'],
+                                        evaluation=counts['eval_time'])
+                
+                iteration += steps
+                self.actual_iterations = iteration
+                self._exchange_replicas(routes, distances, temps, (iteration // self.exchange_interval) % 2)
+                self.history.append((iteration, self.best_distance))
+                self.stats.emit('progress', algorithm='SA', iteration=iteration,
+                                best_distance=self.best_distance)
+                
+                if callback:
+                    with self.stats.timer('callback'):
+                        callback(self.best_route, self.best_distance, iteration)
+                
+                if self.time_budget is not None and time.perf_counter() - start_time >= self.time_budget:
+                    break
+                if stop is not None and stop.should_stop(self.num_chains * (iteration + 1)):
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if shared_here:
+                self.tsp.unlink()
+        
+        return self.best_route, self.best_distance, self.history
+    
     def get_algorithm_info(self):
         """Lấy thông tin về thuật toán"""
         return {
@@ -143,5 +816,29 @@ class SimulatedAnnealing:
             'initial_temp': self.initial_temp,
             'cooling_rate': self.cooling_rate,
             'min_temp': self.min_temp,
-            'max_iterations': self.max_iterations
+            'start_temp': self.start_temp,
+            'end_temp': self.end_temp,
+            'time_budget': self.time_budget,
+            'max_iterations': self.max_iterations,
+            'use_delta': self.use_delta,
+            'neighborhood': self.neighborhood,
+            'candidate_k': self.candidate_k,
+            'seed': self.seed,
+            'init': self.init,
+            'polish': self.polish,
+            'num_chains': self.num_chains,
+            'exchange_interval': self.exchange_interval,
+            'exchange_acceptance': (self.exchange_accepted / self.exchange_attempts
+                                    if self.exchange_attempts else None)
         }
+    
+    def get_stats(self):
+        """
+        Lấy thống kê của lần chạy gần nhất (cần collect_stats=True)
+        
+        Returns:
+            Dict bộ đếm (moves_proposed, moves_accepted, improvements,
+            distance_evaluations), thời gian (move_generation, evaluation, local_search,
+            callback) và các tỉ lệ suy ra; {'enabled': False} nếu không thu thập
+        """
+        return self.stats.snapshot()
@@ -0,0 +1,234 @@
+"""
+Module chạy thuật toán trong tiến trình con (dùng cho GUI)
+Tiến trình con giải bài toán và gửi bản chụp tiến độ về qua multiprocessing.Queue,
+nên vòng lặp của thuật toán và việc vẽ giao diện không tranh nhau GIL
+"""
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+
+from algorithms import ALGORITHMS
+from cancellation import CancellationToken
+
+# Các thuộc tính của thuật toán được đồng bộ về đối tượng đại diện khi giải xong
+SYNCED_ATTRIBUTES = ('actual_iterations', 'stop_reason', 'start_temp', 'end_temp',
+                     'exchange_attempts', 'exchange_accepted')
+
+
+def _watch_cancel(cancel_event, cancel_token):
+    """
+    Thread trong tiến trình con: chuyển yêu cầu dừng của tiến trình cha sang cancel_token
+    
+    Thuật toán đọc cờ ở mọi vòng lặp; đọc trực tiếp multiprocessing.Event (cần
+    khóa liên tiến trình) đắt hơn nhiều so với threading.Event của CancellationToken.
+    """
+    cancel_event.wait()
+    cancel_token.cancel()
+
+
+def _solve_in_process(tsp, algo, params, messages, progress_interval, cancel_event):
+    """
+    Hàm chạy trong tiến trình con: giải bài toán và gửi tiến độ/kết quả về
+    
+    Thông điệp gửi về:
+        ('progress', route, distance, iteration, elapsed, new_history)
+        ('done', best_route, best_distance, new_history, elapsed, state)
+        ('error', exception)
+    trong đó new_history là các điểm history mới kể từ thông điệp trước.
+    Khi cancel_event được đặt, thuật toán dừng ở điểm kiểm tra kế tiếp và
+    vẫn gửi 'done' với kết quả tốt nhất hiện có.
+    """
+    if hasattr(os, 'setpgrp'):
+        # Nhóm tiến trình riêng: terminate() dừng được cả các worker của Pool
+        # (SA nhiều chuỗi, WOA nhiều đảo) mà tiến trình này tạo ra
+        os.setpgrp()
+    try:
+        solver = ALGORITHMS[algo](tsp, **params)
+        cancel_token = CancellationToken()
+        threading.Thread(target=_watch_cancel, args=(cancel_event, cancel_token),
+                         daemon=True).start()
+        start_time = time.perf_counter()
+        sent = 0
+        last_sent = None
+        
+        def callback(route, distance, iteration):
+            nonlocal sent, last_sent
+            now = time.perf_counter()
+            # Giới hạn tần suất gửi: mỗi thông điệp phải pickle cả tuyến đường
+            if last_sent is not None and now - last_sent < progress_interval:
+                return
+            last_sent = now
+            history = solver.history[sent:]
+            sent += len(history)
+            messages.put(('progress', list(route), float(distance), iteration,
+                          now - start_time, history))
+        
+        best_route, best_distance, history = solver.solve(callback=callback,
+                                                          cancel_token=cancel_token)
+        elapsed = time.perf_counter() - start_time
+        state = {name: getattr(solver, name) for name in SYNCED_ATTRIBUTES if hasattr(solver, name)}
+        messages.put(('done', list(best_route), float(best_distance), history[sent:],
+                      elapsed, state))
+    except (Exception, KeyboardInterrupt) as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        messages.put(('error', e))
+
+
+class SolverProcess:
+    """
+    Chạy một thuật toán (SA hoặc WOA) trong tiến trình con
+    
+    Một đối tượng thuật toán đại diện được tạo ngay trong tiến trình cha: nó
+    kiểm tra tham số trước khi khởi động tiến trình con và được cập nhật dần
+    (history, actual_iterations, stop_reason...) từ các thông điệp nhận về,
+    nên phần xuất kết quả dùng nó như một thuật toán đã chạy tại chỗ.
+    cancel() yêu cầu dừng hợp tác: tiến trình con vẫn gửi 'done' với kết quả
+    tốt nhất; terminate() có hiệu lực ngay, không cần chờ điểm kiểm tra.
+    Khi đã nhận kết quả thì gọi close() để join tiến trình con và đóng hàng đợi.
+    Tiến trình con không phải daemon (nó được phép tạo Pool cho num_chains > 1
+    hoặc num_islands > 1), nên người dùng phải gọi close() hoặc terminate().
+    
+    Attributes:
+        solver: Đối tượng thuật toán đại diện (không tự chạy)
+        best_route: Tuyến tốt nhất nhận được gần nhất
+        best_distance: Khoảng cách tương ứng
+        elapsed: Thời gian giải (giây, đo trong tiến trình con) gần nhất
+        finished: True khi đã nhận thông điệp 'done' hoặc 'error'
+    """
+    
+    # Khoảng cách tối thiểu (giây) giữa hai thông điệp tiến độ
+    PROGRESS_INTERVAL = 0.05
+    # Thời gian chờ tối đa (giây) khi thu dọn tiến trình con
+    JOIN_TIMEOUT = 1.0
+    
+    def __init__(self, tsp_problem, algorithm: str, params=None,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        """
+        Khởi tạo (chưa khởi động tiến trình con)
+        
+        Args:
+            tsp_problem: Đối tượng TSProblem
+            algorithm: Tên thuật toán, thuộc ALGORITHMS ('SA' hoặc 'WOA')
+            params: Dict tham số truyền cho hàm khởi tạo thuật toán
+            progress_interval: Khoảng cách tối thiểu giữa hai thông điệp tiến độ
+            
+        Raises:
+            ValueError: Nếu tên thuật toán hoặc tham số không hợp lệ
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Thuật toán phải thuộc {tuple(ALGORITHMS)}, nhận được: {algorithm}")
+        
+        if progress_interval < 0:
+            raise ValueError(f"progress_interval phải >= 0, nhận được: {progress_interval}")
+        
+        self.tsp = tsp_problem
+        self.algorithm = algorithm
+        self.params = dict(params or {})
+        self.progress_interval = progress_interval
+        self.solver = ALGORITHMS[algorithm](tsp_problem, **self.params)
+        self.best_route = None
+        self.best_distance = None
+        self.elapsed = None
+        self.finished = False
+        # 'spawn': tiến trình con không kế thừa trạng thái Tk của tiến trình cha
+        self._context = multiprocessing.get_context('spawn')
+        self._messages = self._context.Queue()
+        self._cancel_event = self._context.Event()
+        self._process = None
+    
+    def start(self) -> None:
+        """Khởi động tiến trình con (không phải daemon, xem close/terminate)"""
+        if self._process is not None:
+            raise RuntimeError("SolverProcess chỉ được khởi động một lần")
+        self._process = self._context.Process(
+            target=_solve_in_process,
+            args=(self.tsp, self.algorithm, self.params, self._messages, self.progress_interval,
+                  self._cancel_event)
+        )
+        self._process.start()
+    
+    def poll(self):
+        """
+        Rút mọi thông điệp đang chờ (không chặn) và cập nhật đối tượng đại diện
+        
+        Returns:
+            List thông điệp theo thứ tự nhận (xem _solve_in_process)
+        """
+        messages = []
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            self._apply(message)
+            messages.append(message)
+        return messages
+    
+    def _apply(self, message) -> None:
+        """Cập nhật đối tượng đại diện theo một thông điệp"""
+        kind = message[0]
+        if kind == 'progress':
+            _, route, distance, _, elapsed, history = message
+            self.best_route, self.best_distance, self.elapsed = route, distance, elapsed
+            self.solver.history.extend(history)
+        elif kind == 'done':
+            _, route, distance, history, elapsed, state = message
+            self.best_route, self.best_distance, self.elapsed = route, distance, elapsed
+            self.solver.history.extend(history)
+            for name, value in state.items():
+                setattr(self.solver, name, value)
+            self.finished = True
+        else:
+            self.finished = True
+    
+    def cancel(self) -> None:
+        """
+        Yêu cầu tiến trình con dừng ở điểm kiểm tra kế tiếp (không chặn)
+        
+        Tiến trình con vẫn gửi 'done' với kết quả tốt nhất hiện có, stop_reason='cancelled'.
+        """
+        self._cancel_event.set()
+    
+    def is_alive(self) -> bool:
+        """True nếu tiến trình con đang chạy"""
+        return self._process is not None and self._process.is_alive()
+    
+    @property
+    def exitcode(self):
+        """Mã thoát của tiến trình con (None nếu chưa kết thúc)"""
+        return None if self._process is None else self._process.exitcode
+    
+    def close(self) -> None:
+        """
+        Thu dọn sau khi tiến trình con đã kết thúc (finished): join với
+        JOIN_TIMEOUT rồi đóng hàng đợi; nếu quá hạn mà chưa thoát thì dừng hẳn
+        """
+        if self.is_alive():
+            self._process.join(self.JOIN_TIMEOUT)
+        self.terminate()
+    
+    def terminate(self) -> None:
+        """
+        Dừng ngay tiến trình con cùng các worker của nó (kết quả tốt nhất đã
+        nhận vẫn được giữ)
+        """
+        if self.is_alive():
+            try:
+                # Tiến trình con là trưởng nhóm của chính nó (xem _solve_in_process)
+                os.killpg(self._process.pid, signal.SIGTERM)
+            except (AttributeError, OSError):
+                # Không có killpg (Windows) hoặc tiến trình con chưa kịp tạo nhóm
+                self._process.terminate()
+            self._process.join(self.JOIN_TIMEOUT)
+        if not self.finished:
+            self.solver.stop_reason = 'cancelled'
+        # Tiến trình con có thể bị dừng giữa lúc ghi: bỏ hàng đợi, không chờ feeder thread
+        self._messages.cancel_join_thread()
+        self._messages.close()
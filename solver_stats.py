@@ -0,0 +1,127 @@
+"""
+Module thống kê (instrumentation) cho các thuật toán giải TSP
+Đếm số bước đi, số lần đánh giá khoảng cách và thời gian theo từng phần của vòng lặp
+"""
+import json
+import time
+from contextlib import contextmanager
+
+
+class SolverStats:
+    """
+    Bộ đếm và bộ bấm giờ nhẹ cho vòng lặp của thuật toán
+    
+    Khi enabled=False mọi phương thức đều không làm gì, nên thuật toán có thể
+    gọi chúng vô điều kiện ở các điểm thưa (mốc lịch sử, cuối vòng lặp); trong
+    vòng lặp nóng thuật toán tự cộng dồn vào biến cục bộ rồi ghi vào đây.
+    
+    Attributes:
+        enabled: Có thu thập thống kê hay không
+        counters: Dict tên bộ đếm -> giá trị
+        timers: Dict tên bộ bấm giờ -> tổng số giây
+    """
+    
+    COUNTERS = ('moves_proposed', 'moves_accepted', 'improvements', 'distance_evaluations')
+    TIMERS = ('move_generation', 'evaluation', 'local_search', 'callback')
+    
+    def __init__(self, enabled=True, stream=None):
+        """
+        Khởi tạo bộ thống kê
+        
+        Args:
+            enabled: Nếu False, không thu thập gì (chi phí gần như bằng 0)
+            stream: Nơi ghi các bản ghi JSON lines: đường dẫn tệp (ghi nối tiếp),
+                    đối tượng file có write(), hoặc None (không ghi)
+        """
+        self.enabled = enabled
+        self._stream = stream
+        self._file = None
+        self.reset()
+    
+    def reset(self):
+        """Đặt lại mọi bộ đếm và bộ bấm giờ về 0, bắt đầu tính thời gian tổng"""
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.timers = dict.fromkeys(self.TIMERS, 0.0)
+        self._start_time = time.perf_counter()
+        self._end_time = None
+    
+    def add(self, **counts):
+        """Cộng vào các bộ đếm, ví dụ add(moves_proposed=100, moves_accepted=12)"""
+        if self.enabled:
+            for name, amount in counts.items():
+                self.counters[name] += amount
+    
+    def add_time(self, **seconds):
+        """Cộng vào các bộ bấm giờ, ví dụ add_time(evaluation=0.25)"""
+        if self.enabled:
+            for name, amount in seconds.items():
+                self.timers[name] += amount
+    
+    @contextmanager
+    def timer(self, name):
+        """Bấm giờ một khối lệnh (dùng cho các đoạn thưa như callback)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+    
+    def stop(self):
+        """Chốt thời gian tổng (gọi khi thuật toán kết thúc)"""
+        self._end_time = time.perf_counter()
+    
+    def snapshot(self):
+        """
+        Lấy bản chụp thống kê hiện tại
+        
+        Returns:
+            Dict gồm enabled, counters, timers, total_time và các tỉ lệ suy ra
+            (acceptance_rate, evaluations_per_second); chỉ có 'enabled' khi tắt
+        """
+        if not self.enabled:
+            return {'enabled': False}
+        end = self._end_time if self._end_time is not None else time.perf_counter()
+        total = end - self._start_time
+        proposed = self.counters['moves_proposed']
+        return {
+            'enabled': True,
+            'counters': dict(self.counters),
+            'timers': dict(self.timers),
+            'total_time': total,
+            'acceptance_rate': self.counters['moves_accepted'] / proposed if proposed else None,
+            'evaluations_per_second': (self.counters['distance_evaluations'] / total
+                                       if total > 0 else None),
+        }
+    
+    def emit(self, event, **fields):
+        """
+        Ghi một bản ghi JSON lines gồm event, fields và bản chụp thống kê
+        
+        Args:
+            event: Tên sự kiện ('start', 'progress', 'end', ...)
+            **fields: Các trường bổ sung (iteration, best_distance, ...)
+        """
+        if not self.enabled or self._stream is None:
+            return
+        if self._file is None:
+            self._file = (open(self._stream, 'a', encoding='utf-8')
+                          if isinstance(self._stream, str) else self._stream)
+        record = {'event': event, 'time': time.time(), **fields, **self.snapshot()}
+        self._file.write(json.dumps(record, default=float, ensure_ascii=False) + '\n')
+        self._file.flush()
+    
+    def close(self):
+        """Đóng tệp stream nếu chính bộ thống kê đã mở nó"""
+        if self._file is not None and isinstance(self._stream, str):
+            self._file.close()
+        self._file = None
+    
+    def __getstate__(self):
+        # Tệp đang mở không pickle được (solver được gửi sang tiến trình worker)
+        state = self.__dict__.copy()
+        state['_file'] = None
+        state['_stream'] = None
+        return state
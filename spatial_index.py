@@ -0,0 +1,188 @@
+"""
+Module chỉ mục không gian (lưới đều) cho tọa độ các thành phố
+Dùng để truy vấn láng giềng gần mà không cần ma trận khoảng cách O(n²)
+"""
+import numpy as np
+from typing import Optional
+
+
+class UniformGrid:
+    """
+    Lưới ô vuông đều phủ lên tập điểm 2D
+    
+    Các điểm được sắp xếp theo chỉ số ô (ô = cx * grid_height + cy), nên các ô
+    liên tiếp trên cùng một cột lưới nằm liền nhau trong mảng và một khối ô
+    hình chữ nhật chỉ cần một lát cắt cho mỗi cột.
+    
+    Attributes:
+        coords: Mảng tọa độ shape (n, 2)
+        cell_size: Kích thước cạnh ô
+        grid_width: Số ô theo trục x
+        grid_height: Số ô theo trục y
+    """
+    
+    POINTS_PER_CELL = 2
+    
+    def __init__(self, coords: np.ndarray, points_per_cell: float = POINTS_PER_CELL):
+        """
+        Xây dựng lưới
+        
+        Args:
+            coords: Tọa độ các điểm, shape (n, 2)
+            points_per_cell: Số điểm trung bình mong muốn trong mỗi ô
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.ndim != 2 or coords.shape[1] != 2 or coords.shape[0] == 0:
+            raise ValueError(f"Tọa độ phải có shape (n, 2) với n > 0, nhận được: {coords.shape}")
+        if points_per_cell <= 0:
+            raise ValueError(f"points_per_cell phải > 0, nhận được: {points_per_cell}")
+        
+        self.coords = coords
+        self.points_per_cell = points_per_cell
+        n = coords.shape[0]
+        self._origin = coords.min(axis=0)
+        extent = coords.max(axis=0) - self._origin
+        area = max(float(extent[0]), 1e-12) * max(float(extent[1]), 1e-12)
+        size = np.sqrt(area * points_per_cell / n)
+        self.cell_size = max(size, float(extent.max()) / max(n, 1), 1e-12)
+        
+        self.grid_width = int(extent[0] // self.cell_size) + 1
+        self.grid_height = int(extent[1] // self.cell_size) + 1
+        
+        cx, cy = self._cell_of(coords)
+        cell_ids = cx * self.grid_height + cy
+        self._order = np.argsort(cell_ids, kind='stable')
+        counts = np.bincount(cell_ids, minlength=self.grid_width * self.grid_height)
+        self._cell_start = np.concatenate(([0], np.cumsum(counts)))
+    
+    def _cell_of(self, points: np.ndarray):
+        """Tính ô (cx, cy) chứa mỗi điểm, kẹp vào trong lưới"""
+        cells = np.floor((points - self._origin) / self.cell_size).astype(np.int64)
+        cx = np.clip(cells[..., 0], 0, self.grid_width - 1)
+        cy = np.clip(cells[..., 1], 0, self.grid_height - 1)
+        return cx, cy
+    
+    def _points_in_block(self, cx0: int, cx1: int, cy0: int, cy1: int) -> np.ndarray:
+        """Lấy chỉ số các điểm thuộc khối ô [cx0..cx1] x [cy0..cy1] (đã kẹp vào lưới)"""
+        cx0, cy0 = max(cx0, 0), max(cy0, 0)
+        cx1, cy1 = min(cx1, self.grid_width - 1), min(cy1, self.grid_height - 1)
+        if cx0 > cx1 or cy0 > cy1:
+            return np.empty(0, dtype=np.int64)
+        
+        h = self.grid_height
+        start = self._cell_start
+        parts = [self._order[start[cx * h + cy0]:start[cx * h + cy1 + 1]]
+                 for cx in range(cx0, cx1 + 1)]
+        return np.concatenate(parts)
+    
+    def _covers_grid(self, cx: int, cy: int, ring: int) -> bool:
+        """Kiểm tra khối bán kính ring ô quanh (cx, cy) đã phủ toàn bộ lưới chưa"""
+        return (cx - ring <= 0 and cy - ring <= 0 and
+                cx + ring >= self.grid_width - 1 and cy + ring >= self.grid_height - 1)
+    
+    def query_radius(self, point, radius: float) -> np.ndarray:
+        """
+        Tìm các điểm nằm trong hình tròn tâm point, bán kính radius
+        
+        Args:
+            point: Tọa độ (x, y)
+            radius: Bán kính (>= 0)
+            
+        Returns:
+            Mảng chỉ số điểm, sắp xếp theo khoảng cách tăng dần
+        """
+        if radius < 0:
+            raise ValueError(f"Bán kính phải >= 0, nhận được: {radius}")
+        point = np.asarray(point, dtype=np.float64)
+        lo = np.floor((point - radius - self._origin) / self.cell_size).astype(np.int64)
+        hi = np.floor((point + radius - self._origin) / self.cell_size).astype(np.int64)
+        candidates = self._points_in_block(lo[0], hi[0], lo[1], hi[1])
+        if candidates.size == 0:
+            return candidates
+        
+        dist = np.hypot(*(self.coords[candidates] - point).T)
+        inside = dist <= radius
+        candidates, dist = candidates[inside], dist[inside]
+        return candidates[np.argsort(dist, kind='stable')]
+    
+    def query_nearest(self, point, k: int = 1, exclude: Optional[int] = None) -> np.ndarray:
+        """
+        Tìm k điểm gần point nhất bằng cách mở rộng dần vành ô quanh point
+        
+        Args:
+            point: Tọa độ (x, y)
+            k: Số điểm cần tìm
+            exclude: Chỉ số điểm cần bỏ qua (thường là chính điểm truy vấn)
+            
+        Returns:
+            Mảng chỉ số tối đa k điểm, sắp xếp theo khoảng cách tăng dần
+        """
+        point = np.asarray(point, dtype=np.float64)
+        cx, cy = (int(c) for c in self._cell_of(point))
+        wanted = k + (exclude is not None)
+        
+        ring = 1
+        while True:
+            candidates = self._points_in_block(cx - ring, cx + ring, cy - ring, cy + ring)
+            if exclude is not None:
+                candidates = candidates[candidates != exclude]
+            covered = self._covers_grid(cx, cy, ring)
+            if candidates.size >= k or covered:
+                dist = np.hypot(*(self.coords[candidates] - point).T)
+                m = min(k, candidates.size)
+                order = np.argsort(dist, kind='stable')[:m]
+                # Mọi điểm ngoài khối cách point ít nhất ring * cell_size
+                if covered or (m > 0 and dist[order[-1]] <= ring * self.cell_size):
+                    return candidates[order]
+            ring = max(ring * 2, ring + 1) if candidates.size < wanted else ring + 1
+    
+    def k_nearest_all(self, k: int) -> np.ndarray:
+        """
+        Tìm k láng giềng gần nhất (không tính chính nó) cho mọi điểm
+        
+        Xử lý theo từng ô: các điểm cùng ô dùng chung tập ứng viên từ khối 3x3 ô
+        xung quanh; điểm nào chưa chắc chắn đúng thì truy vấn lại riêng.
+        
+        Args:
+            k: Số láng giềng (1 <= k <= n - 1)
+            
+        Returns:
+            Mảng int shape (n, k), mỗi hàng sắp xếp theo khoảng cách tăng dần
+        """
+        n = self.coords.shape[0]
+        if not 1 <= k <= n - 1:
+            raise ValueError(f"k phải trong [1, {n - 1}], nhận được: {k}")
+        if self.points_per_cell < k:
+            # Ô quá nhỏ so với k: dùng lưới thô hơn để khối 3x3 đủ ứng viên
+            return UniformGrid(self.coords, points_per_cell=k).k_nearest_all(k)
+        
+        result = np.empty((n, k), dtype=np.int64)
+        h = self.grid_height
+        start = self._cell_start
+        leftovers = []
+        
+        for cell in np.flatnonzero(np.diff(start)):
+            members = self._order[start[cell]:start[cell + 1]]
+            cx, cy = divmod(int(cell), h)
+            candidates = self._points_in_block(cx - 1, cx + 1, cy - 1, cy + 1)
+            if candidates.size <= k:
+                leftovers.extend(members.tolist())
+                continue
+            
+            diff = self.coords[members][:, np.newaxis, :] - self.coords[candidates][np.newaxis, :, :]
+            dist = np.hypot(diff[..., 0], diff[..., 1])
+            dist[members[:, np.newaxis] == candidates[np.newaxis, :]] = np.inf
+            nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+            order = np.argsort(nearest_dist, axis=1, kind='stable')
+            result[members] = candidates[np.take_along_axis(nearest, order, axis=1)]
+            
+            # Điểm trong ô cách biên khối 3x3 ít nhất khoảng cách tới biên ô của nó
+            offset = self.coords[members] - self._origin - np.array([cx, cy]) * self.cell_size
+            margin = self.cell_size + np.minimum(offset, self.cell_size - offset).min(axis=1)
+            unsure = nearest_dist.max(axis=1) > margin
+            leftovers.extend(members[unsure].tolist())
+        
+        for index in leftovers:
+            result[index] = self.query_nearest(self.coords[index], k, exclude=index)
+        return result
@@ -0,0 +1,47 @@
+"""
+Kiểm thử SimulatedAnnealing nhiều chuỗi (parallel tempering)
+"""
+import numpy as np
+import pytest
+
+from simulated_annealing import SimulatedAnnealing
+from tsp_problem import TSProblem
+
+
+@pytest.fixture
+def tsp():
+    coords = np.random.default_rng(0).uniform(0, 100, size=(30, 2))
+    return TSProblem(30, city_coords=coords)
+
+
+def _solve(tsp, num_workers):
+    sa = SimulatedAnnealing(tsp, max_iterations=2000, num_chains=3, exchange_interval=200,
+                            num_workers=num_workers, seed=7)
+    return sa.solve()
+
+
+def test_parallel_tempering_result_does_not_depend_on_num_workers(tsp):
+    serial = _solve(tsp, num_workers=1)
+    parallel = _solve(tsp, num_workers=2)
+    assert parallel[0] == serial[0]
+    assert parallel[1] == serial[1]
+    assert parallel[2] == serial[2]
+
+
+def test_parallel_tempering_shares_problem_only_while_solving(tsp):
+    _solve(tsp, num_workers=2)
+    assert not tsp.is_shared
+    
+    # Bài toán người gọi đã chia sẻ sẵn được giữ nguyên trạng
+    tsp.share_memory()
+    try:
+        _solve(tsp, num_workers=2)
+        assert tsp.is_shared
+    finally:
+        tsp.unlink()
+
+
+@pytest.mark.parametrize('temps', [{'initial_temp': 'Auto'}, {'min_temp': 'fast'}])
+def test_unknown_temperature_string_raises_value_error(tsp, temps):
+    with pytest.raises(ValueError):
+        SimulatedAnnealing(tsp, **temps)
@@ -0,0 +1,55 @@
+"""
+Kiểm thử SolverProcess (thuật toán chạy trong tiến trình con)
+"""
+import time
+
+import numpy as np
+import pytest
+
+from solver_process import SolverProcess
+from tsp_problem import TSProblem
+
+TIMEOUT = 60.0
+
+
+@pytest.fixture
+def tsp():
+    coords = np.random.default_rng(0).uniform(0, 100, size=(30, 2))
+    return TSProblem(30, city_coords=coords)
+
+
+def _wait(process, condition):
+    deadline = time.perf_counter() + TIMEOUT
+    while not condition() and time.perf_counter() < deadline:
+        process.poll()
+        time.sleep(0.02)
+
+
+@pytest.mark.parametrize('algorithm, params', [
+    ('SA', {'max_iterations': 2000, 'num_chains': 2, 'num_workers': 2}),
+    ('WOA', {'num_whales': 8, 'max_iterations': 40, 'num_islands': 2, 'num_workers': 2}),
+])
+def test_child_can_run_worker_pool(tsp, algorithm, params):
+    process = SolverProcess(tsp, algorithm, dict(params, seed=1))
+    process.start()
+    try:
+        _wait(process, lambda: process.finished)
+        assert process.solver.stop_reason == 'completed'
+        assert process.best_distance == pytest.approx(tsp.calculate_route_distance(process.best_route))
+    finally:
+        process.close()
+    assert not process.is_alive()
+
+
+def test_cancel_returns_best_route_so_far(tsp):
+    process = SolverProcess(tsp, 'SA', {'max_iterations': 10 ** 9, 'cooling_rate': 0.9999999})
+    process.start()
+    try:
+        _wait(process, lambda: process.best_route is not None)
+        process.cancel()
+        _wait(process, lambda: process.finished)
+        assert process.solver.stop_reason == 'cancelled'
+        assert sorted(process.best_route) == list(range(30))
+    finally:
+        process.close()
+    assert process.exitcode == 0
@@ -0,0 +1,106 @@
+"""
+Kiểm thử TSProblem: đánh giá delta so với tính lại toàn bộ tuyến, và sự nhất
+quán giữa các cách lưu khoảng cách (storage) và kiểu giá trị (dtype)
+"""
+import numpy as np
+import pytest
+
+from simulated_annealing import SimulatedAnnealing
+from tsp_problem import TSProblem
+
+NUM_CITIES = 12
+
+
+@pytest.fixture
+def tsp():
+    coords = np.random.default_rng(0).uniform(0, 100, size=(NUM_CITIES, 2))
+    return TSProblem(NUM_CITIES, city_coords=coords)
+
+
+@pytest.fixture
+def route():
+    return np.random.default_rng(1).permutation(NUM_CITIES).tolist()
+
+
+def _check_delta(tsp, route, delta, apply, *move):
+    """delta của một bước đi phải bằng độ dài sau khi áp dụng trừ độ dài trước"""
+    before = tsp.calculate_route_distance(route)
+    moved = list(route)
+    apply(moved, *move)
+    assert delta(route, *move) == pytest.approx(tsp.calculate_route_distance(moved) - before, abs=1e-9)
+
+
+def test_swap_delta_matches_recompute(tsp, route):
+    for i in range(NUM_CITIES):
+        for j in range(NUM_CITIES):
+            _check_delta(tsp, route, tsp.swap_delta, TSProblem.apply_swap, i, j)
+
+
+def test_two_opt_delta_matches_recompute(tsp, route):
+    for i in range(NUM_CITIES):
+        for j in range(NUM_CITIES):
+            _check_delta(tsp, route, tsp.two_opt_delta, TSProblem.apply_two_opt, i, j)
+
+
+def test_insertion_delta_matches_recompute(tsp, route):
+    for i in range(NUM_CITIES):
+        for j in range(NUM_CITIES):
+            _check_delta(tsp, route, tsp.insertion_delta, TSProblem.apply_insertion, i, j)
+
+
+@pytest.mark.parametrize('length', [1, 2, 3])
+def test_or_opt_delta_matches_recompute(tsp, route, length):
+    for i in range(NUM_CITIES - length + 1):
+        for j in range(NUM_CITIES):
+            if not i <= j < i + length:
+                _check_delta(tsp, route, tsp.or_opt_delta, TSProblem.apply_or_opt, i, length, j)
+
+
+@pytest.mark.parametrize('neighborhood', SimulatedAnnealing.NEIGHBORHOODS)
+def test_sa_delta_run_matches_full_recompute_run(tsp, neighborhood):
+    """Cùng seed, SA dùng delta và SA tính lại cả tuyến phải đi qua cùng các khoảng cách tốt nhất"""
+    runs = [SimulatedAnnealing(tsp, max_iterations=3000, neighborhood=neighborhood,
+                               use_delta=use_delta, seed=0).solve()
+            for use_delta in (True, False)]
+    (_, delta_distance, delta_history), (_, full_distance, full_history) = runs
+    assert delta_distance == pytest.approx(full_distance, abs=1e-9)
+    assert [iteration for iteration, _ in delta_history] == [iteration for iteration, _ in full_history]
+    assert [d for _, d in delta_history] == pytest.approx([d for _, d in full_history], abs=1e-9)
+
+
+STORAGE_DTYPES = [(storage, dtype) for storage in TSProblem.STORAGE_MODES for dtype in TSProblem.DTYPES
+                  if not (storage == 'on_demand' and dtype == 'float32')]
+
+
+@pytest.mark.parametrize('storage, dtype', STORAGE_DTYPES)
+def test_storage_matches_dense_matrix(storage, dtype, route):
+    coords = np.random.default_rng(0).uniform(0, 100, size=(NUM_CITIES, 2))
+    dense = TSProblem(NUM_CITIES, city_coords=coords, dtype=dtype)
+    tsp = TSProblem(NUM_CITIES, city_coords=coords, storage=storage, dtype=dtype)
+    
+    rows = [tsp.get_distance_row(city) for city in range(NUM_CITIES)]
+    assert all(row.dtype == TSProblem.DTYPES[dtype] for row in rows)
+    assert np.array_equal(np.array(rows), dense.distance_matrix)
+    
+    for a in range(NUM_CITIES):
+        for b in range(NUM_CITIES):
+            distance = tsp.get_distance(a, b)
+            expected = dense.get_distance(a, b)
+            assert type(distance) is type(expected)
+            # Tính theo yêu cầu dùng math.hypot: float64 có thể lệch ở bit cuối
+            assert distance == pytest.approx(expected, rel=1e-12, abs=0)
+    
+    assert tsp.calculate_route_distance(route) == pytest.approx(dense.calculate_route_distance(route))
+    assert tsp.evaluate_routes([route])[0] == pytest.approx(dense.evaluate_routes([route])[0])
+    for i, j in [(0, 5), (3, 4), (0, NUM_CITIES - 1), (7, 2)]:
+        assert tsp.two_opt_delta(route, i, j) == pytest.approx(dense.two_opt_delta(route, i, j))
+
+
+def test_tsplib_distances_are_rounded_integers():
+    coords = np.random.default_rng(0).uniform(0, 100, size=(NUM_CITIES, 2))
+    exact = TSProblem(NUM_CITIES, city_coords=coords)
+    for storage in TSProblem.STORAGE_MODES:
+        tsp = TSProblem(NUM_CITIES, city_coords=coords, storage=storage, dtype='tsplib')
+        row = tsp.get_distance_row(0)
+        assert np.array_equal(row, np.floor(exact.get_distance_row(0) + 0.5))
+        assert tsp.get_distance(0, 0) == 0 and isinstance(tsp.get_distance(0, 0), int)
@@ -0,0 +1,74 @@
+"""
+Kiểm thử WOA: mô hình đảo và cách cập nhật leader
+"""
+import numpy as np
+import pytest
+
+from tsp_problem import TSProblem
+from woa_algorithm import WOA
+
+
+@pytest.fixture
+def tsp():
+    coords = np.random.default_rng(0).uniform(0, 100, size=(30, 2))
+    return TSProblem(30, city_coords=coords)
+
+
+def _solve(tsp, num_workers, **params):
+    woa = WOA(tsp, num_whales=12, max_iterations=60, num_islands=3, migration_interval=20,
+              num_workers=num_workers, seed=7, **params)
+    return woa.solve()
+
+
+@pytest.mark.parametrize('topology', WOA.MIGRATION_TOPOLOGIES)
+def test_islands_result_does_not_depend_on_num_workers(tsp, topology):
+    serial = _solve(tsp, num_workers=1, migration_topology=topology)
+    parallel = _solve(tsp, num_workers=2, migration_topology=topology)
+    assert parallel[0] == serial[0]
+    assert parallel[1] == serial[1]
+    assert parallel[2] == serial[2]
+
+
+def test_islands_share_problem_only_while_solving(tsp):
+    _solve(tsp, num_workers=2)
+    assert not tsp.is_shared
+    
+    # Bài toán người gọi đã chia sẻ sẵn được giữ nguyên trạng
+    tsp.share_memory()
+    try:
+        _solve(tsp, num_workers=2)
+        assert tsp.is_shared
+    finally:
+        tsp.unlink()
+
+
+@pytest.mark.parametrize('leader_update', WOA.LEADER_UPDATES)
+def test_fitness_matches_positions(tsp, leader_update):
+    woa = WOA(tsp, num_whales=10, max_iterations=30, leader_update=leader_update, seed=3)
+    best_route, best_distance, _ = woa.solve()
+    assert np.allclose(woa.fitness, tsp.evaluate_routes(woa.positions))
+    assert best_distance == pytest.approx(tsp.calculate_route_distance(best_route))
+    assert best_distance <= woa.fitness.min() + 1e-9
+
+
+def test_swap_sequence_turns_route_into_target(tsp):
+    woa = WOA(tsp, seed=0)
+    rng = np.random.default_rng(5)
+    for _ in range(20):
+        route, target = rng.permutation(30).tolist(), rng.permutation(30).tolist()
+        swaps = woa._get_swap_sequence(route, target)
+        moved = list(route)
+        for i, j in swaps:
+            moved[i], moved[j] = moved[j], moved[i]
+        assert moved == target
+        assert woa._swap_distance(route, target) == len(swaps)
+        # Hoán vị nghịch tính sẵn (như leader_position_of) cho cùng kết quả
+        assert woa._swap_distance(route, target, target_position_of=np.argsort(target).tolist()) == len(swaps)
+
+
+def test_swap_sequence_does_not_depend_on_target_identity(tsp):
+    woa = WOA(tsp, num_whales=4, max_iterations=1, seed=0)
+    woa.solve()
+    route = np.random.default_rng(5).permutation(30).tolist()
+    leader_copy = list(woa.leader_position)
+    assert woa._get_swap_sequence(route, woa.leader_position) == woa._get_swap_sequence(route, leader_copy)
@@ -2,9 +2,17 @@
 Module định nghĩa bài toán TSP (Traveling Salesman Problem)
 Bài toán người bán hàng - tìm đường đi ngắn nhất qua tất cả thành phố
 """
+import math
+import os
+import tempfile
+from collections import OrderedDict
+from multiprocessing.shared_memory import SharedMemory
+
 import numpy as np
 from typing import List, Optional, Tuple
 
+from spatial_index import UniformGrid
+
 
 class TSProblem:
     """
@@ -14,25 +22,244 @@ class TSProblem:
         num_cities: Số lượng thành phố
         city_coords: Mảng numpy chứa tọa độ (x, y) của các thành phố
         distance_matrix: Ma trận khoảng cách giữa các cặp thành phố
+                         (None khi storage khác 'dense')
+        condensed_distances: Nửa tam giác trên của ma trận dạng mảng 1 chiều
+                             (None khi storage khác 'condensed')
+        storage: Cách lưu khoảng cách ('dense', 'condensed' hoặc 'on_demand')
+        dtype: Kiểu giá trị khoảng cách ('float64', 'float32' hoặc 'tsplib')
     """
     
     MIN_CITIES = 3
-    MAX_CITIES = 500
+    MAX_CITIES = 500  # Giới hạn khi lưu ma trận đầy đủ (storage='dense')
+    MAX_CITIES_CONDENSED = 5000  # Giới hạn khi lưu nửa tam giác trên
+    MAX_CITIES_ON_DEMAND = 200_000  # Giới hạn khi tính khoảng cách theo yêu cầu
     COORD_RANGE = 100.0
+    STORAGE_MODES = ('dense', 'condensed', 'on_demand')
+    # 'tsplib': làm tròn về số nguyên gần nhất (nint) như EUC_2D của TSPLIB, lưu int32
+    DTYPES = {'float64': np.float64, 'float32': np.float32, 'tsplib': np.int32}
+    BUILD_BLOCK_ELEMENTS = 1 << 22  # Số phần tử tối đa của mỗi khối khi dựng ma trận
+    # Nơi đặt các mảng dùng chung giữa các tiến trình (xem share_memory)
+    SHARED_BACKENDS = ('shm', 'memmap')
+    SHARED_ARRAYS = ('city_coords', 'distance_matrix', 'condensed_distances')
     
-    def __init__(self, num_cities: int = 20, city_coords: Optional[np.ndarray] = None):
+    def __init__(self, num_cities: int = 20, city_coords: Optional[np.ndarray] = None,
+                 storage: str = 'dense', cache_rows: int = 0, dtype: str = 'float64'):
         """
         Khởi tạo bài toán TSP
         
         Args:
             num_cities: Số thành phố cần tạo (mặc định 20)
             city_coords: Tọa độ cho trước (nếu None sẽ tạo ngẫu nhiên)
+            storage: 'dense' lưu ma trận khoảng cách n x n;
+                     'condensed' chỉ lưu n(n-1)/2 phần tử phía trên đường chéo;
+                     'on_demand' tính khoảng cách từ tọa độ khi cần (không có ma trận)
+            cache_rows: Số hàng khoảng cách được giữ lại trong bộ nhớ đệm LRU
+                        của get_distance_row (dùng với 'condensed' và 'on_demand')
+            dtype: 'float64' (mặc định), 'float32' (một nửa bộ nhớ) hoặc
+                   'tsplib' (làm tròn nint, int32); 'float32' không dùng với 'on_demand'
             
         Raises:
             ValueError: Nếu tham số không hợp lệ
         """
+        if storage not in self.STORAGE_MODES:
+            raise ValueError(
+                f"storage phải thuộc {self.STORAGE_MODES}, nhận được: {storage}"
+            )
+        if cache_rows < 0:
+            raise ValueError(f"cache_rows phải >= 0, nhận được: {cache_rows}")
+        if dtype not in self.DTYPES:
+            raise ValueError(f"dtype phải thuộc {tuple(self.DTYPES)}, nhận được: {dtype}")
+        if storage == 'on_demand' and dtype == 'float32':
+            raise ValueError("dtype='float32' không có tác dụng với storage='on_demand'")
+        
+        self.storage = storage
+        self.cache_rows = cache_rows
+        self.dtype = dtype
         self._validate_and_init(num_cities, city_coords)
-        self.distance_matrix = self._build_distance_matrix()
+        self.distance_matrix = None
+        self.condensed_distances = None
+        if storage == 'dense':
+            self.distance_matrix = self._build_distance_matrix()
+        elif storage == 'condensed':
+            self.condensed_distances = self._build_condensed_distances()
+        self._candidate_cache = {}
+        self._spatial_index = None
+        self._init_shared_state()
+        self._bind_distance_backend()
+    
+    def _bind_distance_backend(self) -> None:
+        """Chuẩn bị hàm tính khoảng cách giữa 2 thành phố theo cách lưu trữ"""
+        self._row_cache = OrderedDict()
+        if self.distance_matrix is not None:
+            # item() trả về số Python, nhanh hơn chỉ mục numpy trong vòng lặp
+            self._dist = self.distance_matrix.item
+        elif self.condensed_distances is not None:
+            item = self.condensed_distances.item
+            n2 = 2 * self.num_cities - 1
+            # Số 0 cùng kiểu với item() của dtype (int cho 'tsplib', float cho các dtype khác)
+            zero = self.DTYPES[self.dtype](0).item()
+            
+            def dist(a: int, b: int) -> float:
+                if a == b:
+                    return zero
+                if a > b:
+                    a, b = b, a
+                return item(a * (n2 - a) // 2 + b - a - 1)
+            self._dist = dist
+        else:
+            xs = self.city_coords[:, 0].tolist()
+            ys = self.city_coords[:, 1].tolist()
+            hypot = math.hypot
+            
+            if self.dtype == 'tsplib':
+                def dist(a: int, b: int) -> float:
+                    return int(hypot(xs[a] - xs[b], ys[a] - ys[b]) + 0.5)
+            else:
+                def dist(a: int, b: int) -> float:
+                    return hypot(xs[a] - xs[b], ys[a] - ys[b])
+            self._dist = dist
+    
+    def __getstate__(self) -> dict:
+        # Hàm khoảng cách và bộ nhớ đệm được tạo lại khi unpickle;
+        # mảng dùng chung chỉ gửi handle, bên nhận gắn lại view chỉ đọc
+        state = self.__dict__.copy()
+        for key in ('_dist', '_row_cache', '_spatial_index', '_shared_blocks', '_owned_handles'):
+            state.pop(key, None)
+        for attr in self._shared:
+            state[attr] = None
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_shared', {})
+        self._spatial_index = None
+        self._shared_blocks = []
+        self._owned_handles = []
+        for attr, handle in self._shared.items():
+            setattr(self, attr, self._attach_shared(handle))
+        self._bind_distance_backend()
+    
+    def _init_shared_state(self) -> None:
+        """Khởi tạo trạng thái bộ nhớ dùng chung (chưa chia sẻ mảng nào)"""
+        self._shared = {}  # Tên thuộc tính -> handle của mảng dùng chung
+        self._shared_blocks = []  # Các khối SharedMemory đang gắn trong tiến trình này
+        self._owned_handles = []  # Các handle do tiến trình này tạo (cần unlink)
+    
+    @property
+    def is_shared(self) -> bool:
+        """True nếu các mảng đang nằm trong bộ nhớ dùng chung"""
+        return bool(self._shared)
+    
+    def share_memory(self, backend: str = 'shm', directory: Optional[str] = None) -> 'TSProblem':
+        """
+        Chuyển tọa độ và mảng khoảng cách vào bộ nhớ dùng chung giữa các tiến trình
+        
+        Sau khi gọi, pickle bài toán chỉ gửi handle (tên khối nhớ hoặc đường dẫn
+        tệp) thay vì dữ liệu; tiến trình nhận gắn view chỉ đọc lên cùng vùng nhớ.
+        Tiến trình tạo ra phải gọi unlink() khi không còn tiến trình nào dùng.
+        
+        Args:
+            backend: 'shm' (multiprocessing.shared_memory) hoặc 'memmap'
+                     (tệp ánh xạ bộ nhớ)
+            directory: Thư mục chứa tệp khi backend='memmap' (None = thư mục tạm)
+            
+        Returns:
+            Chính đối tượng này
+            
+        Raises:
+            ValueError: Nếu backend không hợp lệ hoặc bài toán đã được chia sẻ
+        """
+        if backend not in self.SHARED_BACKENDS:
+            raise ValueError(f"backend phải thuộc {self.SHARED_BACKENDS}, nhận được: {backend}")
+        if self._shared:
+            raise ValueError("Bài toán đã nằm trong bộ nhớ dùng chung")
+        
+        for attr in self.SHARED_ARRAYS:
+            array = getattr(self, attr)
+            if array is None:
+                continue
+            array = np.ascontiguousarray(array)
+            if backend == 'shm':
+                shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+                np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+                handle = ('shm', shm.name, array.shape, array.dtype.str)
+                shm.close()
+            else:
+                fd, path = tempfile.mkstemp(prefix=f'tsp_{attr}_', suffix='.dat', dir=directory)
+                os.close(fd)
+                if array.nbytes:
+                    target = np.memmap(path, dtype=array.dtype, mode='w+', shape=array.shape)
+                    target[...] = array
+                    target.flush()
+                    del target
+                handle = ('memmap', path, array.shape, array.dtype.str)
+            self._owned_handles.append(handle)
+            self._shared[attr] = handle
+            setattr(self, attr, self._attach_shared(handle))
+        
+        self._spatial_index = None
+        self._bind_distance_backend()
+        return self
+    
+    def _attach_shared(self, handle: tuple) -> np.ndarray:
+        """Gắn view chỉ đọc lên mảng dùng chung theo handle"""
+        kind, location, shape, dtype = handle
+        dtype = np.dtype(dtype)
+        if kind == 'memmap':
+            if int(np.prod(shape)) == 0:
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(location, dtype=dtype, mode='r', shape=shape)
+        
+        try:
+            # Python >= 3.13: tiến trình chỉ gắn vào thì không đăng ký với resource_tracker
+            shm = SharedMemory(name=location, track=False)
+        except TypeError:
+            shm = SharedMemory(name=location)
+        # Giữ khối nhớ sống cùng bài toán: view không giữ tham chiếu tới nó
+        self._shared_blocks.append(shm)
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        view.flags.writeable = False
+        return view
+    
+    def close(self) -> None:
+        """
+        Ngắt khỏi bộ nhớ dùng chung trong tiến trình này
+        
+        Các mảng được sao chép về bộ nhớ riêng trước khi đóng nên bài toán vẫn
+        dùng được; pickle sau đó sẽ gửi lại toàn bộ dữ liệu.
+        """
+        for attr in self._shared:
+            setattr(self, attr, np.array(getattr(self, attr)))
+        self._shared = {}
+        self._spatial_index = None
+        self._row_cache = OrderedDict()
+        self._bind_distance_backend()
+        for shm in self._shared_blocks:
+            shm.close()
+        self._shared_blocks = []
+    
+    def unlink(self) -> None:
+        """
+        Xóa các khối nhớ/tệp dùng chung do tiến trình này tạo ra (gọi close() trước)
+        
+        Chỉ gọi ở tiến trình đã gọi share_memory, sau khi các worker đã xong việc.
+        """
+        self.close()
+        for kind, location, _, _ in self._owned_handles:
+            if kind == 'shm':
+                try:
+                    SharedMemory(name=location).unlink()
+                except FileNotFoundError:
+                    pass
+            elif os.path.exists(location):
+                os.remove(location)
+        self._owned_handles = []
+    
+    def __enter__(self) -> 'TSProblem':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.unlink()
     
     def _validate_and_init(self, num_cities: int, city_coords: Optional[np.ndarray]) -> None:
         """Kiểm tra tham số và khởi tạo tọa độ thành phố"""
@@ -54,10 +281,17 @@ class TSProblem:
                 f"Cần tối thiểu {self.MIN_CITIES} thành phố, nhận được: {n}\n"
                 f"Lý do: Với ít hơn 3 thành phố, bài toán không có ý nghĩa tối ưu."
             )
-        if n > self.MAX_CITIES:
+        max_cities = {
+            'dense': self.MAX_CITIES,
+            'condensed': self.MAX_CITIES_CONDENSED,
+            'on_demand': self.MAX_CITIES_ON_DEMAND,
+        }[self.storage]
+        if n > max_cities:
             raise ValueError(
-                f"Tối đa {self.MAX_CITIES} thành phố, nhận được: {n}\n"
+                f"Tối đa {max_cities} thành phố, nhận được: {n}\n"
                 f"Lý do: Số thành phố lớn sẽ gây tốn tài nguyên và thời gian."
+                + ("\nGợi ý: Dùng storage='condensed' hoặc 'on_demand' cho bài toán lớn."
+                   if self.storage != 'on_demand' else "")
             )
     
     def _check_coords_valid(self, coords: np.ndarray) -> None:
@@ -78,11 +312,69 @@ class TSProblem:
     def _build_distance_matrix(self) -> np.ndarray:
         """
         Xây dựng ma trận khoảng cách Euclidean
-        Sử dụng broadcasting để tính nhanh hơn
+        Tính theo từng khối hàng bằng broadcasting để bộ nhớ tạm không vượt
+        quá BUILD_BLOCK_ELEMENTS phần tử (thay vì mảng tạm n x n x 2)
+        """
+        n = self.num_cities
+        xs = self.city_coords[:, 0].astype(np.float64)
+        ys = self.city_coords[:, 1].astype(np.float64)
+        matrix = np.empty((n, n), dtype=self.DTYPES[self.dtype])
+        
+        block = max(1, self.BUILD_BLOCK_ELEMENTS // n)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            matrix[start:stop] = self._round_distances(
+                np.hypot(xs[start:stop, np.newaxis] - xs[np.newaxis, :],
+                         ys[start:stop, np.newaxis] - ys[np.newaxis, :])
+            )
+        return matrix
+    
+    def _build_condensed_distances(self) -> np.ndarray:
+        """
+        Xây dựng mảng 1 chiều chứa các khoảng cách d(i, j) với i < j theo thứ tự hàng
+        Phần tử (i, j) nằm ở chỉ số i * (2n - i - 1) / 2 + (j - i - 1)
+        """
+        n = self.num_cities
+        xs = self.city_coords[:, 0].astype(np.float64)
+        ys = self.city_coords[:, 1].astype(np.float64)
+        data = np.empty(n * (n - 1) // 2, dtype=self.DTYPES[self.dtype])
+        
+        offset = 0
+        for i in range(n - 1):
+            count = n - i - 1
+            data[offset:offset + count] = self._round_distances(
+                np.hypot(xs[i + 1:] - xs[i], ys[i + 1:] - ys[i])
+            )
+            offset += count
+        return data
+    
+    def _round_distances(self, values: np.ndarray) -> np.ndarray:
         """
-        # Tính khoảng cách dùng broadcasting (nhanh hơn vòng lặp)
-        diff = self.city_coords[:, np.newaxis, :] - self.city_coords[np.newaxis, :, :]
-        return np.sqrt(np.sum(diff ** 2, axis=2))
+        Làm tròn khoảng cách theo dtype ('tsplib' dùng nint như TSPLIB EUC_2D) và
+        ép về kiểu lưu trữ, để khoảng cách tính theo yêu cầu trùng với giá trị lưu sẵn
+        """
+        if self.dtype == 'tsplib':
+            values = np.floor(values + 0.5)
+        return values.astype(self.DTYPES[self.dtype], copy=False)
+    
+    def _condensed_index(self, cities_a: np.ndarray, cities_b: np.ndarray) -> np.ndarray:
+        """Tính chỉ số trong condensed_distances cho các cặp (a, b) với a != b"""
+        lo = np.minimum(cities_a, cities_b).astype(np.int64)
+        hi = np.maximum(cities_a, cities_b).astype(np.int64)
+        return lo * (2 * self.num_cities - lo - 1) // 2 + hi - lo - 1
+    
+    def _pair_distances(self, cities_a: np.ndarray, cities_b: np.ndarray) -> np.ndarray:
+        """Tính khoảng cách giữa từng cặp (cities_a[k], cities_b[k]) dạng vector"""
+        if self.distance_matrix is not None:
+            return self.distance_matrix[cities_a, cities_b]
+        if self.condensed_distances is not None:
+            cities_a, cities_b = np.asarray(cities_a), np.asarray(cities_b)
+            same = cities_a == cities_b
+            index = self._condensed_index(cities_a, cities_b)
+            values = self.condensed_distances[np.where(same, 0, index)]
+            return np.where(same, 0, values)
+        diff = self.city_coords[cities_a] - self.city_coords[cities_b]
+        return self._round_distances(np.hypot(diff[..., 0], diff[..., 1]))
     
     def calculate_route_distance(self, route: List[int]) -> float:
         """
@@ -103,7 +395,51 @@ class TSProblem:
         route_arr = np.array(route)
         next_cities = np.roll(route_arr, -1)  # Dịch sang trái 1 vị trí
         
-        return np.sum(self.distance_matrix[route_arr, next_cities])
+        return np.sum(self._pair_distances(route_arr, next_cities), dtype=np.float64)
+    
+    def evaluate_routes(self, routes, validate: bool = True) -> np.ndarray:
+        """
+        Tính độ dài của nhiều tuyến đường cùng lúc
+        
+        Toàn bộ quần thể được đánh giá bằng một lần lấy chỉ mục (gather) và
+        một phép cộng theo hàng, thay vì gọi calculate_route_distance từng tuyến.
+        
+        Args:
+            routes: Mảng int shape (m, num_cities), mỗi hàng là một tuyến đường
+            validate: Nếu False (chế độ tin cậy), bỏ qua bước kiểm tra các hàng
+                      có phải hoán vị hợp lệ hay không
+            
+        Returns:
+            Mảng float64 shape (m,) chứa độ dài từng tuyến
+            
+        Raises:
+            ValueError: Nếu validate=True và có tuyến không hợp lệ
+        """
+        routes = np.asarray(routes)
+        if validate:
+            self._validate_routes(routes)
+        next_cities = np.roll(routes, -1, axis=1)
+        return np.sum(self._pair_distances(routes, next_cities), axis=1, dtype=np.float64)
+    
+    def _validate_routes(self, routes: np.ndarray) -> None:
+        """Kiểm tra mọi hàng của mảng tuyến đường là hoán vị của 0..num_cities-1"""
+        if routes.ndim != 2 or routes.shape[1] != self.num_cities:
+            raise ValueError(
+                f"Mảng tuyến đường phải có shape (m, {self.num_cities}), nhận được: {routes.shape}"
+            )
+        if not np.issubdtype(routes.dtype, np.integer):
+            raise ValueError(f"Chỉ số thành phố phải là số nguyên, nhận được: {routes.dtype}")
+        if routes.size == 0:
+            return
+        
+        invalid = np.flatnonzero(
+            np.any(np.sort(routes, axis=1) != np.arange(self.num_cities), axis=1)
+        )
+        if invalid.size > 0:
+            raise ValueError(
+                f"Tuyến đường ở hàng {invalid[0]} không phải hoán vị hợp lệ "
+                f"của [0, {self.num_cities - 1}]"
+            )
     
     def _validate_route(self, route: List[int]) -> None:
         """Kiểm tra tuyến đường có hợp lệ không"""
@@ -124,13 +460,243 @@ class TSProblem:
                 f"Chỉ số thành phố phải trong [0, {self.num_cities - 1}]"
             )
     
-    def generate_random_route(self) -> List[int]:
+    # ===== Đánh giá delta (chỉ tính các cạnh bị thay đổi, O(1)) =====
+    
+    def swap_delta(self, route: List[int], i: int, j: int) -> float:
+        """
+        Tính độ thay đổi khoảng cách khi đổi chỗ 2 thành phố ở vị trí i và j
+        
+        Args:
+            route: Tuyến đường hiện tại (không bị thay đổi)
+            i: Vị trí thứ nhất
+            j: Vị trí thứ hai
+            
+        Returns:
+            Khoảng cách mới - khoảng cách cũ
+        """
+        if i == j:
+            return 0.0
+        if i > j:
+            i, j = j, i
+        
+        d = self._dist
+        n = len(route)
+        a, b = route[i], route[j]
+        prev_i, next_i = route[i - 1], route[(i + 1) % n]
+        prev_j, next_j = route[j - 1], route[(j + 1) % n]
+        
+        if j - i == 1:
+            # Hai vị trí liền kề: ... prev_i, a, b, next_j ...
+            return (d(prev_i, b) + d(a, next_j)) - (d(prev_i, a) + d(b, next_j))
+        if i == 0 and j == n - 1:
+            # Liền kề qua điểm nối vòng: ... prev_j, b | a, next_i ...
+            return (d(prev_j, a) + d(b, next_i)) - (d(prev_j, b) + d(a, next_i))
+        
+        old = d(prev_i, a) + d(a, next_i) + d(prev_j, b) + d(b, next_j)
+        new = d(prev_i, b) + d(b, next_i) + d(prev_j, a) + d(a, next_j)
+        return new - old
+    
+    def two_opt_delta(self, route: List[int], i: int, j: int) -> float:
+        """
+        Tính độ thay đổi khoảng cách khi đảo ngược đoạn route[i..j] (2-opt)
+        
+        Args:
+            route: Tuyến đường hiện tại (không bị thay đổi)
+            i: Vị trí đầu đoạn
+            j: Vị trí cuối đoạn
+            
+        Returns:
+            Khoảng cách mới - khoảng cách cũ
+        """
+        if i > j:
+            i, j = j, i
+        n = len(route)
+        if i == j or (i == 0 and j == n - 1):
+            # Đảo cả tuyến (hoặc đoạn 1 phần tử) không làm đổi độ dài
+            return 0.0
+        
+        d = self._dist
+        a, b = route[i - 1], route[i]
+        c, e = route[j], route[(j + 1) % n]
+        return (d(a, c) + d(b, e)) - (d(a, b) + d(c, e))
+    
+    def insertion_delta(self, route: List[int], i: int, j: int) -> float:
+        """
+        Tính độ thay đổi khoảng cách khi chuyển thành phố ở vị trí i
+        sang nằm ngay sau thành phố ở vị trí j
+        
+        Args:
+            route: Tuyến đường hiện tại (không bị thay đổi)
+            i: Vị trí thành phố cần chuyển
+            j: Vị trí thành phố đứng trước điểm chèn
+            
+        Returns:
+            Khoảng cách mới - khoảng cách cũ
+        """
+        n = len(route)
+        if i == j or j == (i - 1) % n:
+            return 0.0
+        
+        d = self._dist
+        city = route[i]
+        prev_c, next_c = route[i - 1], route[(i + 1) % n]
+        a, b = route[j], route[(j + 1) % n]
+        removed = d(prev_c, next_c) - d(prev_c, city) - d(city, next_c)
+        inserted = d(a, city) + d(city, b) - d(a, b)
+        return removed + inserted
+    
+    def or_opt_delta(self, route: List[int], i: int, length: int, j: int) -> float:
+        """
+        Tính độ thay đổi khoảng cách khi chuyển đoạn route[i..i+length-1]
+        (Or-opt) sang nằm ngay sau thành phố ở vị trí j
+        
+        Args:
+            route: Tuyến đường hiện tại (không bị thay đổi)
+            i: Vị trí đầu đoạn (đoạn không vượt quá cuối tuyến)
+            length: Độ dài đoạn
+            j: Vị trí thành phố đứng trước điểm chèn (nằm ngoài đoạn)
+            
+        Returns:
+            Khoảng cách mới - khoảng cách cũ
+        """
+        n = len(route)
+        end = i + length - 1
+        if i <= j <= end or j == (i - 1) % n:
+            return 0.0
+        
+        d = self._dist
+        first, last = route[i], route[end]
+        prev_s, next_s = route[i - 1], route[(end + 1) % n]
+        a, b = route[j], route[(j + 1) % n]
+        removed = d(prev_s, next_s) - d(prev_s, first) - d(last, next_s)
+        inserted = d(a, first) + d(last, b) - d(a, b)
+        return removed + inserted
+    
+    @staticmethod
+    def apply_swap(route: List[int], i: int, j: int) -> None:
+        """Đổi chỗ 2 thành phố ở vị trí i và j (thay đổi trực tiếp route)"""
+        route[i], route[j] = route[j], route[i]
+    
+    @staticmethod
+    def apply_two_opt(route: List[int], i: int, j: int) -> None:
+        """Đảo ngược đoạn route[i..j] (thay đổi trực tiếp route)"""
+        if i > j:
+            i, j = j, i
+        route[i:j + 1] = route[i:j + 1][::-1]
+    
+    @staticmethod
+    def apply_insertion(route: List[int], i: int, j: int) -> None:
+        """Chuyển thành phố ở vị trí i sang ngay sau vị trí j (thay đổi trực tiếp route)"""
+        if i == j:
+            return
+        city = route.pop(i)
+        if j > i:
+            j -= 1
+        route.insert(j + 1, city)
+    
+    @staticmethod
+    def apply_or_opt(route: List[int], i: int, length: int, j: int) -> None:
+        """Chuyển đoạn route[i..i+length-1] sang ngay sau vị trí j (thay đổi trực tiếp route)"""
+        if i <= j < i + length:
+            return
+        segment = route[i:i + length]
+        del route[i:i + length]
+        if j > i:
+            j -= length
+        route[j + 1:j + 1] = segment
+    
+    def get_candidate_lists(self, k: int = 8) -> np.ndarray:
+        """
+        Lấy danh sách k thành phố gần nhất của mỗi thành phố
+        
+        Được tính một lần từ chỉ mục không gian (lưới đều) trên city_coords
+        và lưu lại cho các lần gọi sau.
+        
+        Args:
+            k: Số láng giềng cho mỗi thành phố (tự giới hạn về num_cities - 1)
+            
+        Returns:
+            Mảng int shape (num_cities, k), mỗi hàng sắp xếp theo khoảng cách tăng dần
+        """
+        if k < 1:
+            raise ValueError(f"Số láng giềng k phải >= 1, nhận được: {k}")
+        k = min(k, self.num_cities - 1)
+        
+        if k not in self._candidate_cache:
+            # Danh sách lớn hơn đã có thì chỉ cần cắt bớt cột
+            larger = [size for size in self._candidate_cache if size > k]
+            if larger:
+                self._candidate_cache[k] = self._candidate_cache[min(larger)][:, :k]
+            else:
+                self._candidate_cache[k] = self.get_spatial_index().k_nearest_all(k)
+        return self._candidate_cache[k]
+    
+    def get_spatial_index(self) -> UniformGrid:
+        """
+        Lấy chỉ mục không gian của các thành phố (tạo khi cần lần đầu)
+        
+        Returns:
+            Đối tượng UniformGrid trên city_coords
+        """
+        if self._spatial_index is None:
+            self._spatial_index = UniformGrid(self.city_coords)
+        return self._spatial_index
+    
+    def nearest_cities(self, point, k: int = 1, exclude: Optional[int] = None) -> np.ndarray:
+        """
+        Tìm k thành phố gần một điểm nhất
+        
+        Args:
+            point: Tọa độ (x, y)
+            k: Số thành phố cần tìm
+            exclude: Chỉ số thành phố cần bỏ qua
+            
+        Returns:
+            Mảng chỉ số thành phố, sắp xếp theo khoảng cách tăng dần
+        """
+        if k < 1:
+            raise ValueError(f"Số thành phố cần tìm phải >= 1, nhận được: {k}")
+        return self.get_spatial_index().query_nearest(point, k, exclude=exclude)
+    
+    def nearest_city(self, point, exclude: Optional[int] = None) -> int:
+        """
+        Tìm thành phố gần một điểm nhất
+        
+        Args:
+            point: Tọa độ (x, y)
+            exclude: Chỉ số thành phố cần bỏ qua
+            
+        Returns:
+            Chỉ số thành phố gần nhất
+        """
+        return int(self.nearest_cities(point, 1, exclude=exclude)[0])
+    
+    def cities_within(self, point, radius: float) -> np.ndarray:
+        """
+        Tìm các thành phố nằm trong bán kính cho trước quanh một điểm
+        
+        Args:
+            point: Tọa độ (x, y)
+            radius: Bán kính
+            
+        Returns:
+            Mảng chỉ số thành phố, sắp xếp theo khoảng cách tăng dần
+        """
+        return self.get_spatial_index().query_radius(point, radius)
+    
+    def generate_random_route(self, rng=None) -> List[int]:
         """
         Tạo một tuyến đường ngẫu nhiên
         
+        Args:
+            rng: Nguồn ngẫu nhiên có permutation(n) (np.random.Generator hoặc
+                 RandomStream); None dùng np.random toàn cục
+            
         Returns:
             Danh sách chỉ số thành phố được xáo trộn ngẫu nhiên
         """
+        if rng is not None:
+            return rng.permutation(self.num_cities).tolist()
         route = list(range(self.num_cities))
         np.random.shuffle(route)
         return route
@@ -155,7 +721,40 @@ class TSProblem:
         Returns:
             Khoảng cách Euclidean
         """
-        return self.distance_matrix[city1, city2]
+        return self._dist(city1, city2)
+    
+    def get_distance_row(self, city: int) -> np.ndarray:
+        """
+        Lấy khoảng cách từ một thành phố tới mọi thành phố
+        
+        Với storage='condensed' hoặc 'on_demand', hàng được ghép/tính khi cần
+        và giữ lại trong bộ nhớ đệm LRU tối đa cache_rows hàng.
+        
+        Args:
+            city: Chỉ số thành phố
+            
+        Returns:
+            Mảng shape (num_cities,) - không được sửa đổi
+        """
+        if self.distance_matrix is not None:
+            return self.distance_matrix[city]
+        
+        row = self._row_cache.get(city)
+        if row is not None:
+            self._row_cache.move_to_end(city)
+            return row
+        
+        if self.condensed_distances is not None:
+            others = np.arange(self.num_cities)
+            row = self._pair_distances(np.full(self.num_cities, city), others)
+        else:
+            diff = self.city_coords - self.city_coords[city]
+            row = self._round_distances(np.hypot(diff[:, 0], diff[:, 1]))
+        if self.cache_rows > 0:
+            self._row_cache[city] = row
+            if len(self._row_cache) > self.cache_rows:
+                self._row_cache.popitem(last=False)
+        return row
     
     def __repr__(self) -> str:
         return f"TSProblem(num_cities={self.num_cities})"
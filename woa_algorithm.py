@@ -2,30 +2,63 @@
 Module triển khai thuật toán WOA (Whale Optimization Algorithm) cho TSP
 """
 import numpy as np
-import random
 import math
+import os
+import time
+from collections import deque
+from itertools import compress, islice
+from multiprocessing import Pool
+from operator import ne
 
+from cancellation import StopCondition
+from construction import INIT_METHODS, construct_route, double_bridge
+from local_search import LocalSearch
+from random_stream import RandomStream
+from solver_stats import SolverStats
 
-class Whale:
-    """Lớp đại diện cho một cá voi trong WOA"""
+
+# Bộ giải mẫu của tiến trình worker (được gán một lần bởi _init_island_worker)
+_island_solver = None
+
+
+def _init_island_worker(solver):
+    """Initializer của Pool: lưu bộ giải (kèm TSProblem) cho tiến trình worker"""
+    global _island_solver
+    _island_solver = solver
+
+
+def _run_island_epoch(task):
+    """
+    Chạy một epoch của một đảo trong tiến trình worker
     
-    def __init__(self, num_cities):
-        """
-        Khởi tạo cá voi
+    Args:
+        task: Tuple (state, start_iteration, steps, seed)
         
-        Args:
-            num_cities: Số lượng thành phố
-        """
-        self.position = list(range(num_cities))
-        random.shuffle(self.position)
-        self.fitness = float('inf')
+    Returns:
+        Kết quả của WOA._run_island
+    """
+    return _island_solver._run_island(*task)
 
 
 class WOA:
-    """Lớp triển khai thuật toán WOA (Whale Optimization Algorithm) cho TSP"""
+    """
+    Lớp triển khai thuật toán WOA (Whale Optimization Algorithm) cho TSP
+    
+    Quần thể được lưu dạng mảng: positions shape (num_whales, num_cities),
+    mỗi hàng là vị trí (tuyến đường) của một cá voi, và fitness shape (num_whales,).
+    """
+    
+    # Các kiểu kết nối giữa các đảo khi di cư
+    MIGRATION_TOPOLOGIES = ('ring', 'full')
+    # Thời điểm cập nhật leader trong một vòng lặp
+    LEADER_UPDATES = ('whale', 'iteration')
     
     def __init__(self, tsp_problem, num_whales=30, max_iterations=1000,
-                 b=1.0, a_max=2.0):
+                 b=1.0, a_max=2.0, num_islands=1, migration_interval=50,
+                 migration_topology='ring', num_migrants=1, num_workers=None,
+                 collect_stats=False, stats_stream=None, seed=None,
+                 init='random', init_fraction=0.2, polish=False, memetic_interval=0,
+                 leader_update='whale'):
         """
         Khởi tạo thuật toán WOA
         
@@ -35,6 +68,36 @@ class WOA:
             max_iterations: Số vòng lặp tối đa
             b: Hằng số xác định hình dạng spiral logarit
             a_max: Giá trị a tối đa (giảm dần từ a_max về 0)
+            num_islands: Số đảo (quần thể con). Với num_islands > 1, bầy được chia
+                         đều cho các đảo, mỗi đảo có leader riêng và tiến hóa
+                         trong một tiến trình riêng
+            migration_interval: Số vòng lặp giữa hai lần di cư
+            migration_topology: 'ring' (đảo i gửi sang đảo i+1) hoặc 'full'
+                                (mỗi đảo nhận các cá thể tốt nhất của mọi đảo khác)
+            num_migrants: Số cá voi tốt nhất di cư mỗi lần (thay các cá voi kém nhất)
+            num_workers: Số tiến trình worker (None = min(num_islands, số CPU);
+                         1 = chạy tất cả các đảo trong tiến trình hiện tại)
+            collect_stats: Thu thập thống kê vòng lặp (xem get_stats)
+            stats_stream: Đường dẫn tệp hoặc file object để ghi thống kê dạng
+                          JSON lines tại mỗi mốc lịch sử (cần collect_stats=True)
+            seed: Hạt giống cho luồng ngẫu nhiên riêng của thuật toán (int hoặc
+                  np.random.SeedSequence; None = ngẫu nhiên theo hệ điều hành)
+            init: Cách dựng tuyến gieo vào bầy: 'random' (cả bầy ngẫu nhiên) hoặc
+                  một heuristic trong construction ('nearest_neighbor', 'greedy',
+                  'hilbert', 'cheapest_insertion', 'farthest_insertion')
+            init_fraction: Tỉ lệ cá voi được gieo từ tuyến dựng sẵn (một cá voi
+                           nhận nguyên tuyến, các cá voi khác nhận biến thể
+                           double-bridge của nó); phần còn lại vẫn ngẫu nhiên
+            polish: Nếu True, đánh bóng leader bằng tìm kiếm cục bộ 2-opt +
+                    Or-opt (LocalSearch) sau khi WOA kết thúc
+            memetic_interval: Nếu > 0, cứ mỗi memetic_interval vòng lặp leader được
+                              cải thiện bằng tìm kiếm cục bộ và thay cá voi kém
+                              nhất (bước memetic); 0 = tắt
+            leader_update: 'whale' (mặc định, như bản gốc): cá voi vừa di chuyển được
+                           đánh giá ngay và có thể thành leader cho các cá voi
+                           sau nó; 'iteration': cả bầy di chuyển theo cùng một
+                           leader, được đánh giá bằng một lần gọi evaluate_routes
+                           và leader chỉ cập nhật một lần mỗi vòng lặp
         """
         # Validate parameters
         if tsp_problem is None:
@@ -55,100 +118,250 @@ class WOA:
         if a_max <= 0:
             raise ValueError(f"Giá trị a_max phải > 0, nhận được: {a_max}")
         
+        if num_islands < 1:
+            raise ValueError(f"Số đảo phải >= 1, nhận được: {num_islands}")
+        
+        if num_whales < 2 * num_islands:
+            raise ValueError(
+                f"Mỗi đảo cần ít nhất 2 cá voi: {num_whales} cá voi cho {num_islands} đảo"
+            )
+        
+        if migration_interval < 1:
+            raise ValueError(f"migration_interval phải >= 1, nhận được: {migration_interval}")
+        
+        if migration_topology not in self.MIGRATION_TOPOLOGIES:
+            raise ValueError(
+                f"Kiểu di cư phải thuộc {self.MIGRATION_TOPOLOGIES}, nhận được: {migration_topology}"
+            )
+        
+        if not 0 <= num_migrants < num_whales // num_islands:
+            raise ValueError(
+                f"Số cá voi di cư phải trong [0, {num_whales // num_islands}), nhận được: {num_migrants}"
+            )
+        
+        if num_workers is not None and num_workers < 1:
+            raise ValueError(f"Số worker phải >= 1, nhận được: {num_workers}")
+        
+        if init not in INIT_METHODS:
+            raise ValueError(f"Cách khởi tạo phải thuộc {INIT_METHODS}, nhận được: {init}")
+        
+        if not 0 < init_fraction <= 1:
+            raise ValueError(f"init_fraction phải trong khoảng (0, 1], nhận được: {init_fraction}")
+        
+        if memetic_interval < 0:
+            raise ValueError(f"memetic_interval phải >= 0, nhận được: {memetic_interval}")
+        
+        if leader_update not in self.LEADER_UPDATES:
+            raise ValueError(
+                f"leader_update phải thuộc {self.LEADER_UPDATES}, nhận được: {leader_update}"
+            )
+        
         self.tsp = tsp_problem
         self.num_whales = num_whales
         self.max_iterations = max_iterations
         self.b = b  # Constant for spiral shape
         self.a_max = a_max  # Maximum value of a
-        
-        self.whales = []
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.migration_topology = migration_topology
+        self.num_migrants = num_migrants
+        self.num_workers = num_workers
+        self.seed = seed
+        self.rng = RandomStream(seed)
+        self.init = init
+        self.init_fraction = init_fraction
+        self.polish = polish
+        self.memetic_interval = memetic_interval
+        self.leader_update = leader_update
+        self._local_search = LocalSearch(tsp_problem) if polish or memetic_interval else None
+        
+        self.positions = None  # Mảng int (num_whales, num_cities)
+        self.fitness = None  # Mảng float (num_whales,)
         self.leader_position = None  # Vị trí của cá voi tốt nhất (con mồi)
+        # Hoán vị nghịch của leader: leader_position_of[city] = vị trí của city trong leader.
+        # Chỉ tính lại khi leader đổi (xem _set_leader), dùng chung cho mọi cá voi
+        self.leader_position_of = None
         self.leader_fitness = float('inf')
         self.history = []
+        self.stop_reason = None  # Lý do dừng của lần chạy gần nhất
+        self.stats = SolverStats(enabled=collect_stats, stream=stats_stream)
+    
+    def _initialize_whales(self, initial_route=None):
+        """
+        Khởi tạo quần thể cá voi
+        
+        Args:
+            initial_route: Tuyến dựng sẵn để gieo vào bầy (None = dựng theo init,
+                           hoặc không gieo nếu init='random')
+        """
+        # Sinh num_whales hoán vị ngẫu nhiên cùng lúc: argsort từng hàng số ngẫu nhiên
+        keys = self.rng.generator.random((self.num_whales, self.tsp.num_cities))
+        self.positions = np.argsort(keys, axis=1)
+        
+        if initial_route is not None or self.init != 'random':
+            if initial_route is not None:
+                base = [int(city) for city in initial_route]
+                self.tsp._validate_route(base)
+            else:
+                base = construct_route(self.tsp, self.init, self.rng)
+            count = max(1, int(round(self.init_fraction * self.num_whales)))
+            # Rải đều các cá voi được gieo trong quần thể để mỗi đảo đều nhận một phần
+            seeded = np.arange(count) * self.num_whales // count
+            self.positions[seeded[0]] = base
+            for index in seeded[1:]:
+                self.positions[index] = double_bridge(base, self.rng)
+        
+        # Đánh giá cả quần thể trong một lần gọi
+        self.fitness = self.tsp.evaluate_routes(self.positions, validate=False)
+        self.stats.add(distance_evaluations=self.num_whales)
+        self.leader_fitness = float('inf')
+        self._update_leader()
+    
+    def _update_leader(self):
+        """Cập nhật leader (con mồi - giải pháp tốt nhất) từ quần thể hiện tại"""
+        best = int(np.argmin(self.fitness))
+        if self.fitness[best] < self.leader_fitness:
+            if self.leader_fitness != float('inf'):
+                self.stats.add(improvements=1)
+            self._set_leader(self.positions[best].tolist(), self.fitness[best])
+    
+    def _set_leader(self, route, fitness):
+        """Thay leader và tính lại hoán vị nghịch leader_position_of của nó"""
+        self.leader_position = route
+        self.leader_fitness = fitness
+        self.leader_position_of = np.argsort(route).tolist()
+    
+    @staticmethod
+    def _mismatched_positions(route, target):
+        """Các vị trí mà route và target khác nhau (các vị trí còn lại không bao giờ bị swap)"""
+        return list(compress(range(len(route)), map(ne, route, target)))
     
-    def _initialize_whales(self):
-        """Khởi tạo quần thể cá voi"""
-        self.whales = []
-        for _ in range(self.num_whales):
-            whale = Whale(self.tsp.num_cities)
-            fitness = self.tsp.calculate_route_distance(whale.position)
-            whale.fitness = fitness
+    def _swap_distance(self, route, target, mismatched=None, target_position_of=None):
+        """
+        Đếm số phép swap mà _get_swap_sequence sẽ sinh ra, trong O(n)
+        
+        Bằng số vị trí lệch trừ số chu trình của hoán vị i -> vị trí của route[i]
+        trong target (chỉ xét trên các vị trí lệch).
+        
+        Args:
+            route: Tuyến đường nguồn
+            target: Tuyến đường đích
+            mismatched: Kết quả _mismatched_positions đã tính sẵn (None = tự tính)
+            target_position_of: Hoán vị nghịch của target đã tính sẵn, ví dụ
+                leader_position_of (None = dựng từ các vị trí lệch)
             
-            # Cập nhật leader (con mồi - giải pháp tốt nhất)
-            if fitness < self.leader_fitness:
-                self.leader_fitness = fitness
-                self.leader_position = whale.position.copy()
+        Returns:
+            Số phép swap cần thiết để biến route thành target
+        """
+        if mismatched is None:
+            mismatched = self._mismatched_positions(route, target)
+        if target_position_of is None:
+            target_position_of = {target[i]: i for i in mismatched}
+        successor = {i: target_position_of[route[i]] for i in mismatched}
+        cycles = 0
+        for start in mismatched:
+            if start in successor:
+                cycles += 1
+                k = successor.pop(start)
+                while k != start:
+                    k = successor.pop(k)
+        return len(mismatched) - cycles
+    
+    def _iter_swaps(self, route, target, mismatched=None):
+        """
+        Sinh lần lượt (lazy) các phép swap biến route thành target, trong O(n) tổng cộng
+        
+        route bị sửa trực tiếp: mỗi swap được áp dụng ngay trước khi trả về, nên
+        dừng sau k phép swap thì route chính là kết quả của k phép swap đầu tiên.
+        
+        Args:
+            route: Tuyến đường nguồn (list, được sửa trực tiếp)
+            target: Tuyến đường đích
+            mismatched: Kết quả _mismatched_positions đã tính sẵn (None = tự tính)
             
-            self.whales.append(whale)
+        Yields:
+            Các cặp vị trí (i, j) đã được swap
+        """
+        if mismatched is None:
+            mismatched = self._mismatched_positions(route, target)
+        position_of = {route[i]: i for i in mismatched}
+        for i in mismatched:
+            current = route[i]
+            city = target[i]
+            if current != city:
+                j = position_of[city]
+                route[i], route[j] = city, current
+                position_of[current] = j
+                yield (i, j)
     
-    def _encircling_prey(self, whale_position, leader_position, a):
+    def _swap_towards(self, position, target, num_swaps, mismatched=None):
+        """Áp dụng trực tiếp num_swaps phép swap đầu tiên để đưa position về phía target"""
+        deque(islice(self._iter_swaps(position, target, mismatched), num_swaps), maxlen=0)
+    
+    def _encircling_prey(self, whale_position, leader_position, a, leader_position_of=None):
         """
         Cơ chế bao vây con mồi (Encircling Prey)
         Cá voi di chuyển về phía con mồi (giải pháp tốt nhất)
         
         Args:
-            whale_position: Vị trí hiện tại của cá voi
+            whale_position: Vị trí hiện tại của cá voi (list, được sửa trực tiếp)
             leader_position: Vị trí của con mồi (leader)
             a: Hệ số giảm dần
+            leader_position_of: Hoán vị nghịch của leader_position (None = không có sẵn)
             
         Returns:
-            Vị trí mới
+            Vị trí mới (chính whale_position)
         """
         # C = 2 * random [0,1] (hệ số ngẫu nhiên)
-        C = 2 * random.random()
+        C = 2 * self.rng.random()
         
-        # Tính toán các swap operations để di chuyển về leader
-        swaps = self._get_swap_sequence(whale_position, leader_position)
+        # Đếm số swap cần để di chuyển về leader (không sinh cả dãy swap)
+        mismatched = self._mismatched_positions(whale_position, leader_position)
+        total_swaps = self._swap_distance(whale_position, leader_position, mismatched,
+                                          leader_position_of)
         
         # Số lượng swap phụ thuộc vào |A|
         # A = 2*a*random - a
-        A = 2 * a * random.random() - a
+        A = 2 * a * self.rng.random() - a
         
         # Số swap tỷ lệ với |A| và C
-        num_swaps = int(abs(A) * C * len(swaps) / 4)
-        num_swaps = max(1, min(num_swaps, len(swaps)))
+        num_swaps = int(abs(A) * C * total_swaps / 4)
+        num_swaps = max(1, min(num_swaps, total_swaps))
         
         # Áp dụng swaps
-        new_position = whale_position.copy()
-        for i in range(num_swaps):
-            if i < len(swaps):
-                pos1, pos2 = swaps[i]
-                new_position[pos1], new_position[pos2] = new_position[pos2], new_position[pos1]
-        
-        return new_position
+        self._swap_towards(whale_position, leader_position, num_swaps, mismatched)
+        return whale_position
     
-    def _spiral_updating(self, whale_position, leader_position):
+    def _spiral_updating(self, whale_position, leader_position, leader_position_of=None):
         """
         Cơ chế cập nhật xoắn ốc (Spiral Updating Position)
         Mô phỏng chuyển động xoắn ốc của cá voi khi săn mồi
         
         Args:
-            whale_position: Vị trí hiện tại của cá voi
+            whale_position: Vị trí hiện tại của cá voi (list, được sửa trực tiếp)
             leader_position: Vị trí của con mồi (leader)
+            leader_position_of: Hoán vị nghịch của leader_position (None = không có sẵn)
             
         Returns:
-            Vị trí mới
+            Vị trí mới (chính whale_position)
         """
         # l = random [-1, 1]
-        l = random.uniform(-1, 1)
+        l = self.rng.uniform(-1, 1)
         
         # Tính toán khoảng cách (số lượng swaps cần thiết)
-        swaps = self._get_swap_sequence(whale_position, leader_position)
+        mismatched = self._mismatched_positions(whale_position, leader_position)
+        total_swaps = self._swap_distance(whale_position, leader_position, mismatched,
+                                          leader_position_of)
         
         # D' = distance * e^(b*l) * cos(2*pi*l)
         # Số swap tỷ lệ với công thức spiral
         spiral_factor = math.exp(self.b * l) * math.cos(2 * math.pi * l)
-        num_swaps = int(abs(spiral_factor) * len(swaps) / 2)
-        num_swaps = max(1, min(num_swaps, len(swaps)))
+        num_swaps = int(abs(spiral_factor) * total_swaps / 2)
+        num_swaps = max(1, min(num_swaps, total_swaps))
         
         # Áp dụng swaps
-        new_position = whale_position.copy()
-        for i in range(num_swaps):
-            if i < len(swaps):
-                pos1, pos2 = swaps[i]
-                new_position[pos1], new_position[pos2] = new_position[pos2], new_position[pos1]
-        
-        return new_position
+        self._swap_towards(whale_position, leader_position, num_swaps, mismatched)
+        return whale_position
     
     def _search_for_prey(self, whale_position, random_whale_position, a):
         """
@@ -156,135 +369,380 @@ class WOA:
         Cá voi di chuyển về phía một cá voi ngẫu nhiên khác
         
         Args:
-            whale_position: Vị trí hiện tại của cá voi
+            whale_position: Vị trí hiện tại của cá voi (list, được sửa trực tiếp)
             random_whale_position: Vị trí của cá voi ngẫu nhiên
             a: Hệ số giảm dần
             
         Returns:
-            Vị trí mới
+            Vị trí mới (chính whale_position)
         """
         # C = 2 * random [0,1]
-        C = 2 * random.random()
+        C = 2 * self.rng.random()
         
         # A = 2*a*random - a (với |A| >= 1, khám phá toàn cục)
-        A = 2 * a * random.random() - a
+        A = 2 * a * self.rng.random() - a
         
-        # Tính swaps về phía cá voi ngẫu nhiên
-        swaps = self._get_swap_sequence(whale_position, random_whale_position)
+        # Tính số swap về phía cá voi ngẫu nhiên
+        mismatched = self._mismatched_positions(whale_position, random_whale_position)
+        total_swaps = self._swap_distance(whale_position, random_whale_position, mismatched)
         
         # Số swap lớn hơn khi khám phá
-        num_swaps = int(abs(A) * C * len(swaps) / 3)
-        num_swaps = max(2, min(num_swaps, len(swaps)))
+        num_swaps = int(abs(A) * C * total_swaps / 3)
+        num_swaps = max(2, min(num_swaps, total_swaps))
         
         # Áp dụng swaps
-        new_position = whale_position.copy()
-        for i in range(num_swaps):
-            if i < len(swaps):
-                pos1, pos2 = swaps[i]
-                new_position[pos1], new_position[pos2] = new_position[pos2], new_position[pos1]
-        
-        return new_position
+        self._swap_towards(whale_position, random_whale_position, num_swaps, mismatched)
+        return whale_position
     
-    def _get_swap_sequence(self, route1, route2):
+    def _get_swap_sequence(self, route1, route2, max_swaps=None):
         """
-        Tạo dãy các phép swap để biến đổi route1 thành route2
+        Tạo dãy các phép swap để biến đổi route1 thành route2 (O(n))
         
         Args:
-            route1: Tuyến đường nguồn
+            route1: Tuyến đường nguồn (không bị thay đổi)
             route2: Tuyến đường đích
+            max_swaps: Chỉ sinh tối đa max_swaps phép swap đầu tiên (None = tất cả)
             
         Returns:
             Danh sách các cặp (i, j) cần swap
         """
-        route1_copy = route1.copy()
-        swaps = []
-        
-        for i in range(len(route1)):
-            if route1_copy[i] != route2[i]:
-                j = route1_copy.index(route2[i])
-                if i != j:
-                    route1_copy[i], route1_copy[j] = route1_copy[j], route1_copy[i]
-                    swaps.append((i, j))
-        
-        return swaps
+        return list(islice(self._iter_swaps(list(route1), route2), max_swaps))
     
-    def _update_whale(self, whale, iteration):
+    def _move_whale(self, index, a):
         """
-        Cập nhật vị trí của cá voi dựa trên thuật toán WOA
+        Cập nhật vị trí của cá voi thứ index (hàng của positions) theo thuật toán WOA
         
         Args:
-            whale: Cá voi cần cập nhật
-            iteration: Vòng lặp hiện tại
+            index: Chỉ số cá voi trong quần thể
+            a: Hệ số giảm dần của vòng lặp hiện tại
         """
-        # a giảm tuyến tính từ a_max về 0
-        a = self.a_max - iteration * (self.a_max / self.max_iterations)
+        position = self.positions[index].tolist()
         
         # A = 2*a*random - a
-        A = 2 * a * random.random() - a
+        A = 2 * a * self.rng.random() - a
         
         # p = random [0, 1] để chọn giữa encircling và spiral
-        p = random.random()
-        
-        new_position = None
+        p = self.rng.random()
         
         if p < 0.5:
             # Với xác suất 50%: Sử dụng cơ chế bao vây hoặc tìm kiếm
             if abs(A) < 1:
                 # |A| < 1: Bao vây con mồi (exploitation)
-                new_position = self._encircling_prey(whale.position, self.leader_position, a)
+                self._encircling_prey(position, self.leader_position, a, self.leader_position_of)
             else:
                 # |A| >= 1: Tìm kiếm con mồi (exploration)
-                random_whale = random.choice(self.whales)
-                new_position = self._search_for_prey(whale.position, random_whale.position, a)
+                random_whale = self.positions[self.rng.randrange(len(self.positions))].tolist()
+                self._search_for_prey(position, random_whale, a)
         else:
             # Với xác suất 50%: Sử dụng cơ chế spiral
-            new_position = self._spiral_updating(whale.position, self.leader_position)
+            self._spiral_updating(position, self.leader_position, self.leader_position_of)
         
-        # Cập nhật vị trí và fitness
-        whale.position = new_position
-        fitness = self.tsp.calculate_route_distance(whale.position)
-        whale.fitness = fitness
+        self.positions[index] = position
+    
+    def _update_whales(self, iteration):
+        """
+        Cập nhật toàn bộ quần thể trong một vòng lặp
+        
+        Từng hàng của positions được cập nhật tại chỗ. Với leader_update='whale',
+        mỗi cá voi được đánh giá ngay sau khi di chuyển và leader được cập nhật
+        trước khi cá voi kế tiếp di chuyển; với 'iteration', cả quần thể được
+        đánh giá bằng một lần gọi evaluate_routes và leader được cập nhật một lần.
+        
+        Args:
+            iteration: Vòng lặp hiện tại
+        """
+        # a giảm tuyến tính từ a_max về 0
+        a = self.a_max - iteration * (self.a_max / self.max_iterations)
         
-        # Cập nhật leader nếu tìm được giải pháp tốt hơn
-        if fitness < self.leader_fitness:
-            self.leader_fitness = fitness
-            self.leader_position = whale.position.copy()
+        timed = self.stats.enabled
+        if self.leader_update == 'whale':
+            move_time = evaluation_time = 0.0
+            for index in range(len(self.positions)):
+                if timed:
+                    t0 = time.perf_counter()
+                self._move_whale(index, a)
+                if timed:
+                    t1 = time.perf_counter()
+                # Các phép swap luôn giữ hoán vị hợp lệ nên dùng chế độ tin cậy
+                fitness = self.tsp.evaluate_routes(self.positions[index:index + 1], validate=False)[0]
+                self.fitness[index] = fitness
+                if timed:
+                    move_time += t1 - t0
+                    evaluation_time += time.perf_counter() - t1
+                if fitness < self.leader_fitness:
+                    self.stats.add(improvements=1)
+                    self._set_leader(self.positions[index].tolist(), fitness)
+        else:
+            if timed:
+                t0 = time.perf_counter()
+            for index in range(len(self.positions)):
+                self._move_whale(index, a)
+            if timed:
+                t1 = time.perf_counter()
+            
+            self.fitness = self.tsp.evaluate_routes(self.positions, validate=False)
+            if timed:
+                move_time = t1 - t0
+                evaluation_time = time.perf_counter() - t1
+            self._update_leader()
+        if timed:
+            # Mỗi cá voi luôn di chuyển (không có bước bị từ chối như SA)
+            moved = len(self.positions)
+            self.stats.add_time(move_generation=move_time, evaluation=evaluation_time)
+            self.stats.add(moves_proposed=moved, moves_accepted=moved, distance_evaluations=moved)
+        if self.memetic_interval and iteration % self.memetic_interval == 0:
+            self._memetic_step()
+    
+    def _memetic_step(self):
+        """Cải thiện leader bằng tìm kiếm cục bộ và đưa kết quả vào chỗ cá voi kém nhất"""
+        with self.stats.timer('local_search'):
+            route, distance = self._local_search.improve(self.leader_position)
+        if distance < self.leader_fitness:
+            worst = int(np.argmax(self.fitness))
+            self.positions[worst] = route
+            self.fitness[worst] = distance
+            self._update_leader()
     
-    def solve(self, callback=None):
+    def solve(self, callback=None, initial_route=None, cancel_token=None,
+              time_limit=None, deadline=None, max_evaluations=None):
         """
         Giải bài toán TSP bằng WOA (Whale Optimization Algorithm)
         
+        Các điều kiện dừng sớm được kiểm tra sau mỗi vòng lặp (mỗi epoch với
+        mô hình đảo); khi một điều kiện xảy ra, solve() trả về ngay kết quả tốt
+        nhất hiện có và ghi lý do vào stop_reason.
+        
         Args:
             callback: Hàm callback để cập nhật giao diện (route, distance, iteration)
+            initial_route: Tuyến khởi đầu cho trước (warm start), được gieo vào
+                           init_fraction của bầy; None thì dựng theo tham số init
+            cancel_token: CancellationToken để dừng từ luồng khác
+            time_limit: Số giây chạy tối đa (đồng hồ thực)
+            deadline: Mốc dừng tuyệt đối theo time.time()
+            max_evaluations: Số lần đánh giá tuyến tối đa (mỗi cá voi mỗi vòng lặp
+                             là một lần)
             
         Returns:
             Tuple (best_route, best_distance, history)
         """
+        stop = StopCondition(cancel_token, time_limit, deadline, max_evaluations)
+        self.stats.reset()
+        self.stats.emit('start', algorithm='WOA')
+        if self.num_islands > 1:
+            result = self._solve_islands(callback, initial_route, stop)
+        else:
+            result = self._solve_single(callback, initial_route, stop)
+        self.stop_reason = stop.reason or 'completed'
+        # Khi bị hủy hoặc hết thời gian thì trả kết quả ngay, không đánh bóng
+        if self.polish and stop.reason in (None, 'max_evaluations'):
+            with self.stats.timer('local_search'):
+                route, distance = self._local_search.improve(self.leader_position)
+            if distance < self.leader_fitness:
+                self._set_leader(route, distance)
+                self.history.append((self.actual_iterations, distance))
+            result = (self.leader_position, self.leader_fitness, self.history)
+        self.stats.stop()
+        self.stats.emit('end', algorithm='WOA', iteration=self.actual_iterations,
+                        best_distance=self.leader_fitness, stop_reason=self.stop_reason)
+        self.stats.close()
+        return result
+    
+    def _solve_single(self, callback=None, initial_route=None, stop=None):
+        """Tiến hóa một quần thể duy nhất"""
         # Khởi tạo quần thể cá voi
-        self._initialize_whales()
+        self._initialize_whales(initial_route)
         self.history = [(0, self.leader_fitness)]
         self.actual_iterations = 0  # Track actual completed iterations
         
         # Vòng lặp chính
         for iteration in range(1, self.max_iterations + 1):
-            # Cập nhật từng cá voi
-            for whale in self.whales:
-                self._update_whale(whale, iteration)
+            # Cập nhật cả quần thể
+            self._update_whales(iteration)
             
             # Lưu lịch sử mỗi 10 iterations
             if iteration % 10 == 0:
                 self.history.append((iteration, self.leader_fitness))
+                self.stats.emit('progress', algorithm='WOA', iteration=iteration,
+                                best_distance=self.leader_fitness)
                 
                 # Gọi callback nếu có
                 if callback:
-                    callback(self.leader_position, self.leader_fitness, iteration)
+                    with self.stats.timer('callback'):
+                        callback(self.leader_position, self.leader_fitness, iteration)
             self.actual_iterations = iteration
+            
+            # Điểm kiểm tra dừng sớm (tính cả lần đánh giá quần thể ban đầu)
+            if stop is not None and stop.should_stop(self.num_whales * (iteration + 1)):
+                break
         
         # Lưu kết quả cuối cùng
-        self.history.append((self.max_iterations, self.leader_fitness))
+        self.history.append((self.actual_iterations, self.leader_fitness))
         
         return self.leader_position, self.leader_fitness, self.history
     
+    def _run_island(self, state, start_iteration, steps, seed):
+        """
+        Tiến hóa một đảo thêm steps vòng lặp, bắt đầu sau vòng lặp start_iteration
+        
+        Args:
+            state: Tuple (positions, fitness, leader_position, leader_fitness) của đảo
+            start_iteration: Số vòng lặp đã chạy trước epoch này
+            steps: Số vòng lặp của epoch
+            seed: np.random.SeedSequence cho luồng ngẫu nhiên của đảo trong epoch
+            
+        Returns:
+            Tuple (state, history, counts) với history là các cặp (iteration,
+            leader_fitness) của đảo tại các vòng lặp chia hết cho 10 và counts là
+            (bộ đếm, thời gian) thống kê của epoch
+        """
+        self.positions, self.fitness, leader_position, leader_fitness = state
+        # Leader của đảo có thể vừa đổi do di cư: tính lại hoán vị nghịch
+        self._set_leader(leader_position, leader_fitness)
+        # Luồng ngẫu nhiên và thống kê riêng của epoch, để không lẫn với của
+        # tiến trình chính khi chạy tại chỗ
+        outer_rng, self.rng = self.rng, RandomStream(seed)
+        outer_stats, self.stats = self.stats, SolverStats(enabled=self.stats.enabled)
+        history = []
+        try:
+            for iteration in range(start_iteration + 1, start_iteration + steps + 1):
+                self._update_whales(iteration)
+                if iteration % 10 == 0:
+                    history.append((iteration, self.leader_fitness))
+        finally:
+            epoch_stats, self.stats = self.stats, outer_stats
+            self.rng = outer_rng
+        state = (self.positions, self.fitness, self.leader_position, self.leader_fitness)
+        return state, history, (epoch_stats.counters, epoch_stats.timers)
+    
+    def _migrate(self, islands):
+        """
+        Di cư: các cá voi tốt nhất của đảo nguồn thay các cá voi kém nhất của đảo đích
+        
+        Args:
+            islands: List trạng thái (positions, fitness, leader_position, leader_fitness)
+            
+        Returns:
+            List trạng thái các đảo sau khi di cư
+        """
+        m = self.num_migrants
+        if m == 0:
+            return islands
+        elites = []
+        for positions, fitness, _, _ in islands:
+            best = np.argsort(fitness, kind='stable')[:m]
+            elites.append((positions[best].copy(), fitness[best].copy()))
+        
+        result = []
+        k = len(islands)
+        for i, (positions, fitness, leader_position, leader_fitness) in enumerate(islands):
+            if self.migration_topology == 'ring':
+                incoming, incoming_fitness = elites[(i - 1) % k]
+            else:
+                # 'full': chọn m cá thể tốt nhất trong tinh hoa của mọi đảo khác
+                others = [j for j in range(k) if j != i]
+                pool_positions = np.concatenate([elites[j][0] for j in others])
+                pool_fitness = np.concatenate([elites[j][1] for j in others])
+                best = np.argsort(pool_fitness, kind='stable')[:m]
+                incoming, incoming_fitness = pool_positions[best], pool_fitness[best]
+            
+            positions, fitness = positions.copy(), fitness.copy()
+            worst = np.argsort(fitness, kind='stable')[-m:]
+            positions[worst] = incoming
+            fitness[worst] = incoming_fitness
+            best = int(np.argmin(incoming_fitness))
+            if incoming_fitness[best] < leader_fitness:
+                leader_fitness = incoming_fitness[best]
+                leader_position = incoming[best].tolist()
+            result.append((positions, fitness, leader_position, leader_fitness))
+        return result
+    
+    def _solve_islands(self, callback=None, initial_route=None, stop=None):
+        """
+        Giải theo mô hình đảo: bầy được chia thành num_islands quần thể con
+        
+        Các đảo tiến hóa độc lập từng epoch migration_interval vòng lặp (song song
+        trên các tiến trình worker); sau mỗi epoch tiến trình chính cho di cư theo
+        migration_topology và cập nhật leader toàn cục.
+        
+        Args:
+            callback: Hàm callback (route, distance, iteration), gọi sau mỗi epoch
+            initial_route: Tuyến dựng sẵn để gieo vào bầy (xem _initialize_whales)
+            stop: StopCondition, được kiểm tra sau mỗi epoch
+            
+        Returns:
+            Tuple (best_route, best_distance, history)
+        """
+        self._initialize_whales(initial_route)
+        islands = []
+        for index in np.array_split(np.arange(self.num_whales), self.num_islands):
+            positions, fitness = self.positions[index], self.fitness[index]
+            best = int(np.argmin(fitness))
+            islands.append((positions, fitness, positions[best].tolist(), fitness[best]))
+        self.history = [(0, self.leader_fitness)]
+        self.actual_iterations = 0
+        
+        num_workers = self.num_workers or min(self.num_islands, os.cpu_count() or 1)
+        pool = None
+        shared_here = False
+        iteration = 0
+        try:
+            if num_workers > 1:
+                # Đưa bài toán vào bộ nhớ dùng chung: mỗi worker chỉ nhận handle
+                # thay vì bản sao ma trận khoảng cách (bài toán đã chia sẻ sẵn
+                # thì dùng nguyên trạng và không unlink)
+                if not self.tsp.is_shared:
+                    self.tsp.share_memory()
+                    shared_here = True
+                pool = Pool(min(num_workers, self.num_islands),
+                            initializer=_init_island_worker, initargs=(self,))
+            
+            while iteration < self.max_iterations:
+                steps = min(self.migration_interval, self.max_iterations - iteration)
+                # Luồng con spawn từ luồng chính: kết quả không phụ thuộc số worker
+                seeds = self.rng.seed_sequence.spawn(self.num_islands)
+                tasks = [(state, iteration, steps, seed) for state, seed in zip(islands, seeds)]
+                if pool is not None:
+                    results = pool.map(_run_island_epoch, tasks)
+                else:
+                    results = [self._run_island(*task) for task in tasks]
+                
+                islands = [state for state, _, _ in results]
+                for _, _, (counters, timers) in results:
+                    self.stats.add(**counters)
+                    self.stats.add_time(**timers)
+                # Lịch sử toàn cục = leader tốt nhất trong các đảo tại từng mốc
+                for points in zip(*(history for _, history, _ in results)):
+                    best = min(fitness for _, fitness in points)
+                    self.history.append((points[0][0], min(best, self.leader_fitness)))
+                for _, _, leader_position, leader_fitness in islands:
+                    if leader_fitness < self.leader_fitness:
+                        self._set_leader(leader_position, leader_fitness)
+                
+                iteration += steps
+                self.actual_iterations = iteration
+                if iteration < self.max_iterations:
+                    islands = self._migrate(islands)
+                self.stats.emit('progress', algorithm='WOA', iteration=iteration,
+                                best_distance=self.leader_fitness)
+                
+                if callback:
+                    with self.stats.timer('callback'):
+                        callback(self.leader_position, self.leader_fitness, iteration)
+                
+                if stop is not None and stop.should_stop(self.num_whales * (iteration + 1)):
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if shared_here:
+                self.tsp.unlink()
+        
+        self.positions = np.concatenate([state[0] for state in islands])
+        self.fitness = np.concatenate([state[1] for state in islands])
+        self.history.append((self.actual_iterations, self.leader_fitness))
+        return self.leader_position, self.leader_fitness, self.history
+    
     def get_algorithm_info(self):
         """Lấy thông tin về thuật toán"""
         return {
@@ -292,5 +750,26 @@ class WOA:
             'num_whales': self.num_whales,
             'max_iterations': self.max_iterations,
             'spiral_constant': self.b,
-            'a_max': self.a_max
+            'a_max': self.a_max,
+            'seed': self.seed,
+            'init': self.init,
+            'init_fraction': self.init_fraction,
+            'polish': self.polish,
+            'memetic_interval': self.memetic_interval,
+            'leader_update': self.leader_update,
+            'num_islands': self.num_islands,
+            'migration_interval': self.migration_interval,
+            'migration_topology': self.migration_topology,
+            'num_migrants': self.num_migrants
         }
+    
+    def get_stats(self):
+        """
+        Lấy thống kê của lần chạy gần nhất (cần collect_stats=True)
+        
+        Returns:
+            Dict bộ đếm (moves_proposed, moves_accepted, improvements,
+            distance_evaluations), thời gian (move_generation, evaluation, local_search,
+            callback) và các tỉ lệ suy ra; {'enabled': False} nếu không thu thập
+        """
+        return self.stats.snapshot()